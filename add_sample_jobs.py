@@ -0,0 +1,317 @@
+"""
+Synthetic data generator for load and scale testing.
+
+Bulk-inserts reproducible volumes of users, jobs and applications with
+realistic shapes:
+
+- Users: admins, employers and job seekers sharing one precomputed bcrypt
+  hash (hashing millions of passwords would take hours), so every generated
+  account can log in with ``--password``
+- Jobs: posted by employers with a heavy-tailed distribution (a few
+  employers post most jobs), weighted categories and locations, and posting
+  dates spread over ``--days``
+- Applications: concentrated on popular jobs, unique per (job, applicant),
+  with a status skew towards early pipeline stages
+
+Rows are written with Core ``insert()`` executemany in batches of
+``--batch-size``, one transaction per batch, with primary keys assigned up
+front so no ids need to be read back. Core inserts bypass the ORM hooks, so
+the summary tables are rebuilt at the end (see ``stats.py``).
+
+Usage:
+    python add_sample_jobs.py --employers 2000 --seekers 200000 --jobs 100000 --applications 2000000
+    APP_ENV=production python add_sample_jobs.py --seed 7 --tag run2
+"""
+
+import os
+import random
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+import click
+import sqlalchemy as sa
+
+from extensions import db
+from passwords import hash_password
+from models import User, Job, Application
+from stats import reconcile_category_stats, repair_application_counts
+
+# (value, relative weight)
+CATEGORIES = [
+    ('Software Development', 30), ('Data Science', 10), ('IT', 12), ('Marketing', 8),
+    ('Sales', 10), ('Finance', 7), ('Healthcare', 8), ('Education', 5),
+    ('Design', 4), ('Customer Support', 6), ('Human Resources', 3), ('Operations', 5),
+]
+LOCATIONS = [
+    ('Remote', 25), ('New York', 10), ('San Francisco', 8), ('London', 8), ('Bangalore', 9),
+    ('New Delhi', 6), ('Mumbai', 6), ('Berlin', 5), ('Toronto', 4), ('Singapore', 4),
+    ('Sydney', 3), ('Austin', 3), ('Pune', 4), ('Paris', 3), ('Chicago', 2),
+]
+STATUSES = [
+    ('applied', 50), ('pending', 20), ('reviewed', 15), ('rejected', 10), ('shortlisted', 4), ('hired', 1),
+]
+ROLES_BY_CATEGORY = {
+    'Software Development': ['Python Developer', 'Backend Engineer', 'Frontend Engineer', 'Full Stack Developer'],
+    'Data Science': ['Data Scientist', 'Data Engineer', 'ML Engineer', 'Data Analyst'],
+    'IT': ['Systems Administrator', 'DevOps Engineer', 'Network Engineer', 'IT Support Specialist'],
+    'Marketing': ['Marketing Manager', 'SEO Specialist', 'Content Strategist', 'Growth Marketer'],
+    'Sales': ['Account Executive', 'Sales Manager', 'Business Development Rep'],
+    'Finance': ['Accountant', 'Financial Analyst', 'Auditor', 'Controller'],
+    'Healthcare': ['Registered Nurse', 'Medical Assistant', 'Pharmacist'],
+    'Education': ['Teacher', 'Curriculum Designer', 'Tutor'],
+    'Design': ['Product Designer', 'UX Researcher', 'Graphic Designer'],
+    'Customer Support': ['Support Engineer', 'Customer Success Manager'],
+    'Human Resources': ['Recruiter', 'HR Generalist'],
+    'Operations': ['Operations Manager', 'Logistics Coordinator', 'Project Manager'],
+}
+SENIORITY = ['Junior', '', '', 'Senior', 'Senior', 'Lead', 'Principal']
+COMPANY_PREFIXES = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark', 'Wayne', 'Tyrell',
+                    'Cyberdyne', 'Soylent', 'Vandelay', 'Wonka', 'Oscorp', 'Aperture', 'Massive']
+COMPANY_SUFFIXES = ['Labs', 'Systems', 'Technologies', 'Group', 'Health', 'Partners', 'Analytics', 'Works']
+
+
+def _weighted(rng, pairs, k):
+    """Draw ``k`` values from ``(value, weight)`` pairs."""
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights=weights, k=k)
+
+
+def _insert(table, rows):
+    """Insert one batch of rows in its own transaction."""
+    if rows:
+        with db.engine.begin() as connection:
+            connection.execute(table.insert(), rows)
+
+
+def _next_id(table):
+    """First free primary key of ``table``; ids are assigned explicitly."""
+    return (db.session.execute(sa.select(sa.func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _sync_sequence(table):
+    """Move PostgreSQL's id sequence past explicitly inserted ids."""
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(sa.text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+            f"(SELECT MAX(id) FROM \"{table.name}\"))"))
+        db.session.commit()
+
+
+def _progress(label, done, total, started):
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0
+    click.echo(f"  {label}: {done:,}/{total:,} ({rate:,.0f} rows/s)")
+
+
+def generate_users(role, count, password_hash, tag, batch_size):
+    """
+    Insert ``count`` users with the given role.
+
+    Returns:
+        range: IDs of the inserted users
+    """
+    users = User.__table__
+    first_id = _next_id(users)
+    started = time.perf_counter()
+    batch = []
+    for offset in range(count):
+        user_id = first_id + offset
+        batch.append({
+            'id': user_id,
+            'username': f'{role}_{user_id}',
+            'email': f'{tag}.{role}.{user_id}@example.com',
+            'password': password_hash,
+            'role': role,
+            'profile_picture': 'img/profiles/default.jpg',
+        })
+        if len(batch) >= batch_size:
+            _insert(users, batch)
+            batch = []
+            _progress(f'{role} users', offset + 1, count, started)
+    _insert(users, batch)
+    _sync_sequence(users)
+    return range(first_id, first_id + count)
+
+
+def generate_jobs(rng, employer_ids, count, days, batch_size):
+    """
+    Insert ``count`` jobs posted by ``employer_ids``.
+
+    Returns:
+        tuple: (range of job IDs, array of posting times as POSIX timestamps)
+    """
+    jobs = Job.__table__
+    first_id = _next_id(jobs)
+    now = datetime.now(timezone.utc)
+    # Heavy-tailed employer activity and one company name per employer
+    activity = list(accumulate(rng.paretovariate(1.2) for _ in employer_ids))
+    companies = {employer_id: f'{rng.choice(COMPANY_PREFIXES)} {rng.choice(COMPANY_SUFFIXES)}'
+                 for employer_id in employer_ids}
+
+    posted_at = array('d')
+    started = time.perf_counter()
+    batch = []
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        posters = rng.choices(employer_ids, cum_weights=activity, k=size)
+        categories = _weighted(rng, CATEGORIES, size)
+        locations = _weighted(rng, LOCATIONS, size)
+        for offset in range(size):
+            job_id = first_id + start + offset
+            category = categories[offset]
+            posted = now - timedelta(seconds=rng.uniform(0, days * 86400))
+            posted_at.append(posted.timestamp())
+            # The id keeps (title, company, poster, location) unique
+            title = f"{rng.choice(SENIORITY)} {rng.choice(ROLES_BY_CATEGORY[category])}".strip()
+            batch.append({
+                'id': job_id,
+                'title': f'{title} #{job_id}',
+                'description': f'{title} role in {category}. '
+                               f'Join {companies[posters[offset]]} in {locations[offset]}.',
+                'salary': f'${rng.randrange(40, 250) * 1000:,}',
+                'location': locations[offset],
+                'category': category,
+                'company': companies[posters[offset]],
+                'company_logo': 'img/company_logos/default.png',
+                'posted_date': posted,
+                'poster_id': posters[offset],
+            })
+        _insert(jobs, batch)
+        batch = []
+        _progress('jobs', start + size, count, started)
+    _sync_sequence(jobs)
+    return range(first_id, first_id + count), posted_at
+
+
+def generate_applications(rng, job_ids, posted_at, seeker_ids, count, batch_size):
+    """
+    Insert ``count`` applications from ``seeker_ids`` to ``job_ids``.
+
+    Popular jobs attract most applications; no job receives more
+    applications than there are seekers, and ``count`` is capped at one
+    application per (job, seeker) pair.
+
+    Returns:
+        int: Number of applications inserted
+    """
+    applications = Application.__table__
+    now = time.time()
+    popularity = list(accumulate(rng.paretovariate(1.1) for _ in job_ids))
+    per_job = [0] * len(job_ids)
+    count = min(count, len(job_ids) * len(seeker_ids))
+    for start in range(0, count, batch_size):
+        for index in rng.choices(range(len(job_ids)), cum_weights=popularity, k=min(batch_size, count - start)):
+            per_job[index] += 1
+    # A job cannot have more applicants than there are seekers; spread the excess
+    overflow = sum(max(0, wanted - len(seeker_ids)) for wanted in per_job)
+    per_job = [min(wanted, len(seeker_ids)) for wanted in per_job]
+    index = 0
+    while overflow:
+        if per_job[index] < len(seeker_ids):
+            per_job[index] += 1
+            overflow -= 1
+        index = (index + 1) % len(per_job)
+
+    application_id = _next_id(applications)
+    inserted = 0
+    started = time.perf_counter()
+    batch = []
+    for index, wanted in enumerate(per_job):
+        if not wanted:
+            continue
+        applicants = rng.sample(seeker_ids, wanted)
+        statuses = _weighted(rng, STATUSES, len(applicants))
+        for applicant_id, status in zip(applicants, statuses):
+            applied = rng.uniform(posted_at[index], now)
+            batch.append({
+                'id': application_id,
+                'job_id': job_ids[index],
+                'applicant_id': applicant_id,
+                'application_date': datetime.fromtimestamp(applied, timezone.utc),
+                'status': status,
+                'resume_path': None,
+            })
+            application_id += 1
+        if len(batch) >= batch_size:
+            _insert(applications, batch)
+            inserted += len(batch)
+            batch = []
+            _progress('applications', inserted, count, started)
+    _insert(applications, batch)
+    inserted += len(batch)
+    _sync_sequence(applications)
+    return inserted
+
+
+def generate_dataset(admins=2, employers=500, seekers=20000, jobs=20000, applications=200000,
+                     days=365, seed=42, tag='gen', password='Password123!', batch_size=5000):
+    """
+    Generate a complete dataset in the current application's database.
+
+    Args:
+        admins, employers, seekers (int): Users to create per role
+        jobs (int): Jobs to create
+        applications (int): Applications to create (at most jobs x seekers)
+        days (int): Spread of posting dates back from now
+        seed (int): Random seed; the same arguments produce the same data
+        tag (str): Marker in generated emails so repeated runs do not collide
+        password (str): Password of every generated account
+        batch_size (int): Rows per executemany batch
+
+    Returns:
+        dict: Number of rows inserted per table
+
+    Side Effects:
+        - Inserts rows and rebuilds the category stats and application counters
+    """
+    rng = random.Random(seed)
+    password_hash = hash_password(password)
+
+    generate_users('admin', admins, password_hash, tag, batch_size)
+    employer_ids = generate_users('employer', employers, password_hash, tag, batch_size)
+    seeker_ids = generate_users('job_seeker', seekers, password_hash, tag, batch_size)
+
+    job_ids, posted_at = range(0), array('d')
+    if employer_ids and jobs:
+        job_ids, posted_at = generate_jobs(rng, employer_ids, jobs, days, batch_size)
+    inserted = 0
+    if job_ids and seeker_ids and applications:
+        inserted = generate_applications(rng, job_ids, posted_at, seeker_ids, applications, batch_size)
+
+    # Core inserts skip the summary hooks; rebuild them in bulk
+    reconcile_category_stats()
+    repair_application_counts()
+    return {'users': admins + employers + seekers, 'jobs': len(job_ids), 'applications': inserted}
+
+
+@click.command()
+@click.option('--admins', default=2, show_default=True, help='Admin users to create.')
+@click.option('--employers', default=500, show_default=True, help='Employers to create.')
+@click.option('--seekers', default=20000, show_default=True, help='Job seekers to create.')
+@click.option('--jobs', default=20000, show_default=True, help='Jobs to create.')
+@click.option('--applications', default=200000, show_default=True, help='Applications to create.')
+@click.option('--days', default=365, show_default=True, help='Spread of posting dates in days.')
+@click.option('--seed', default=42, show_default=True, help='Random seed for reproducible data.')
+@click.option('--tag', default='gen', show_default=True, help='Email marker; change it for repeated runs.')
+@click.option('--password', default='Password123!', show_default=True, help='Password of every generated user.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per insert batch.')
+def main(**options):
+    """Bulk-insert a synthetic dataset into the configured database."""
+    from app import create_app
+    from config import config
+
+    app = create_app(config[os.getenv('APP_ENV', 'development')])
+    with app.app_context():
+        # Echoing every batch (DevelopmentConfig) would dominate the run time
+        db.engine.echo = False
+        started = time.perf_counter()
+        counts = generate_dataset(**options)
+        elapsed = time.perf_counter() - started
+        click.echo(f"Inserted {counts['users']:,} users, {counts['jobs']:,} jobs and "
+                   f"{counts['applications']:,} applications in {elapsed:,.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,18 @@
-from flask import Flask, session, redirect, url_for
-from models import User
+from flask import Flask, redirect, url_for
+import search  # Registers the full-text index DDL on the job table
+import stats
+import resume_outbox
+import mail_outbox
+import digests  # Registers the application status change hook
+import scheduler
+import passwords
+from image_pipeline import picture_variant
+from user_context import current_user_summary
 from config import config
 from extensions import db, init_app
 import os
 from logging_config import setup_logger
+from instrumentation import init_query_instrumentation
 from flask_talisman import Talisman
 
 # import os
@@ -73,7 +82,6 @@ def create_app(config_class=config[os.getenv('APP_ENV', 'development')]):
         - Configures security headers
         - Creates required directories
         - Sets up logging
-        - Initializes scheduler (once)
         - Creates database tables
     """
     print(f"APP_ENV: {os.getenv('APP_ENV', 'development')}")
@@ -86,6 +94,8 @@ def create_app(config_class=config[os.getenv('APP_ENV', 'development')]):
     # mail.init_app(app)
     # login_manager.init_app(app)
     init_app(app)
+    passwords.init_app(app)
+    init_query_instrumentation(app)
     
     talisman = Talisman(app, content_security_policy=csp, force_https=False)
     
@@ -98,6 +108,12 @@ def create_app(config_class=config[os.getenv('APP_ENV', 'development')]):
 
     # Register blueprints
     register_blueprints(app)
+    stats.register_commands(app)
+    resume_outbox.register_commands(app)
+    mail_outbox.register_commands(app)
+    digests.register_commands(app)
+    scheduler.register_commands(app)
+    app.add_template_filter(picture_variant)
     
      # Context processor to make current user available in templates
     @app.context_processor
@@ -107,21 +123,21 @@ def create_app(config_class=config[os.getenv('APP_ENV', 'development')]):
         
         This context processor adds the current_user variable to the template context,
         allowing templates to access the logged-in user's information without
-        explicitly passing it to each template.
+        explicitly passing it to each template. Only the username, profile picture
+        and role are exposed; they come from the user the route already loaded or
+        from the user cache, so most page views run no query for them
+        (see user_context.py).
         
         Returns:
-            dict: A dictionary containing the current_user object or None if no user is logged in
+            dict: A dictionary containing the current user's summary or None if no user is logged in
         """
-        user_id = session.get('user_id')
-        if user_id:
-            user = db.session.get(User, user_id)
-            return dict(current_user=user)
-        return dict(current_user=None)
+        return dict(current_user=current_user_summary())
 
     
     # Create database tables
     with app.app_context():
         db.create_all()
+
     
     # Redirect root to main blueprint
     @app.route('/')
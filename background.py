@@ -0,0 +1,93 @@
+"""
+Background threads that drain database outboxes.
+
+The resume upload outbox (``resume_outbox.py``) and the mail outbox
+(``mail_outbox.py``) each run a ``PollingWorker``: a few daemon threads that
+call a drain function in an application context, immediately when woken with
+``notify`` (right after a request commits new work) and otherwise every
+``poll_seconds``, so rows left over from a restart or waiting out a retry
+delay are picked up too.
+
+Workers are created per application on first use (``get_worker``) and kept
+in ``app.extensions``.
+"""
+
+import threading
+
+from extensions import db
+from utils import logger
+
+_workers_lock = threading.Lock()
+
+
+class PollingWorker:
+    """
+    Daemon threads calling ``drain()`` when woken and every ``poll_seconds``.
+
+    Args:
+        app (Flask): Application whose context the threads run in
+        drain (callable): Called without arguments for each pass
+        name (str): Thread name prefix, also used in log messages
+        threads (int): Number of threads
+        poll_seconds (float): Idle wait between passes
+    """
+
+    def __init__(self, app, drain, name, threads=1, poll_seconds=60):
+        self.app = app
+        self.drain = drain
+        self.name = name
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = [threading.Thread(target=self._run, name=f'{name}-{n}', daemon=True)
+                         for n in range(threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            with self.app.app_context():
+                try:
+                    self.drain()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"{self.name} worker pass failed: {str(e)}")
+                finally:
+                    db.session.remove()
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def notify(self):
+        """Wake the threads to look for due rows now."""
+        self._wake.set()
+
+    def stop(self):
+        """Stop the threads after their current pass."""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join()
+
+
+def get_worker(app, name, drain, threads, poll_seconds):
+    """
+    Return the application's worker called ``name``, starting it on first use.
+
+    Args:
+        app (Flask): Flask application instance
+        name (str): Worker name; stored as ``app.extensions[f'{name}_worker']``
+        drain (callable): See PollingWorker
+        threads (int): See PollingWorker
+        poll_seconds (float): See PollingWorker
+
+    Returns:
+        PollingWorker: The running worker
+    """
+    key = f'{name}_worker'
+    worker = app.extensions.get(key)
+    if worker is None:
+        with _workers_lock:
+            worker = app.extensions.get(key)
+            if worker is None:
+                worker = app.extensions[key] = PollingWorker(app, drain, name, threads, poll_seconds)
+    return worker
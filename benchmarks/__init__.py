@@ -0,0 +1 @@
+"""HTTP endpoint benchmarks for the Job Portal application (see ``endpoints.py``)."""
@@ -0,0 +1,354 @@
+"""
+Endpoint benchmark suite.
+
+Builds the app with ``create_app`` against a seeded SQLite (or any
+``--database-url``) database for each dataset size, drives the hot endpoints
+with the Flask test client and records, per endpoint:
+
+- Latency percentiles (p50/p95/p99, milliseconds) over ``--iterations``
+  timed requests after ``--warmup`` untimed ones
+- SQL statements per request (median across the timed requests)
+- Peak Python memory allocated while serving one request (tracemalloc,
+  measured on a separate request so tracing does not skew latencies)
+
+Results are written as JSON and compared with a stored baseline: an
+endpoint regresses when its p95 grows by more than ``--tolerance`` or it
+issues more queries than before.
+
+Datasets are generated with ``add_sample_jobs.generate_dataset`` and cached
+in ``--data-dir`` keyed by size and seed, so repeated runs compare like with
+like.
+
+Usage:
+    python -m benchmarks.endpoints --sizes small,medium
+    python -m benchmarks.endpoints --sizes small --update-baseline
+    python -m benchmarks.endpoints --sizes small --fail-on-regression
+"""
+
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import click
+import sqlalchemy as sa
+from flask import url_for
+from sqlalchemy import event
+
+from add_sample_jobs import generate_dataset
+from config import TestingConfig
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, 'results.json')
+PASSWORD = 'Password123!'
+RESUME_BYTES = 256 * 1024
+
+# Rows per dataset size (arguments of add_sample_jobs.generate_dataset)
+SIZES = {
+    'small': dict(admins=2, employers=50, seekers=1000, jobs=1000, applications=10000),
+    'medium': dict(admins=2, employers=500, seekers=10000, jobs=10000, applications=100000),
+    'large': dict(admins=2, employers=2000, seekers=100000, jobs=100000, applications=1000000),
+}
+
+# endpoint: Flask endpoint name; role: whose session to use (None = anonymous);
+# url: callable(fixtures) -> URL; data: form data for a POST (None = GET)
+Scenario = namedtuple('Scenario', ['endpoint', 'role', 'url', 'data'])
+
+SCENARIOS = [
+    Scenario('main.index', None, lambda f: url_for('main.index'), None),
+    Scenario('jobs.jobs_list', None, lambda f: url_for('jobs.jobs_list'), None),
+    Scenario('jobs.search_jobs', None,
+             lambda f: url_for('jobs.search_jobs', q='engineer', location='Remote', facets='true'), None),
+    Scenario('jobs.job_detail', 'job_seeker', lambda f: url_for('jobs.job_detail', job_id=f['job_id']), None),
+    Scenario('employer.my_jobs', 'employer', lambda f: url_for('employer.my_jobs'), None),
+    Scenario('admin.admin_applications', 'admin', lambda f: url_for('admin.admin_applications'), None),
+    Scenario('auth.login', None, lambda f: url_for('auth.login'),
+             lambda f: {'email': f['seeker_email'], 'password': PASSWORD}),
+    # Served from the configured storage backend (the in-memory GCS stand-in by default)
+    Scenario('utils.serve_resume', 'admin', lambda f: url_for('utils.serve_resume', cs_suffix=f['resume_key']),
+             None),
+]
+
+
+def _config(database_url):
+    """Testing configuration pointed at the benchmark database."""
+    return type('BenchmarkConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        # Record overruns instead of failing; the suite reports query counts itself
+        'QUERY_BUDGET_STRICT': False,
+    })
+
+
+def _database_url(data_dir, size, seed):
+    return f"sqlite:///{os.path.join(data_dir, f'bench_{size}_{seed}.db')}"
+
+
+def build_app(size, seed, data_dir=None, database_url=None):
+    """
+    Create the app against a database seeded for ``size``.
+
+    A SQLite file in ``data_dir`` is generated once and reused; an explicit
+    ``database_url`` is seeded only if it has no jobs yet.
+
+    Returns:
+        Flask: Application with a seeded database
+    """
+    from app import create_app
+    from extensions import db
+    from models import Job
+
+    url = database_url or _database_url(data_dir, size, seed)
+    app = create_app(_config(url))
+    # Per-request INFO logging to the console would dominate the timings
+    logging.getLogger('job_portal').setLevel(logging.WARNING)
+    with app.app_context():
+        if not db.session.query(sa.exists().where(Job.id.isnot(None))).scalar():
+            click.echo(f"Seeding {size} dataset ({url})...")
+            generate_dataset(seed=seed, password=PASSWORD, tag=f'bench{seed}', **SIZES[size])
+    return app
+
+
+def _fixtures(app):
+    """Pick the users and job each scenario acts on, and store one resume to download."""
+    import io
+    from extensions import db
+    from file_storage import get_resume_storage
+    from models import User, Job, Application
+
+    with app.app_context():
+        def first(role):
+            return db.session.query(User.id, User.email).filter_by(role=role).order_by(User.id).first()
+
+        busiest_employer = (db.session.query(Job.poster_id)
+                            .group_by(Job.poster_id)
+                            .order_by(sa.func.count().desc())
+                            .limit(1).scalar())
+        popular_job = db.session.query(Job.id).order_by(Job.application_count.desc()).limit(1).scalar()
+        seeker = first('job_seeker')
+
+        application = db.session.query(Application).order_by(Application.id).first()
+        resume_key = None
+        if application is not None:
+            resume_key = f'{application.applicant_id}/benchmark_resume.pdf'
+            application.resume_path = resume_key
+            db.session.commit()
+            get_resume_storage().save(resume_key, io.BytesIO(b'%PDF' + b'0' * RESUME_BYTES), 'application/pdf')
+        return {
+            'admin': first('admin').id,
+            'employer': busiest_employer,
+            'job_seeker': seeker.id,
+            'seeker_email': seeker.email,
+            'job_id': popular_job,
+            'resume_key': resume_key,
+        }
+
+
+def _percentile(quantiles, p):
+    return round(quantiles[p - 1] * 1000, 3)
+
+
+def run_scenario(app, scenario, fixtures, iterations, warmup):
+    """
+    Benchmark one endpoint.
+
+    Returns:
+        dict: p50_ms, p95_ms, p99_ms, mean_ms, queries, peak_kib, status
+    """
+    from extensions import db
+
+    statements = []
+    counter = {'n': 0}
+
+    def count(*args):
+        counter['n'] += 1
+
+    with app.test_request_context():
+        url = scenario.url(fixtures)
+        data = scenario.data(fixtures) if scenario.data else None
+
+    client = app.test_client()
+
+    def request_once():
+        with client.session_transaction() as session:
+            session.clear()
+            if scenario.role:
+                session['user_id'] = fixtures[scenario.role]
+                session['role'] = scenario.role
+        counter['n'] = 0
+        started = time.perf_counter()
+        response = client.post(url, data=data) if data is not None else client.get(url)
+        elapsed = time.perf_counter() - started
+        if response.status_code not in (200, 302):
+            raise click.ClickException(f"{scenario.endpoint} returned {response.status_code}")
+        return elapsed, counter['n'], response.status_code
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        for _ in range(warmup):
+            request_once()
+        timings = []
+        for _ in range(iterations):
+            elapsed, queries, status = request_once()
+            timings.append(elapsed)
+            statements.append(queries)
+
+        tracemalloc.start()
+        try:
+            request_once()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    quantiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'p50_ms': _percentile(quantiles, 50),
+        'p95_ms': _percentile(quantiles, 95),
+        'p99_ms': _percentile(quantiles, 99),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'queries': int(statistics.median(statements)),
+        'peak_kib': round(peak / 1024, 1),
+        'status': status,
+    }
+
+
+def run_suite(sizes, iterations=50, warmup=5, seed=42, data_dir=None, database_url=None, endpoints=None):
+    """
+    Benchmark every scenario at each dataset size.
+
+    Args:
+        sizes (list[str]): Keys of SIZES
+        iterations (int): Timed requests per endpoint (at least 2)
+        warmup (int): Untimed requests per endpoint before timing
+        seed (int): Dataset seed
+        data_dir (str): Directory caching the generated SQLite databases
+        database_url (str): Use this database instead (single size only)
+        endpoints (list[str]): Restrict to these endpoint names (optional)
+
+    Returns:
+        dict: ``{'meta': {...}, 'results': {size: {endpoint: metrics}}}``
+    """
+    data_dir = data_dir or os.path.join(tempfile.gettempdir(), 'job_portal_bench')
+    os.makedirs(data_dir, exist_ok=True)
+    results = {}
+    for size in sizes:
+        app = build_app(size, seed, data_dir=data_dir, database_url=database_url)
+        fixtures = _fixtures(app)
+        results[size] = {}
+        for scenario in SCENARIOS:
+            if endpoints and scenario.endpoint not in endpoints:
+                continue
+            metrics = run_scenario(app, scenario, fixtures, iterations, warmup)
+            results[size][scenario.endpoint] = metrics
+            click.echo(f"  [{size}] {scenario.endpoint:28} p50 {metrics['p50_ms']:8.2f}ms  "
+                       f"p95 {metrics['p95_ms']:8.2f}ms  p99 {metrics['p99_ms']:8.2f}ms  "
+                       f"{metrics['queries']:3d} queries  {metrics['peak_kib']:9.1f} KiB")
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlalchemy': sa.__version__,
+            'iterations': iterations,
+            'warmup': warmup,
+            'seed': seed,
+            'sizes': {size: SIZES[size] for size in sizes},
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Compare results with a baseline.
+
+    Args:
+        current (dict): Output of run_suite
+        baseline (dict): Previously stored output of run_suite
+        tolerance (float): Allowed relative p95 growth (0.2 = 20%)
+
+    Returns:
+        list[dict]: One entry per endpoint present in both, with
+                    ``size``, ``endpoint``, ``p95_change``, ``queries_change``
+                    and ``regressed``
+    """
+    rows = []
+    for size, endpoints in current['results'].items():
+        for endpoint, metrics in endpoints.items():
+            before = baseline.get('results', {}).get(size, {}).get(endpoint)
+            if before is None:
+                continue
+            p95_change = (metrics['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0.0
+            queries_change = metrics['queries'] - before['queries']
+            rows.append({
+                'size': size,
+                'endpoint': endpoint,
+                'p95_change': round(p95_change, 4),
+                'queries_change': queries_change,
+                'regressed': p95_change > tolerance or queries_change > 0,
+            })
+    return rows
+
+
+@click.command()
+@click.option('--sizes', default='small', show_default=True, help=f"Comma-separated from: {', '.join(SIZES)}.")
+@click.option('--iterations', default=50, show_default=True, type=click.IntRange(min=2),
+              help='Timed requests per endpoint.')
+@click.option('--warmup', default=5, show_default=True, help='Untimed requests per endpoint.')
+@click.option('--seed', default=42, show_default=True, help='Dataset seed.')
+@click.option('--endpoint', 'endpoints', multiple=True, help='Only benchmark this endpoint (repeatable).')
+@click.option('--data-dir', default=None, help='Where generated databases are cached.')
+@click.option('--database-url', default=None, help='Benchmark an existing database (one size only).')
+@click.option('--output', default=DEFAULT_OUTPUT, show_default=True, help='Results JSON file.')
+@click.option('--baseline', default=DEFAULT_BASELINE, show_default=True, help='Baseline JSON file.')
+@click.option('--tolerance', default=0.2, show_default=True, help='Allowed relative p95 growth.')
+@click.option('--update-baseline', is_flag=True, help='Store these results as the new baseline.')
+@click.option('--fail-on-regression', is_flag=True, help='Exit with status 1 on any regression.')
+def main(sizes, iterations, warmup, seed, endpoints, data_dir, database_url, output, baseline,
+         tolerance, update_baseline, fail_on_regression):
+    """Benchmark the hot endpoints and compare with the stored baseline."""
+    sizes = [size.strip() for size in sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        raise click.BadParameter(f"unknown size(s): {', '.join(unknown)}", param_hint='--sizes')
+    if database_url and len(sizes) != 1:
+        raise click.BadParameter('--database-url benchmarks a single size', param_hint='--sizes')
+
+    results = run_suite(sizes, iterations=iterations, warmup=warmup, seed=seed, data_dir=data_dir,
+                        database_url=database_url, endpoints=list(endpoints) or None)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    click.echo(f"Results written to {output}")
+
+    regressions = []
+    if os.path.exists(baseline) and not update_baseline:
+        with open(baseline) as f:
+            rows = compare(results, json.load(f), tolerance)
+        for row in rows:
+            flag = 'REGRESSION' if row['regressed'] else 'ok'
+            click.echo(f"  [{row['size']}] {row['endpoint']:28} p95 {row['p95_change']:+8.1%}  "
+                       f"queries {row['queries_change']:+d}  {flag}")
+        regressions = [row for row in rows if row['regressed']]
+    if update_baseline:
+        with open(baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        click.echo(f"Baseline updated: {baseline}")
+
+    if regressions:
+        click.echo(f"{len(regressions)} regression(s) against {baseline}")
+        if fail_on_regression:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
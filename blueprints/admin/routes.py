@@ -1,11 +1,67 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from models import db, User, Job, Application
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, abort
+from models import db, User, Job, Application, APPLICATION_STATUSES
 from forms import UserEditForm, JobForm, AdminRegistrationForm
-from utils import logger, save_company_logo
+from utils import logger, access_logger, save_company_logo
 from blueprints.auth.routes import login_required, role_required
+from queries import admin_user_listing, admin_job_listing, admin_application_listing
+from instrumentation import query_budget
+from datatable import DataTable, DataColumn, wants_json
+from pagination import InvalidCursor
+from resume_cache import get_resume_cache
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+# Sortable columns are all indexed; filters are index-friendly prefix or exact matches
+USER_COLUMNS = [
+    DataColumn('id', 'ID', User.id, sortable=True, filter='exact'),
+    DataColumn('username', 'Username', User.username, sortable=True, filter='prefix'),
+    DataColumn('email', 'Email', User.email, sortable=True, filter='prefix'),
+    DataColumn('role', 'Role', User.role, sortable=True, filter='exact',
+               choices=('job_seeker', 'employer', 'admin')),
+]
+
+JOB_COLUMNS = [
+    DataColumn('id', 'ID', Job.id, sortable=True, filter='exact'),
+    DataColumn('title', 'Title', Job.title, filter='prefix'),
+    DataColumn('company', 'Company', Job.company, sortable=True, filter='prefix'),
+    DataColumn('category', 'Category', Job.category, sortable=True, filter='prefix'),
+    DataColumn('location', 'Location', Job.location, sortable=True, filter='prefix'),
+    DataColumn('posted_by', 'Posted By', value=lambda job: job.poster.username),
+    DataColumn('posted_date', 'Posted Date', Job.posted_date, sortable=True),
+]
+
+APPLICATION_COLUMNS = [
+    DataColumn('id', 'ID', Application.id, sortable=True, filter='exact'),
+    DataColumn('job_title', 'Job Title', value=lambda application: application.job.title),
+    DataColumn('applicant', 'Applicant', value=lambda application: application.applicant.username),
+    DataColumn('application_date', 'Application Date', Application.application_date, sortable=True),
+    DataColumn('status', 'Status', Application.status, sortable=True, filter='exact',
+               choices=APPLICATION_STATUSES),
+    DataColumn('job_id', 'Job ID', Application.job_id, filter='exact'),
+    DataColumn('applicant_id', 'Applicant ID', Application.applicant_id, filter='exact'),
+]
+
+def _table_page(query, columns, primary_key):
+    """
+    Fetch the requested page of an admin table.
+    
+    Args:
+        query: Listing query for the table
+        columns (list[DataColumn]): Table columns
+        primary_key: Primary key column of the listed model
+        
+    Returns:
+        DataTablePage: Page selected by the request's sort, filter and cursor arguments
+        
+    Side Effects:
+        - Aborts with 400 if the cursor is invalid
+    """
+    try:
+        return DataTable(query, columns, primary_key).paginate(request.args)
+    except InvalidCursor as e:
+        logger.warning(f"Invalid cursor on {request.endpoint}: {e}")
+        abort(400)
+
 @admin_bp.route('/dashboard')
 @login_required
 @role_required('admin')
@@ -22,30 +78,57 @@ def admin_dashboard():
     Example:
         /admin/dashboard
     """
-    logger.info(f"Admin {session['user_id']} accessed the admin dashboard")
+    access_logger.info("Admin %s accessed the admin dashboard", session['user_id'])
     return render_template('admin/dashboard.html')
 
+@admin_bp.route('/resume-cache')
+@login_required
+@role_required('admin')
+@query_budget(0)
+def admin_resume_cache():
+    """
+    Report the resume disk cache as JSON.
+    
+    Returns:
+        JSON with this process's hits, misses and evictions and the shared
+        cache directory's entries, bytes and max_bytes,
+        or ``{"enabled": false}`` when resumes are not cached
+        
+    Example:
+        /admin/resume-cache
+    """
+    cache = get_resume_cache()
+    if cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **cache.stats()})
+
 @admin_bp.route('/users')
 @login_required
 @role_required('admin')
+@query_budget(2)
 def admin_users():
     """
-    Display all users for admin management.
+    Display one page of users for admin management.
+    
+    Query Parameters:
+        sort, dir, cursor, per_page: Ordering and paging (see ``datatable.py``)
+        id, username, email, role: Column filters
+        format (str): 'json' for a JSON response
     
     Returns:
-        Rendered template with list of all users
+        Rendered template with a page of users, or JSON
         
     Side Effects:
         - Logs access to user management
-        - Retrieves all users from database
         
     Example:
-        /admin/users
+        /admin/users?sort=username&dir=asc&role=employer
     """
-    logger.info(f"Admin {session['user_id']} accessed the users management page")
-    users = User.query.all()
-    logger.info(f"Retrieved {len(users)} users for admin view")
-    return render_template('admin/users.html', users=users, form=UserEditForm())
+    access_logger.info("Admin %s accessed the users management page", session['user_id'])
+    page = _table_page(admin_user_listing(), USER_COLUMNS, User.id)
+    if wants_json(request.args):
+        return jsonify(page.to_json())
+    return render_template('admin/users.html', page=page, users=page.items, form=UserEditForm())
 
 @admin_bp.route('/users/new', methods=['GET', 'POST'])
 @login_required
@@ -59,13 +142,14 @@ def admin_new_user():
         
     Side Effects:
         - Creates new user record in database
+        - Responds 429 when too many password hashes are in flight
         - Logs admin actions
         - Flashes success/error messages
         
     Example:
         /admin/users/new
     """
-    logger.info(f"Admin {session['user_id']} accessed the new user creation page")
+    access_logger.info("Admin %s accessed the new user creation page", session['user_id'])
     form = AdminRegistrationForm()
     if form.validate_on_submit():
         if User.query.filter_by(email=form.email.data).first():
@@ -183,24 +267,30 @@ def admin_delete_user(user_id):
 @admin_bp.route('/jobs')
 @login_required
 @role_required('admin')
+@query_budget(3)
 def admin_jobs():
     """
-    Display all job listings for admin management.
+    Display one page of job listings for admin management.
+    
+    Query Parameters:
+        sort, dir, cursor, per_page: Ordering and paging (see ``datatable.py``)
+        id, title, company, category, location: Column filters
+        format (str): 'json' for a JSON response
     
     Returns:
-        Rendered template with list of all jobs
+        Rendered template with a page of jobs, or JSON
         
     Side Effects:
         - Logs access to job management
-        - Retrieves all jobs from database
         
     Example:
-        /admin/jobs
+        /admin/jobs?sort=posted_date&dir=desc&company=Acme
     """
-    logger.info(f"Admin {session['user_id']} accessed the jobs management page")
-    jobs = Job.query.all()
-    logger.info(f"Retrieved {len(jobs)} jobs for admin view")
-    return render_template('admin/jobs.html', jobs=jobs, form=JobForm())
+    access_logger.info("Admin %s accessed the jobs management page", session['user_id'])
+    page = _table_page(admin_job_listing(), JOB_COLUMNS, Job.id)
+    if wants_json(request.args):
+        return jsonify(page.to_json())
+    return render_template('admin/jobs.html', page=page, jobs=page.items, form=JobForm())
 
 @admin_bp.route('/jobs/new', methods=['GET', 'POST'])
 @login_required
@@ -223,10 +313,12 @@ def admin_create_job():
     if form.validate_on_submit():
         try:
             # Handle file upload if present
-            logo_filename = None
+            company_logo = 'img/company_logos/default.png'
             if form.company_logo.data:
                 logo_filename = save_company_logo(form.company_logo.data)
-                logger.info(f"Saved company logo: {logo_filename}")
+                if logo_filename:
+                    company_logo = f'img/company_logos/{logo_filename}'
+                    logger.info(f"Saved company logo: {logo_filename}")
             
             # Create job as admin (note: poster_id set to admin's ID)
             job = Job(
@@ -236,7 +328,7 @@ def admin_create_job():
                 location=form.location.data,
                 category=form.category.data,
                 company=form.company.data,
-                company_logo=logo_filename,
+                company_logo=company_logo,
                 poster_id=session['user_id']  # Admin is creating this job
             )
             
@@ -305,7 +397,7 @@ def admin_edit_job(job_id):
 @role_required('admin')
 def admin_delete_job(job_id):
     """
-    Handle job deletion by admin (including associated applications).
+    Handle job deletion by admin (applications are removed by the database cascade).
     
     Args:
         job_id: ID of the job to delete
@@ -324,12 +416,7 @@ def admin_delete_job(job_id):
     job = db.get_or_404(Job, job_id)
     
     try:
-        # Delete associated applications first
-        applications = Application.query.filter_by(job_id=job.id).all()
-        for application in applications:
-            db.session.delete(application)
-        
-        # Now delete the job
+        # Applications are removed by the ON DELETE CASCADE foreign key
         db.session.delete(job)
         db.session.commit()
         logger.info(
@@ -345,24 +432,30 @@ def admin_delete_job(job_id):
 @admin_bp.route('/applications')
 @login_required
 @role_required('admin')
+@query_budget(3)
 def admin_applications():
     """
-    Display all job applications for admin management.
+    Display one page of job applications for admin management.
+    
+    Query Parameters:
+        sort, dir, cursor, per_page: Ordering and paging (see ``datatable.py``)
+        id, status, job_id, applicant_id: Column filters
+        format (str): 'json' for a JSON response
     
     Returns:
-        Rendered template with list of all applications
+        Rendered template with a page of applications, or JSON
         
     Side Effects:
         - Logs access to application management
-        - Retrieves all applications from database
         
     Example:
-        /admin/applications
+        /admin/applications?status=pending&sort=application_date
     """
-    logger.info(f"Admin {session['user_id']} accessed the applications management page")
-    applications = Application.query.all()
-    logger.info(f"Retrieved {len(applications)} applications for admin view")
-    return render_template('admin/applications.html', applications=applications)
+    access_logger.info("Admin %s accessed the applications management page", session['user_id'])
+    page = _table_page(admin_application_listing(), APPLICATION_COLUMNS, Application.id)
+    if wants_json(request.args):
+        return jsonify(page.to_json())
+    return render_template('admin/applications.html', page=page, applications=page.items)
 
 @admin_bp.route('/applications/<int:application_id>/update', methods=['POST'])
 @login_required
@@ -379,6 +472,7 @@ def admin_update_application(application_id):
         
     Side Effects:
         - Updates application status in database
+        - Records the status change for the applicant's digest (see digests.py)
         - Validates status against allowed values
         - Logs admin actions
         - Flashes success/error messages
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort
 from flask_bcrypt import Bcrypt
 from models import db, User
 from forms import RegistrationForm, LoginForm, ProfileForm
@@ -7,7 +7,11 @@ import os
 import uuid
 from werkzeug.utils import secure_filename
 from PIL import Image
-from utils import logger, ALLOWED_PIC_EXTENSIONS, save_profile_picture
+from utils import logger, ALLOWED_PIC_EXTENSIONS
+from instrumentation import query_budget
+from user_context import get_current_user
+from passwords import PasswordHasherBusy
+from image_pipeline import InvalidImageError, submit_profile_picture
 
 auth = Blueprint('auth', __name__)
 
@@ -131,6 +135,10 @@ def register():
             logger.info(f"New user registered: {form.email.data}")
             flash('Registration successful! Please login.', 'success')
             return redirect(url_for('auth.login'))
+        except PasswordHasherBusy:
+            db.session.rollback()
+            logger.warning(f"Registration for {form.email.data} rejected: password hashing at capacity")
+            raise
         except Exception as e:
             db.session.rollback()
             logger.error(f"Registration failed: {str(e)}")
@@ -147,6 +155,7 @@ def register():
     return render_template('register.html', form=form)
 
 @auth.route('/login', methods=['GET', 'POST'])
+@query_budget(3)
 def login():
     """
     Handle user authentication.
@@ -156,6 +165,8 @@ def login():
         
     Side Effects:
         - Sets session variables if authentication succeeds
+        - Rehashes the password if it was stored with another bcrypt cost
+        - Responds 429 when too many password checks are in flight
         - Logs login attempts (success/failure)
         - Flashes success/error messages
         - Handles 'next' parameter for redirect after login
@@ -170,6 +181,10 @@ def login():
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
         if user and user.check_password(form.password.data):
+            if user.password_needs_rehash():
+                user.set_password(form.password.data)
+                db.session.commit()
+                logger.info(f"Rehashed password for user {user.id} with the current bcrypt cost")
             session['user_id'] = user.id
             session['role'] = user.role
             logger.info(
@@ -218,7 +233,7 @@ def profile():
         
     Side Effects:
         - Updates user profile if validation passes
-        - Handles profile picture uploads
+        - Queues profile picture uploads for background resizing
         - Prevents duplicate username/email
         - Logs profile changes
         - Flashes success/error messages
@@ -227,7 +242,7 @@ def profile():
         /profile
     """
     form = ProfileForm()
-    user = db.get_or_404(User, session['user_id'])
+    user = get_current_user() or abort(404)
 
     if form.validate_on_submit():
         # Check for username/email conflicts (excluding current user)
@@ -262,8 +277,15 @@ def profile():
             if allowed_pic_file(form.profile_picture.data.filename):
                 logger.info(
                     f"Processing profile picture upload for user {user.id}")
-                picture_file = save_profile_picture(form.profile_picture.data)
-                user.profile_picture = picture_file
+                try:
+                    picture = submit_profile_picture(user.id, form.profile_picture.data)
+                except InvalidImageError as e:
+                    logger.warning(
+                        f"Rejected profile picture upload by user {user.id}: {str(e)}")
+                    flash('The profile picture could not be read or is too large.', 'danger')
+                    return render_template('profile.html', form=form, user=user)
+                if not picture.done():
+                    flash('Your new profile picture is being processed and will appear shortly.', 'info')
             else:
                 logger.warning(
                     f"Invalid profile picture upload attempt by user {user.id} - unsupported file type")
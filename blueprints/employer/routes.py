@@ -9,10 +9,12 @@ This module contains all routes related to employer functionality including:
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from models import db, Job, Application, User
 from forms import JobForm
-from utils import logger, save_company_logo
+from utils import logger, access_logger, save_company_logo
 from blueprints.auth.routes import login_required, role_required
+from queries import job_application_listing
 from werkzeug.utils import secure_filename
 import os
+from instrumentation import query_budget
 
 employer_bp = Blueprint('employer', __name__)
 
@@ -131,6 +133,7 @@ def new_job():
 @employer_bp.route('/my_jobs')
 @login_required
 @role_required('employer', 'admin')
+@query_budget(3)
 def my_jobs():
     """Display all jobs posted by the current employer/admin.
 
@@ -144,19 +147,17 @@ def my_jobs():
     Example:
         /my_jobs
     """
-    logger.info(f"User {session['user_id']} accessing their posted jobs")
+    access_logger.info("User %s accessing their posted jobs", session['user_id'])
+    # Application counts are read from the denormalized Job counter columns
     jobs = Job.query.filter_by(poster_id=session['user_id']).all()
-    # Get application counts for each job
-    # for job in jobs:
-    #     job.application_count = Application.query.filter_by(
-    #         job_id=job.id).count()
-    logger.info(f"Found {len(jobs)} jobs posted by user {session['user_id']}")
+    access_logger.info("Found %d jobs posted by user %s", len(jobs), session['user_id'])
     return render_template('my_jobs.html', jobs=jobs, form=JobForm())
 
 
 @employer_bp.route('/jobs/<int:job_id>/applications')
 @login_required
 @role_required('employer', 'admin')
+@query_budget(3)
 def job_applications(job_id):
     """Display applications for a specific job.
 
@@ -173,8 +174,7 @@ def job_applications(job_id):
     Example:
         /jobs/42/applications
     """
-    logger.info(
-        f"User {session['user_id']} accessing applications for job {job_id}")
+    access_logger.info("User %s accessing applications for job %s", session['user_id'], job_id)
     job = db.get_or_404(Job, job_id)
     # Only allow access if user is admin or the job poster
     if session['role'] != 'admin' and job.poster_id != session['user_id']:
@@ -183,8 +183,8 @@ def job_applications(job_id):
         flash('You do not have permission to view these applications.', 'danger')
         return redirect(url_for('employer.my_jobs'))
 
-    applications = Application.query.filter_by(job_id=job.id).all()
-    logger.info(f"Found {len(applications)} applications for job {job_id}")
+    applications = job_application_listing(job.id).all()
+    access_logger.info("Found %d applications for job %s", len(applications), job_id)
     return render_template('job_applications.html', job=job, applications=applications)
 
 
@@ -218,12 +218,7 @@ def delete_job(job_id):
         return redirect(url_for('employer.my_jobs'))
 
     try:
-        # Delete associated applications first
-        applications = Application.query.filter_by(job_id=job.id).all()
-        for application in applications:
-            db.session.delete(application)
-
-        # Now delete the job
+        # Applications are removed by the ON DELETE CASCADE foreign key
         db.session.delete(job)
         db.session.commit()
         logger.info(
@@ -251,6 +246,7 @@ def update_application(application_id):
 
     Side Effects:
         - Updates application in database
+        - Records the status change for the applicant's digest (see digests.py)
         - Logs update attempts
         - Flashes success/error messages
 
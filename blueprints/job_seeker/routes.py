@@ -1,13 +1,16 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from models import db, Application
-from utils import logger
+from utils import logger, access_logger
 from blueprints.auth.routes import login_required, role_required
+from queries import seeker_application_listing
+from instrumentation import query_budget
 
 job_seeker_bp = Blueprint('job_seeker', __name__)
 
 @job_seeker_bp.route('/my_applications')
 @login_required
 @role_required('job_seeker')
+@query_budget(3)
 def my_applications():
     """Display all job applications submitted by the current user.
     
@@ -22,8 +25,7 @@ def my_applications():
     Example:
         /my_applications
     """
-    logger.info(f"User {session['user_id']} accessing their job applications")
-    applications = Application.query.filter_by(
-        applicant_id=session['user_id']).all()
-    logger.info(f"Found {len(applications)} applications for user {session['user_id']}")
+    access_logger.info("User %s accessing their job applications", session['user_id'])
+    applications = seeker_application_listing(session['user_id']).all()
+    access_logger.info("Found %d applications for user %s", len(applications), session['user_id'])
     return render_template('my_applications.html', applications=applications)
@@ -1,70 +1,127 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app, abort
 from models import db, Job, Application
-from utils import logger, upload_to_gcs, allowed_file
+from utils import logger, access_logger, search_logger, allowed_file
+from resume_outbox import spool_resume, enqueue_resume, dispatch_upload, discard_spooled
 from blueprints.auth.routes import login_required, role_required
 from forms import ApplicationForm
+from search import build_search_query, facet_counts, FACET_COLUMNS
+from pagination import paginate_keyset, InvalidCursor
+from instrumentation import query_budget
+from image_pipeline import picture_variant
 
 jobs_bp = Blueprint('jobs', __name__)
 
+def _search_page(args):
+    """
+    Fetch one page of a ranked full-text job search from request arguments.
+
+    Results are ordered by relevance when ``q`` is given and by
+    ``(posted_date, id)`` newest first otherwise, and paginated by keyset so
+    deep pages cost the same as the first one.
+
+    Args:
+        args: Request arguments (q, location, category, company, cursor, per_page)
+
+    Returns:
+        KeysetPage: Jobs on this page and the continuation token for the next one
+
+    Side Effects:
+        - Aborts with 400 if the cursor is invalid
+    """
+    query, rank = build_search_query(
+        q=args.get('q'),
+        location=args.get('location'),
+        category=args.get('category'),
+        company=args.get('company')
+    )
+    keys = [(Job.posted_date, True), (Job.id, True)]
+    if rank is not None:
+        keys.insert(0, (rank, False))
+
+    per_page = args.get('per_page', current_app.config['JOBS_PER_PAGE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['JOBS_MAX_PER_PAGE']))
+    try:
+        return paginate_keyset(query, keys, cursor=args.get('cursor'), per_page=per_page)
+    except InvalidCursor as e:
+        logger.warning(f"Rejected job search cursor: {str(e)}")
+        abort(400)
+
+def _next_page_url(endpoint, page):
+    """Build the URL of the page after ``page``, keeping the current filters."""
+    if not page.next_cursor:
+        return None
+    args = request.args.to_dict()
+    args['cursor'] = page.next_cursor
+    return url_for(endpoint, **args)
+
+def _requested_facets(value):
+    """Parse the ``facets`` query parameter into a tuple of facet columns."""
+    if not value or value.lower() in ('0', 'false', 'no'):
+        return ()
+    if value.lower() in ('1', 'true', 'yes', 'all'):
+        return FACET_COLUMNS
+    return tuple(name for name in FACET_COLUMNS if name in value.split(','))
+
 @jobs_bp.route('/list')
+@query_budget(3)
 def jobs_list():
+    q = request.args.get('q')
     location = request.args.get('location')
     category = request.args.get('category')
     company = request.args.get('company')
     
-    logger.info(f"Jobs page accessed with filters - location: {location}, category: {category}, company: {company}")
+    search_logger.info("Jobs page accessed with filters - q: %s, location: %s, category: %s, company: %s",
+                       q, location, category, company)
     
-    query = Job.query
-    if location:
-        query = query.filter(Job.location.ilike(f'%{location}%'))
-    if category:
-        query = query.filter(Job.category.ilike(f'%{category}%'))
-    if company:
-        query = query.filter(Job.company.ilike(f'%{company}%'))
-    jobs = query.all()
+    page = _search_page(request.args)
     
-    logger.info(f"Found {len(jobs)} jobs matching the criteria")
-    return render_template('jobs.html', jobs=jobs)
+    search_logger.info("Found %d jobs matching the criteria on this page", len(page.items))
+    return render_template('jobs.html', jobs=page.items,
+                           next_url=_next_page_url('jobs.jobs_list', page))
 
 @jobs_bp.route('/search')
+@query_budget(4)
 def search_jobs():
     """
     API endpoint for searching jobs (returns JSON).
     
     Query Parameters:
+        q (optional): Full-text query over title, description, company,
+                      category and location. Supports "quoted phrases" and
+                      -excluded terms; results are ranked by relevance
         location (optional): Filter by location
         category (optional): Filter by category
         company (optional): Filter by company
+        per_page (optional): Page size (default JOBS_PER_PAGE, capped at JOBS_MAX_PER_PAGE)
+        cursor (optional): Continuation token from a previous response's next_cursor
+        facets (optional): 'true' for category, location and company counts,
+                           or a comma-separated subset of them
+        facet_limit (optional): Top values per facet (default FACET_LIMIT)
         
     Returns:
-        JSON response with job listings matching criteria
+        JSON response with one page of job listings matching criteria, plus
+        next_cursor and next (URL of the following page, null on the last page)
+        and, when requested, facets (top-N counts for the whole filter set)
         
     Side Effects:
         - Logs search parameters
         - Logs number of results returned
         
     Example:
-        /jobs/search?location=New+York
+        /jobs/search?q=python+-django&location=New+York&per_page=50
     """
+    q = request.args.get('q')
     location = request.args.get('location')
     category = request.args.get('category')
     company = request.args.get('company')
 
-    logger.info(f"API search_jobs called with filters - location: {location}, category: {category}, company: {company}")
-
-    query = Job.query
+    search_logger.info("API search_jobs called with filters - q: %s, location: %s, category: %s, company: %s",
+                       q, location, category, company)
 
-    if location:
-        query = query.filter(Job.location.ilike(f'%{location}%'))
-    if category:
-        query = query.filter(Job.category.ilike(f'%{category}%'))
-    if company:
-        query = query.filter(Job.company.ilike(f'%{company}%'))
+    page = _search_page(request.args)
+    search_logger.info("API search_jobs returned %d results", len(page.items))
 
-    jobs = query.all()
-    logger.info(f"API search_jobs returned {len(jobs)} results")
-
-    return jsonify({
+    response = {
         'jobs': [{
             'id': job.id,
             'title': job.title,
@@ -73,11 +130,26 @@ def search_jobs():
             'category': job.category,
             'salary': job.salary,
             'company_logo': job.company_logo,
+            'company_logo_thumbnail': picture_variant(job.company_logo, 80),
             'posted_date': job.posted_date.isoformat()
-        } for job in jobs]
-    })
+        } for job in page.items],
+        'next_cursor': page.next_cursor,
+        'next': _next_page_url('jobs.search_jobs', page)
+    }
+
+    requested_facets = _requested_facets(request.args.get('facets'))
+    if requested_facets:
+        facet_limit = request.args.get('facet_limit', current_app.config['FACET_LIMIT'], type=int)
+        response['facets'] = facet_counts(
+            q=q, location=location, category=category, company=company,
+            facets=requested_facets,
+            limit=max(1, min(facet_limit, current_app.config['JOBS_MAX_PER_PAGE']))
+        )
+
+    return jsonify(response)
 
 @jobs_bp.route('/<int:job_id>')
+@query_budget(3)
 def job_detail(job_id):
     """
     Display detailed information about a specific job.
@@ -90,19 +162,16 @@ def job_detail(job_id):
         
     Side Effects:
         - Logs job detail page access
-        - For admin users, logs application count
+        - For admin users, logs application count (from Job.application_count)
         - For job seekers, checks and logs application status
         
     Example:
         /jobs/42
     """
-    logger.info(f"Job detail page accessed for job_id: {job_id}")
+    access_logger.info("Job detail page accessed for job_id: %s", job_id)
     job = db.get_or_404(Job, job_id)
-    # Add application count for admin users
     if session.get('role') == 'admin':
-        job.application_count = Application.query.filter_by(
-            job_id=job.id).count()
-        logger.info(f"Admin viewing job {job_id} with {job.application_count} applications")
+        access_logger.info("Admin viewing job %s with %d applications", job_id, job.application_count)
 
     # Check if the current user has already applied
     has_applied = False
@@ -110,7 +179,8 @@ def job_detail(job_id):
         existing_application = Application.query.filter_by(
             job_id=job_id, applicant_id=session['user_id']).first()
         has_applied = existing_application is not None
-        logger.info(f"User {session['user_id']} has {'already applied' if has_applied else 'not applied'} to job {job_id}")
+        access_logger.info("User %s has %s to job %s", session['user_id'],
+                           'already applied' if has_applied else 'not applied', job_id)
 
     return render_template('job_detail.html', job=job, has_applied=has_applied)
 
@@ -128,8 +198,9 @@ def apply_job(job_id):
         Rendered form (GET) or redirect (POST)
         
     Side Effects:
-        - Validates and saves resume file
-        - Creates application record
+        - Validates and spools the resume file to local disk
+        - Creates application record and its resume upload outbox row
+          (see resume_outbox.py); the upload to storage happens after commit
         - Prevents duplicate applications
         - Logs application attempts and results
         - Flashes success/error messages
@@ -148,61 +219,37 @@ def apply_job(job_id):
         return redirect(url_for('jobs.job_detail', job_id=job_id))
 
     if form.validate_on_submit():
-        resume_path_for_db = None # Will store GCS object name or None
-        gcs_upload_successful = True # Assume success if no file or GCS disabled
+        spooled = None # (storage key, spool path) of the resume, if one was uploaded
         try:
-            # --- Handle Resume Upload ---
+            # --- Spool the Resume; the Outbox Worker Uploads It After Commit ---
             resume_file = form.resume.data
             if resume_file:
-                # Check config if GCS should be used
-                enable_gcs = current_app.config.get('ENABLE_GCS_UPLOAD', False)
-                gcs_bucket_name = current_app.config.get('GCS_BUCKET_NAME')
-
-                if enable_gcs and gcs_bucket_name:
-                    logger.info(f"Attempting GCS upload for application to job {job_id} by user {session['user_id']}")
-                    # Attempt direct upload to GCS
-                    gcs_object_name = upload_to_gcs(
-                        file_storage=resume_file,
-                        user_id=session['user_id'],
-                        gcs_bucket_name=gcs_bucket_name
-                    )
-
-                    if gcs_object_name:
-                        resume_path_for_db = gcs_object_name.removeprefix('resumes/') # Store GCS path
-                        logger.info(f"GCS upload successful for job {job_id}, user {session['user_id']}. Path: {resume_path_for_db}")
-                    else:
-                        # GCS upload failed
-                        gcs_upload_successful = False
-                        logger.error(f"GCS upload failed for job {job_id}, user {session['user_id']}")
-                        flash('There was an error uploading your resume to cloud storage. Please try again.', 'danger')
-                        # Optionally, save locally as a fallback ONLY IF GCS fails?
-                        # Or just fail the application? Let's fail for now.
-                        # return render_template('apply_job.html', form=form, job=job) # Stay on page
-                else:
-                    # GCS not enabled, handle locally (or disallow?)
-                    # For now, let's log a warning and not save the resume if GCS isn't enabled
-                    logger.warning(f"Resume provided for job {job_id}, user {session['user_id']}, but GCS upload is disabled or bucket not configured. Resume not saved.")
-                    # Optionally flash a message to the user
-                    # flash('Resume upload is currently disabled.', 'info')
-                    # resume_path_for_db = None # Explicitly set to None
-
-            # --- Create Application Record (only if GCS upload was successful or no resume) ---
-            if gcs_upload_successful:
-                application = Application(
-                    job_id=job_id,
-                    applicant_id=session['user_id'],
-                    resume_path=resume_path_for_db, # Store GCS path or None
-                    status='applied' # Changed from 'pending' to 'applied'
-                )
-                db.session.add(application)
-                db.session.commit()
-                logger.info(f"User {session['user_id']} successfully applied to job {job_id}. Resume path (GCS): {resume_path_for_db}")
-                flash('Your application has been submitted!', 'success')
-                return redirect(url_for('job_seeker.my_applications'))
-            # else: GCS upload failed, already flashed message, stay on page
+                logger.info(f"Spooling resume for application to job {job_id} by user {session['user_id']}")
+                spooled = spool_resume(resume_file, session['user_id'])
+                if spooled is None:
+                    logger.error(f"Resume upload failed for job {job_id}, user {session['user_id']}")
+                    flash('There was an error uploading your resume. Please try again.', 'danger')
+                    return render_template('apply_job.html', form=form, job=job)
+
+            # --- Create Application Record (and Its Upload, in One Transaction) ---
+            application = Application(
+                job_id=job_id,
+                applicant_id=session['user_id'],
+                status='applied' # Changed from 'pending' to 'applied'
+            )
+            db.session.add(application)
+            upload = enqueue_resume(application, *spooled, resume_file.mimetype) if spooled else None
+            db.session.commit()
+            logger.info(f"User {session['user_id']} successfully applied to job {job_id}. Resume path: {application.resume_path}")
+            if upload is not None:
+                dispatch_upload(upload.id)
+            flash('Your application has been submitted!', 'success')
+            return redirect(url_for('job_seeker.my_applications'))
 
         except Exception as e:
             db.session.rollback()
+            if spooled:
+                discard_spooled(spooled[1])
             logger.error(f"Error processing application for job {job_id}, user {session['user_id']}: {str(e)}")
             flash('An unexpected error occurred while submitting your application.', 'danger')
             
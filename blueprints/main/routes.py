@@ -6,18 +6,20 @@ This module contains core application routes including:
 - Static pages
 """
 
-from flask import Blueprint, render_template, redirect, url_for, flash, current_app
-from flask_mail import Message
+from flask import Blueprint, render_template, redirect, url_for, flash
 import os
 from forms import ContactForm
-from utils import logger
+from utils import logger, access_logger
 from models import Job
-from extensions import mail
-import time
+from stats import top_categories
+from extensions import db
+from mail_outbox import queue_email, dispatch_mail
+from instrumentation import query_budget
 
 main = Blueprint('main', __name__)
 
 @main.route('/')
+@query_budget(3)
 def index():
     """Display the application home page with featured jobs and categories.
     
@@ -29,44 +31,33 @@ def index():
             
     Side Effects:
         - Logs home page access
-        - Queries database for jobs and categories
+        - Reads the five newest jobs and the job_category_stats summary
         
     Example:
         /
     """
-    logger.info("Home page accessed")
-    logger.info(f"Current app.root_path: {current_app.root_path}")
-    logger.info(f"Current app.template_folder: {current_app.template_folder}")
-    # Get featured jobs (most recent jobs)
-    featured_jobs = Job.query.order_by(Job.posted_date.desc()).limit(5).all()
+    access_logger.info("Home page accessed")
+    # Get featured jobs (most recent jobs) straight off the (posted_date, id) index
+    featured_jobs = Job.query.order_by(Job.posted_date.desc(), Job.id.desc()).limit(5).all()
 
-    # Count jobs by category
-    job_categories = {}
-    jobs = Job.query.all()
-    for job in jobs:
-        if job.category in job_categories:
-            job_categories[job.category] += 1
-        else:
-            job_categories[job.category] = 1
-
-    # Sort categories by count (descending)
-    sorted_categories = sorted(job_categories.items(), key=lambda x: x[1], reverse=True)
+    # Category counts come from the incrementally maintained summary table
+    sorted_categories = top_categories()
 
     return render_template('index.html', featured_jobs=featured_jobs, job_categories=sorted_categories)
 
 @main.route('/about')
 def about():
-    logger.info("About page accessed")
+    access_logger.info("About page accessed")
     return render_template('about.html')
 
 @main.route('/privacy')
 def privacy():
-    logger.info("Privacy policy page accessed")
+    access_logger.info("Privacy policy page accessed")
     return render_template('privacy.html', current_date='April 12, 2025')
 
 @main.route('/terms')
 def terms():
-    logger.info("Terms of service page accessed")
+    access_logger.info("Terms of service page accessed")
     return render_template('terms.html', current_date='April 12, 2025')
 
 @main.route('/contact', methods=['GET', 'POST'])
@@ -82,7 +73,7 @@ def contact():
         POST: Redirect to home page with success message
         
     Side Effects:
-        - Sends email to configured contact address
+        - Queues an email to the configured contact address in the mail outbox
         - Logs contact attempts
         - Flashes success/error messages
         
@@ -90,7 +81,7 @@ def contact():
         POST /contact
         Form Data: {'name': 'John', 'email': 'john@example.com', 'message': 'Hello'}
     """
-    logger.info("Contact page accessed")
+    access_logger.info("Contact page accessed")
     form = ContactForm()
     if form.validate_on_submit():
         name = form.name.data
@@ -101,34 +92,21 @@ def contact():
         logger.info(f"Contact form submitted by {name} <{email}> with subject: {subject}")
 
         try:
-            msg = Message(
+            # Queued in the outbox; the mail sender delivers it (see mail_outbox.py)
+            queue_email(
                 subject=f"Job Portal Contact: {subject}",
-                sender=mail.default_sender,
                 recipients=[os.getenv('CONTACT_EMAIL_RECIPIENT')],
                 body=f"From: {name} <{email}>\n\n{message_body}"
             )
-            
-            # Add retry logic for email sending
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    mail.send(msg)
-                    logger.info(f"Contact email sent successfully from {email} (attempt {attempt + 1})")
-                    flash('Your message has been sent! We will get back to you soon.', 'success')
-                    break
-                except Exception as e:
-                    if attempt == max_retries - 1:  # Last attempt failed
-                        logger.error(f"Failed to send contact email after {max_retries} attempts: {str(e)}")
-                        flash('An error occurred while sending your message. Please try again later.', 'danger')
-                    else:
-                        logger.warning(f"Email send attempt {attempt + 1} failed, retrying...")
-                        time.sleep(1)  # Wait before retrying
-                        continue
-            
+            db.session.commit()
+            logger.info(f"Contact email from {email} queued for sending")
+            dispatch_mail()
+            flash('Your message has been sent! We will get back to you soon.', 'success')
             return redirect(url_for('main.contact'))
         except Exception as e:
-            logger.error(f"Failed to send contact email from {email}: {str(e)}")
-            flash(f'An error occurred while sending your message: {e}', 'danger')
+            db.session.rollback()
+            logger.error(f"Failed to queue contact email from {email}: {str(e)}")
+            flash('An error occurred while sending your message. Please try again later.', 'danger')
 
     # Log form validation errors
     if form.errors:
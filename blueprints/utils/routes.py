@@ -6,10 +6,15 @@ This module contains utility endpoints for:
 - System status checks
 """
 
-from flask import Blueprint, send_file, abort, session, current_app
-from models import Application, Job, db
-from google.cloud import storage
-import io
+import mimetypes
+from flask import Blueprint, send_file, abort, session, current_app, request
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+from models import Application, Job, ResumeUpload, db
+from file_storage import get_resume_storage
+from itsdangerous import BadSignature
+from resume_cache import open_cached_resume
+from resume_delivery import local_signer, offload_resume
 from utils import logger # Keep logger
 from blueprints.auth.routes import login_required
 import os # Keep os if needed for other parts, but not for path joining here
@@ -20,20 +25,22 @@ utils_bp = Blueprint('utils', __name__)
 @login_required
 def serve_resume(cs_suffix):
     """
-    Securely serve resume files, checking local storage first, then GCS.
+    Securely serve resume files, checking local disk first, then the storage backend.
 
     Args:
         cs_suffix (str): The suffix of the GCS object name or local path
                           (e.g., 'user_id/filename.pdf').
 
     Returns:
-        file: The requested resume file streamed from local disk or GCS.
+        file: The requested resume file streamed from local disk or the storage backend,
+              or an X-Accel-Redirect/X-Sendfile/signed-URL response when
+              RESUME_DELIVERY offloads the transfer (see resume_delivery.py).
         abort: 403 if unauthorized, 404 if not found, 500 on error.
         
     Side Effects:
         - Logs all access attempts
         - Verifies user permissions
-        - Handles local/GCS file retrieval
+        - Handles local/storage backend file retrieval
         
     Access Rules:
         - Admins: Can access any resume
@@ -82,12 +89,27 @@ def serve_resume(cs_suffix):
         logger.info(f"Applicant {user_id} accessing their own resume for application {application.id} (Path: {gcs_object_name})")
     # --- End Permission Checks ---
 
+    # --- Not Uploaded Yet: Serve the Spooled Copy (see resume_outbox.py) ---
+    if application.resume_pending:
+        upload = ResumeUpload.query.filter_by(application_id=application.id).first()
+        if upload is None or not os.path.exists(upload.spool_path):
+            logger.warning(f"Spooled resume missing for application {application.id} (Path: {gcs_object_name})")
+            abort(404)
+        logger.info(f"Serving resume file '{cs_suffix}' from the upload spool.")
+        return send_file(upload.spool_path, download_name=os.path.basename(cs_suffix), as_attachment=True)
+
+    # --- Hand the Transfer to the Proxy or Object Store, if Configured ---
+    offloaded = offload_resume(get_resume_storage(), cs_suffix, os.path.basename(cs_suffix))
+    if offloaded is not None:
+        logger.info(f"Resume file {gcs_object_name} offloaded ({current_app.config['RESUME_DELIVERY']}).")
+        return offloaded
+
     # --- Attempt to Serve Locally First ---
     # Construct the expected local path based on the suffix
-    expected_local_path = os.path.join(current_app.config['UPLOAD_FOLDER'], cs_suffix)
+    expected_local_path = safe_join(current_app.config['RESUME_STORAGE_DIR'], cs_suffix)
     logger.debug(f"Checking for local resume file at: {expected_local_path}")
 
-    if os.path.exists(expected_local_path):
+    if expected_local_path and os.path.exists(expected_local_path):
         try:
             logger.info(f"Serving resume file '{cs_suffix}' from local storage.")
             # Extract original filename for download prompt
@@ -101,42 +123,120 @@ def serve_resume(cs_suffix):
             logger.error(f"Error serving local file '{expected_local_path}': {str(e)}")
             # Fall through to try GCS if configured, or abort if not an expected error
 
-    logger.info(f"Resume file '{cs_suffix}' not found locally. Attempting GCS fetch.")
+    logger.info(f"Resume file '{cs_suffix}' not found locally. Attempting storage backend fetch.")
 
-    # --- If Not Found Locally, Attempt to Fetch from GCS ---
-    enable_gcs = current_app.config.get('ENABLE_GCS_UPLOAD', False)
-    gcs_bucket_name = current_app.config.get('GCS_BUCKET_NAME')
+    # --- If Not Found Locally, Stream from the Storage Backend ---
+    storage = get_resume_storage()
+    try:
+        # The only metadata request; the content is fetched while streaming
+        stored = storage.stat(cs_suffix)
+    except FileNotFoundError:
+        logger.warning(f"Resume file not found locally or in storage: {gcs_object_name}")
+        abort(404)
+    except Exception as e:
+        logger.error(f"Error retrieving file '{gcs_object_name}' from storage after local check failed: {str(e)}")
+        abort(500) # Internal server error during storage fetch
 
-    if not enable_gcs or not gcs_bucket_name:
-        logger.warning(f"Local file '{cs_suffix}' not found and GCS is not enabled or configured. Cannot serve resume.")
-        abort(404) # Not found locally, GCS disabled -> 404
+    logger.info(f"Resume file {gcs_object_name} ({stored.size} bytes) found in storage, streaming.")
+    try:
+        reader, stored = _open_resume(storage, stored)
+    except FileNotFoundError:
+        logger.warning(f"Resume file deleted while opening it: {gcs_object_name}")
+        abort(404)
+    return _stream_resume(reader, stored, os.path.basename(cs_suffix))
+
+
+@utils_bp.route('/resume/signed/<token>')
+def serve_signed_resume(token):
+    """
+    Serve a resume from a URL signed by the local stand-in signer.
 
+    The token is the authorization: it is only issued by ``serve_resume``
+    after its permission checks (``RESUME_DELIVERY = 'signed-url'`` with
+    ``RESUME_URL_SIGNER = 'local'``) and expires after
+    ``RESUME_SIGNED_URL_TTL`` seconds, like a signed bucket URL.
+
+    Args:
+        token (str): Token from ``resume_delivery.LocalURLSigner.sign``
+
+    Returns:
+        Response: The streamed file (see ``_stream_resume``)
+        abort: 403 if the token is invalid or expired, 404 if not found
+    """
+    try:
+        key, download_name = local_signer().unsign(token, current_app.config['RESUME_SIGNED_URL_TTL'])
+    except BadSignature as e:
+        logger.warning(f"Rejected signed resume URL: {str(e)}")
+        abort(403)
+    storage = get_resume_storage()
+    try:
+        stored = storage.stat(key)
+    except FileNotFoundError:
+        logger.warning(f"Signed resume URL for missing file: {key}")
+        abort(404)
     try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(gcs_bucket_name)
-        # Use the gcs_object_name derived earlier for GCS path
-        blob = bucket.blob(gcs_object_name)
+        reader, stored = _open_resume(storage, stored)
+    except FileNotFoundError:
+        logger.warning(f"Signed resume URL for a file deleted while opening it: {key}")
+        abort(404)
+    return _stream_resume(reader, stored, download_name)
 
-        if not blob.exists():
-            logger.warning(f"Resume file not found locally or in GCS: {gcs_object_name}")
-            abort(404)
 
-        # Download blob content into memory
-        file_bytes = blob.download_as_bytes()
-        file_stream = io.BytesIO(file_bytes)
+def _open_resume(storage, stored):
+    """
+    Open a stored resume from the local disk cache, or straight from storage without one.
 
-        # Extract original filename for download prompt
-        original_filename = os.path.basename(cs_suffix) # Get 'filename.pdf' from '123/filename.pdf'
+    Reads are pinned to the version ``stored`` describes. If the resume was
+    replaced after ``stat``, it is looked up once more so the body always
+    matches the ETag and length sent with it.
 
-        logger.info(f"Resume file {gcs_object_name} successfully retrieved from GCS and serving.")
-        # Send the file from the in-memory stream
-        return send_file(
-            file_stream,
-            download_name=original_filename, # Suggests filename to browser
-            as_attachment=True # Force download prompt
-            # mimetype can be set explicitly if needed, e.g., 'application/pdf'
-        )
+    Returns:
+        tuple: (binary file object, StoredObject it matches)
 
-    except Exception as e:
-        logger.error(f"Error retrieving file '{gcs_object_name}' from GCS after local check failed: {str(e)}")
-        abort(500) # Internal server error during GCS fetch
+    Raises:
+        FileNotFoundError: The resume was deleted meanwhile
+    """
+    chunk_size = current_app.config['RESUME_CHUNK_SIZE']
+    try:
+        return open_cached_resume(storage, stored) or storage.open(stored.key, stored, chunk_size=chunk_size), stored
+    except FileNotFoundError:
+        stored = storage.stat(stored.key)
+        return open_cached_resume(storage, stored) or storage.open(stored.key, stored, chunk_size=chunk_size), stored
+
+
+def _stream_resume(reader, stored, download_name):
+    """
+    Build a streamed, conditional and range-aware download response.
+
+    The body is ``reader``, a seekable file object over the resume, read in
+    ``RESUME_CHUNK_SIZE`` pieces, so memory per download stays constant and
+    the first byte goes out before the rest is fetched. ``make_conditional``
+    answers ``If-None-Match``/``If-Modified-Since`` with 304 (the body is
+    never read) and a ``Range`` with 206 by seeking the reader, so only the
+    requested bytes are fetched; an unsatisfiable range raises 416.
+
+    Args:
+        reader: Binary file object from ``_open_resume``
+        stored (StoredObject): Result of ``storage.stat``
+        download_name (str): File name suggested to the browser
+
+    Returns:
+        Response: 200, 206 or 304 response
+    """
+    chunk_size = current_app.config['RESUME_CHUNK_SIZE']
+    response = current_app.response_class(
+        wrap_file(request.environ, reader, buffer_size=chunk_size),
+        mimetype=stored.content_type or mimetypes.guess_type(download_name)[0] or 'application/octet-stream',
+        direct_passthrough=True)
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    response.content_length = stored.size
+    response.accept_ranges = 'bytes'  # werkzeug only sets it on range requests
+    response.set_etag(stored.etag)
+    response.last_modified = stored.updated
+    response.cache_control.private = True
+    response.cache_control.no_cache = True  # revalidate with the ETag on every download
+    try:
+        return response.make_conditional(request, accept_ranges=True, complete_length=stored.size)
+    except Exception:
+        response.close()
+        raise
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from utils import UPLOAD_FOLDER, COMPANY_LOGOS_FOLDER, PROFILE_UPLOAD_FOLDER, ALLOWED_EXTENSIONS, ALLOWED_IMAGE_EXTENSIONS, ALLOWED_RESUME_EXTENSIONS, ALLOWED_PIC_EXTENSIONS
 
@@ -18,6 +19,15 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
+    # Mail outbox (see mail_outbox.py); 0 workers sends inline after commit
+    MAIL_OUTBOX_WORKERS = int(os.environ.get('MAIL_OUTBOX_WORKERS', 1))
+    MAIL_BATCH_SIZE = int(os.environ.get('MAIL_BATCH_SIZE', 50))
+    MAIL_MAX_ATTEMPTS = int(os.environ.get('MAIL_MAX_ATTEMPTS', 6))
+    MAIL_RETRY_SECONDS = int(os.environ.get('MAIL_RETRY_SECONDS', 60))
+    MAIL_POLL_SECONDS = int(os.environ.get('MAIL_POLL_SECONDS', 30))
+    # Applicant status digests (see digests.py)
+    STATUS_DIGEST_MINUTES = int(os.environ.get('STATUS_DIGEST_MINUTES', 60))
+    EMPLOYER_DIGEST_HOURS = int(os.environ.get('EMPLOYER_DIGEST_HOURS', 24))
     
     # File upload settings
     UPLOAD_FOLDER = UPLOAD_FOLDER
@@ -26,9 +36,65 @@ class Config:
     ALLOWED_EXTENSIONS = ALLOWED_EXTENSIONS
     ALLOWED_IMAGE_EXTENSIONS = ALLOWED_IMAGE_EXTENSIONS
     
+    # Job listing pagination
+    JOBS_PER_PAGE = int(os.environ.get('JOBS_PER_PAGE', 20))
+    JOBS_MAX_PER_PAGE = int(os.environ.get('JOBS_MAX_PER_PAGE', 100))
+    
+    # Admin table pagination
+    ADMIN_PER_PAGE = int(os.environ.get('ADMIN_PER_PAGE', 50))
+    ADMIN_MAX_PER_PAGE = int(os.environ.get('ADMIN_MAX_PER_PAGE', 200))
+    
+    # Search facets
+    FACET_LIMIT = int(os.environ.get('FACET_LIMIT', 10))
+    FACET_CACHE_TTL = int(os.environ.get('FACET_CACHE_TTL', 300))
+    FACET_CACHE_SIZE = int(os.environ.get('FACET_CACHE_SIZE', 1024))
+    
+    # Profile picture pipeline (see image_pipeline.py); 0 workers renders inline
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+    PROFILE_PICTURE_FORMAT = os.environ.get('PROFILE_PICTURE_FORMAT', 'WEBP')
+    PROFILE_PICTURE_MAX_PIXELS = int(os.environ.get('PROFILE_PICTURE_MAX_PIXELS', 40_000_000))
+    # Raw uploads and variants being rendered; keep it out of static/
+    IMAGE_STAGING_DIR = os.environ.get(
+        'IMAGE_STAGING_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'image_staging'))
+    
+    # Password hashing (see passwords.py)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_MAX_IN_FLIGHT = int(os.environ.get('PASSWORD_MAX_IN_FLIGHT', 16))
+    
+    # Logged-in user fields shown by templates (see user_context.py); 0 disables
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 4096))
+    
     # GCS Configuration
     GCS_BUCKET_NAME = os.environ.get('GCS_BUCKET_NAME')
     ENABLE_GCS_UPLOAD = os.environ.get('ENABLE_GCS_UPLOAD', 'False').lower() == 'true'
+    # Resume storage (see file_storage.py): 'local', 'gcs' or 'fake' (in-process bucket)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND') or (
+        'gcs' if ENABLE_GCS_UPLOAD and GCS_BUCKET_NAME else 'local')
+    # Root of the 'local' backend; outside static/ so resumes are only served through serve_resume
+    RESUME_STORAGE_DIR = os.environ.get(
+        'RESUME_STORAGE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'resumes'))
+    # Bytes fetched from storage per read while streaming a resume download
+    RESUME_CHUNK_SIZE = int(os.environ.get('RESUME_CHUNK_SIZE', 256 * 1024))
+    # How serve_resume hands over the bytes once access is checked (see resume_delivery.py):
+    # 'stream', 'x-accel-redirect' (nginx), 'x-sendfile' or 'signed-url'
+    RESUME_DELIVERY = os.environ.get('RESUME_DELIVERY', 'stream')
+    RESUME_ACCEL_PREFIX = os.environ.get('RESUME_ACCEL_PREFIX', '/protected-resumes/')
+    RESUME_SIGNED_URL_TTL = int(os.environ.get('RESUME_SIGNED_URL_TTL', 300))
+    # 'gcs' signs bucket URLs; 'local' signs tokens for utils.serve_signed_resume
+    RESUME_URL_SIGNER = os.environ.get('RESUME_URL_SIGNER') or ('gcs' if STORAGE_BACKEND == 'gcs' else 'local')
+    # Local disk cache of resumes from remote storage (see resume_cache.py); 0 bytes disables it.
+    # The byte budget bounds the whole directory, shared by all worker processes
+    RESUME_CACHE_DIR = os.environ.get('RESUME_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'job_portal_resume_cache'))
+    RESUME_CACHE_BYTES = int(os.environ.get('RESUME_CACHE_BYTES', 512 * 1024 * 1024))
+    # Resume upload outbox (see resume_outbox.py); 0 workers uploads inline after commit
+    RESUME_SPOOL_DIR = os.environ.get(
+        'RESUME_SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'resume_spool'))
+    RESUME_UPLOAD_WORKERS = int(os.environ.get('RESUME_UPLOAD_WORKERS', 1))
+    RESUME_UPLOAD_MAX_ATTEMPTS = int(os.environ.get('RESUME_UPLOAD_MAX_ATTEMPTS', 8))
+    RESUME_UPLOAD_RETRY_SECONDS = int(os.environ.get('RESUME_UPLOAD_RETRY_SECONDS', 30))
+    RESUME_UPLOAD_POLL_SECONDS = int(os.environ.get('RESUME_UPLOAD_POLL_SECONDS', 60))
     
     # Security
     SESSION_COOKIE_HTTPONLY = True
@@ -41,8 +107,21 @@ class Config:
     DEBUG = False
     TESTING = False
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    # Fraction of records kept for high-volume loggers (see logging_config.py)
+    LOG_SAMPLE_RATES = {
+        'job_portal.access': float(os.environ.get('LOG_ACCESS_SAMPLE_RATE', 0.1)),
+        'job_portal.search': float(os.environ.get('LOG_SEARCH_SAMPLE_RATE', 0.1)),
+    }
+    # Per-request query counting (see instrumentation.py)
+    QUERY_INSTRUMENTATION = os.environ.get('QUERY_INSTRUMENTATION', 'True').lower() == 'true'
+    QUERY_BUDGET_STRICT = False # Log budget overruns instead of failing the request
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))
+    # Periodic jobs, run by one elected process (see scheduler.py)
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'True').lower() == 'true'
+    SCHEDULER_LEASE_SECONDS = int(os.environ.get('SCHEDULER_LEASE_SECONDS', 60))
     SCHEDULER_INTERVAL_MINUTES = int(os.environ.get('SCHEDULER_INTERVAL_MINUTES', 15))
-    SCHEDULER_INITIALIZED = False # No longer used by app factory
+    SCHEDULER_REPAIR_HOURS = int(os.environ.get('SCHEDULER_REPAIR_HOURS', 24))
+    SCHEDULER_HISTORY_DAYS = int(os.environ.get('SCHEDULER_HISTORY_DAYS', 30))
 
 
 class DevelopmentConfig(Config):
@@ -52,6 +131,7 @@ class DevelopmentConfig(Config):
     # REMEMBER_COOKIE_SECURE = False
     PREFERRED_URL_SCHEME = 'http'
     LOG_LEVEL = 'DEBUG'
+    LOG_SAMPLE_RATES = {} # Keep every record locally
 
 class ProductionConfig(Config):
     # Production specific settings (already mostly covered by base Config)
@@ -70,6 +150,18 @@ class TestingConfig(Config):
     REMEMBER_COOKIE_SECURE = False
     PREFERRED_URL_SCHEME = 'http'
     DEBUG = False # Ensure debug is off even in testing unless needed
+    QUERY_BUDGET_STRICT = True # Fail tests when a route exceeds its query budget
+    LOG_SAMPLE_RATES = {} # Deterministic logs in tests
+    BCRYPT_LOG_ROUNDS = 4 # Minimum cost keeps password hashing fast in tests
+    IMAGE_WORKERS = 0 # Render profile pictures inline so tests see the result
+    IMAGE_STAGING_DIR = os.path.join(tempfile.gettempdir(), 'job_portal_test_image_staging')
+    STORAGE_BACKEND = 'fake' # In-memory bucket: exercises the GCS code path offline
+    RESUME_URL_SIGNER = 'local' # Stand-in signer: no service account needed
+    RESUME_CACHE_BYTES = 0 # Fake bucket generations restart each run; cache tests use tmp_path
+    RESUME_SPOOL_DIR = os.path.join(tempfile.gettempdir(), 'job_portal_test_resume_spool')
+    RESUME_UPLOAD_WORKERS = 0 # Upload spooled resumes inline so tests see them in storage
+    MAIL_OUTBOX_WORKERS = 0 # Send queued mail inline (Flask-Mail suppresses sending under TESTING)
+    SCHEDULER_ENABLED = False # Tests start schedulers explicitly
 
 
 class DevelopmentTestingConfig(TestingConfig):
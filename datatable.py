@@ -0,0 +1,225 @@
+"""
+Server-side data tables for the admin pages.
+
+A ``DataTable`` wraps a listing query with:
+
+- Paging: keyset pagination (see ``pagination.py``), so memory and time per
+  request stay bounded however large the table is
+- Sorting: only on columns declared sortable, which should be indexed; the
+  primary key is always appended as a tie-breaker
+- Filtering: per-column ``prefix`` (index-friendly ``LIKE 'x%'``) or
+  ``exact`` matches
+- JSON mode: ``?format=json`` returns the page as rows of column values
+
+Request arguments:
+    sort (str): Column to sort by (must be sortable)
+    dir (str): 'asc' or 'desc'
+    <column> (str): Filter value for a filterable column
+    cursor (str): Continuation token from the previous page
+    per_page (int): Page size (default ADMIN_PER_PAGE, capped at ADMIN_MAX_PER_PAGE)
+    format (str): 'json' for the JSON representation
+
+Usage:
+    table = DataTable(User.query, USER_COLUMNS, User.id)
+    page = table.paginate(request.args)
+"""
+
+from datetime import datetime
+
+from flask import current_app, request, url_for
+
+from pagination import paginate_keyset
+
+RESERVED_ARGS = ('sort', 'dir', 'cursor', 'per_page', 'format')
+
+
+class DataColumn:
+    """
+    A column of a data table.
+
+    Attributes:
+        name (str): Column name used in query arguments and JSON rows
+        label (str): Header text
+        expression: SQL expression to sort and filter on (optional)
+        sortable (bool): Whether the table may be sorted by this column
+        filter (str): None, 'prefix' or 'exact'
+        choices (tuple): Allowed values for an 'exact' filter (optional)
+        value (callable): Extracts the JSON value from a row (defaults to
+                          the attribute of the same name)
+    """
+
+    def __init__(self, name, label, expression=None, sortable=False, filter=None, choices=None, value=None):
+        self.name = name
+        self.label = label
+        self.expression = expression
+        self.sortable = sortable and expression is not None
+        self.filter = filter if expression is not None else None
+        self.choices = choices
+        self.value = value or (lambda row: getattr(row, name))
+
+    def parse_filter(self, raw):
+        """
+        Convert a filter argument to the value compared against the column.
+
+        Returns:
+            The filter value, or None if the column is not filterable or
+            ``raw`` is not an acceptable value for it
+        """
+        raw = (raw or '').strip()
+        if not self.filter or not raw:
+            return None
+        if self.choices and raw not in self.choices:
+            return None
+        if self.filter == 'exact' and self.expression.type.python_type is int:
+            return int(raw) if raw.isdigit() else None
+        return raw
+
+    def apply_filter(self, query, value):
+        """Restrict ``query`` to rows matching a value from ``parse_filter``."""
+        if self.filter == 'prefix':
+            return query.filter(self.expression.startswith(value, autoescape=True))
+        return query.filter(self.expression == value)
+
+
+class DataTablePage:
+    """
+    One rendered page of a data table.
+
+    Attributes:
+        table (DataTable): The table this page belongs to
+        items (list): Model instances on this page
+        sort (str): Active sort column
+        descending (bool): Active sort direction
+        filters (dict): Active filter values by column name
+        next_cursor (str): Continuation token, or None on the last page
+        per_page (int): Page size in use
+    """
+
+    def __init__(self, table, items, sort, descending, filters, next_cursor, per_page):
+        self.table = table
+        self.items = items
+        self.sort = sort
+        self.descending = descending
+        self.filters = filters
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+
+    @property
+    def columns(self):
+        return self.table.columns
+
+    def _url(self, **overrides):
+        args = {name: value for name, value in self.filters.items()}
+        args.update(sort=self.sort, dir='desc' if self.descending else 'asc')
+        if self.per_page != current_app.config['ADMIN_PER_PAGE']:
+            args['per_page'] = self.per_page
+        if wants_json(request.args):
+            args['format'] = 'json'
+        args.update(overrides)
+        return url_for(request.endpoint, **{k: v for k, v in args.items() if v is not None},
+                       **(request.view_args or {}))
+
+    def sortable(self, name):
+        """Return True if the table can be sorted by column ``name``."""
+        column = self.table._by_name.get(name)
+        return column is not None and column.sortable
+
+    def sort_url(self, name):
+        """URL sorting by ``name``; toggles direction if already sorted by it."""
+        descending = not self.descending if name == self.sort else False
+        return self._url(sort=name, dir='desc' if descending else 'asc')
+
+    @property
+    def next_url(self):
+        return self._url(cursor=self.next_cursor) if self.next_cursor else None
+
+    @property
+    def first_url(self):
+        return self._url()
+
+    @property
+    def clear_url(self):
+        """URL of the unfiltered table in its default order."""
+        return url_for(request.endpoint, **(request.view_args or {}))
+
+    def to_json(self):
+        """Serialize the page as column-value rows plus paging metadata."""
+        def serialize(value):
+            return value.isoformat() if isinstance(value, datetime) else value
+
+        return {
+            'columns': [column.name for column in self.columns],
+            'rows': [{column.name: serialize(column.value(item)) for column in self.columns}
+                     for item in self.items],
+            'sort': self.sort,
+            'dir': 'desc' if self.descending else 'asc',
+            'filters': self.filters,
+            'next_cursor': self.next_cursor,
+            'next': self.next_url,
+        }
+
+
+class DataTable:
+    """
+    Paged, sortable and filterable view over a listing query.
+
+    Args:
+        query: Base ORM query (loader options already applied)
+        columns (list[DataColumn]): Table columns in display order
+        primary_key: Primary key column used as the sort tie-breaker
+        default_sort (str): Column sorted by when none is requested
+        default_descending (bool): Default sort direction
+    """
+
+    def __init__(self, query, columns, primary_key, default_sort='id', default_descending=True):
+        self.query = query
+        self.columns = columns
+        self.primary_key = primary_key
+        self.default_sort = default_sort
+        self.default_descending = default_descending
+        self._by_name = {column.name: column for column in columns}
+
+    def paginate(self, args):
+        """
+        Fetch the page described by request arguments.
+
+        Args:
+            args: Request arguments (see module docstring)
+
+        Returns:
+            DataTablePage: The requested page
+
+        Raises:
+            InvalidCursor: If the cursor is invalid for the requested ordering
+        """
+        sort = args.get('sort')
+        if sort not in self._by_name or not self._by_name[sort].sortable:
+            sort = self.default_sort
+        direction = args.get('dir')
+        descending = self.default_descending if direction not in ('asc', 'desc') else direction == 'desc'
+
+        query = self.query
+        filters = {}
+        for column in self.columns:
+            if column.name in RESERVED_ARGS:
+                continue
+            value = column.parse_filter(args.get(column.name))
+            if value is not None:
+                query = column.apply_filter(query, value)
+                filters[column.name] = value
+
+        per_page = args.get('per_page', current_app.config['ADMIN_PER_PAGE'], type=int)
+        per_page = max(1, min(per_page, current_app.config['ADMIN_MAX_PER_PAGE']))
+
+        keys = [(self.primary_key, descending)]
+        sort_expression = self._by_name[sort].expression
+        if sort_expression is not self.primary_key:
+            keys.insert(0, (sort_expression, descending))
+        page = paginate_keyset(query, keys, cursor=args.get('cursor'), per_page=per_page,
+                               namespace=f':{sort}:{int(descending)}')
+        return DataTablePage(self, page.items, sort, descending, filters, page.next_cursor, per_page)
+
+
+def wants_json(args):
+    """Return True when the request asked for the JSON representation."""
+    return args.get('format') == 'json'
@@ -0,0 +1,203 @@
+"""
+Batched email digests.
+
+Application status changes: ``employer.update_application`` and
+``admin.admin_update_application`` (and any other ORM write to
+``Application.status``) record an ``ApplicationStatusChange`` row from an
+update hook, in the same transaction as the change, so the request does no
+extra work beyond one INSERT. ``send_status_digests`` runs every
+``STATUS_DIGEST_MINUTES`` (``flask send-status-digests``) and:
+
+1. Reads every undigested change with one query, ordered by applicant, and
+   keeps one entry per application (its current status)
+2. Loads the email templates once and renders one digest per applicant with
+   ``Template.render``, which skips the per-call template lookup and the
+   request context processors of ``render_template``
+3. Queues the digests in the mail outbox and stamps exactly the changes it
+   read ``digested_at`` in the same commit, then dispatches the outbox, which
+   sends up to ``MAIL_BATCH_SIZE`` emails per SMTP connection
+
+An applicant whose application changed five times in an interval gets one
+email listing its current status, not five.
+
+New applicants: instead of polling ``my_jobs`` and ``job_applications``,
+employers get a daily email from ``send_employer_digests``
+(``flask send-employer-digests``). One query groups the applications received
+since each employer's ``User.last_applicant_digest_at`` (or the last
+``EMPLOYER_DIGEST_HOURS`` for a first digest) by employer and job; the
+digests go through the mail outbox like the status digests, and the
+employers' cut-offs move forward in the same commit.
+
+Configuration:
+    STATUS_DIGEST_MINUTES (int): How often status digests are sent
+    EMPLOYER_DIGEST_HOURS (int): How often employer digests are sent
+"""
+
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+
+import click
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy import event, inspect
+
+from extensions import db
+from mail_outbox import queue_email, dispatch_mail
+from models import User, Job, Application, ApplicationStatusChange
+from utils import logger
+
+_changes = ApplicationStatusChange.__table__
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+@event.listens_for(Application, 'after_update')
+def _application_status_changed(mapper, connection, target):
+    history = inspect(target).attrs.status.history
+    if not history.has_changes():
+        return
+    old_status = history.deleted[0] if history.deleted else None
+    if old_status == target.status:
+        return
+    connection.execute(_changes.insert().values(
+        application_id=target.id, applicant_id=target.applicant_id,
+        old_status=old_status, new_status=target.status, changed_at=_now()))
+
+
+def _pending_status_changes():
+    """Undigested changes with their application's current status, ordered by applicant."""
+    change = ApplicationStatusChange
+    return db.session.execute(
+        sa.select(change.id, change.application_id, change.changed_at,
+                  User.id.label('user_id'), User.username, User.email,
+                  Job.title, Job.company, Application.status)
+        .select_from(change)
+        .join(Application, Application.id == change.application_id)
+        .join(Job, Job.id == Application.job_id)
+        .join(User, User.id == change.applicant_id)
+        .where(change.digested_at.is_(None))
+        .order_by(User.id, change.changed_at, change.id)).all()
+
+
+def _latest_per_application(changes):
+    """One change per application (its last), in the order of those last changes."""
+    latest = {}
+    for change in changes:
+        latest.pop(change.application_id, None)
+        latest[change.application_id] = change
+    return list(latest.values())
+
+
+def send_status_digests():
+    """
+    Email each applicant one digest of their application status changes.
+
+    Returns:
+        int: Number of digests queued
+
+    Side Effects:
+        - Queues one OutgoingEmail per applicant, marks the changes digested
+          and commits both together
+        - Dispatches the mail outbox
+    """
+    rows = _pending_status_changes()
+    if not rows:
+        return 0
+
+    env = current_app.jinja_env
+    text_template = env.get_template('emails/status_digest.txt')
+    html_template = env.get_template('emails/status_digest.html')
+    queued = 0
+    for (user_id, username, email), changes in groupby(rows, key=lambda r: (r.user_id, r.username, r.email)):
+        changes = _latest_per_application(changes)
+        subject = ('An update on your job application' if len(changes) == 1
+                   else f'Updates on {len(changes)} of your job applications')
+        queue_email(subject, [email],
+                    body=text_template.render(username=username, changes=changes),
+                    html=html_template.render(username=username, changes=changes))
+        queued += 1
+
+    # Stamp only the changes read above: ids are not committed in order, so
+    # an id range would also cover a change that commits after the query
+    db.session.execute(
+        _changes.update()
+        .where(_changes.c.id.in_([row.id for row in rows]))
+        .values(digested_at=_now()))
+    db.session.commit()
+    logger.info(f"Queued {queued} application status digests covering {len(rows)} status changes")
+    dispatch_mail()
+    return queued
+
+
+def _new_applications(since_default, until):
+    """Applications per employer and job received since each employer's last digest."""
+    since = sa.func.coalesce(User.last_applicant_digest_at, since_default)
+    return db.session.execute(
+        sa.select(User.id.label('user_id'), User.username, User.email,
+                  Job.id.label('job_id'), Job.title, Job.company,
+                  sa.func.count(Application.id).label('new_count'),
+                  sa.func.max(Application.application_date).label('latest'))
+        .select_from(Application)
+        .join(Job, Job.id == Application.job_id)
+        .join(User, User.id == Job.poster_id)
+        .where(Application.application_date > since, Application.application_date <= until)
+        .group_by(User.id, User.username, User.email, Job.id, Job.title, Job.company)
+        .order_by(User.id, sa.func.count(Application.id).desc(), Job.title)).all()
+
+
+def send_employer_digests():
+    """
+    Email each employer the number of new applicants per job since their last digest.
+
+    Returns:
+        int: Number of digests queued
+
+    Side Effects:
+        - Queues one OutgoingEmail per employer with new applicants, moves
+          their ``last_applicant_digest_at`` forward and commits both together
+        - Dispatches the mail outbox
+    """
+    # Naive UTC, like the stored application dates
+    until = _now().replace(tzinfo=None)
+    rows = _new_applications(until - timedelta(hours=current_app.config['EMPLOYER_DIGEST_HOURS']), until)
+    if not rows:
+        return 0
+
+    env = current_app.jinja_env
+    text_template = env.get_template('emails/applicant_digest.txt')
+    html_template = env.get_template('emails/applicant_digest.html')
+    employer_ids = []
+    for (user_id, username, email), jobs in groupby(rows, key=lambda r: (r.user_id, r.username, r.email)):
+        jobs = list(jobs)
+        total = sum(job.new_count for job in jobs)
+        subject = (f'1 new applicant for {jobs[0].title}' if total == 1
+                   else f'{total} new applicants for your jobs')
+        queue_email(subject, [email],
+                    body=text_template.render(username=username, jobs=jobs, total=total),
+                    html=html_template.render(username=username, jobs=jobs, total=total))
+        employer_ids.append(user_id)
+
+    db.session.execute(
+        sa.update(User).where(User.id.in_(employer_ids)).values(last_applicant_digest_at=until)
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+    logger.info(f"Queued {len(employer_ids)} employer digests covering {len(rows)} jobs")
+    dispatch_mail()
+    return len(employer_ids)
+
+
+def register_commands(app):
+    """Register the digest CLI commands on the Flask app."""
+    @app.cli.command('send-status-digests')
+    def send_status_digests_command():
+        """Email applicants a digest of their application status changes."""
+        queued = send_status_digests()
+        click.echo(f"Queued {queued} status digests.")
+
+    @app.cli.command('send-employer-digests')
+    def send_employer_digests_command():
+        """Email employers a digest of their new applicants."""
+        queued = send_employer_digests()
+        click.echo(f"Queued {queued} employer digests.")
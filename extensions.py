@@ -8,10 +8,17 @@ This module initializes all Flask extensions used throughout the application:
 - Mail: Email sending
 - CSRFProtect: Cross-Site Request Forgery protection
 
+SQLite connections are opened with foreign key enforcement on so the
+``ON DELETE CASCADE`` constraints behave as they do on PostgreSQL.
+
 Extensions are initialized without the app context to support the application factory pattern.
 They are later initialized with the app in the init_app function.
 """
 
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
@@ -25,6 +32,14 @@ mail = Mail()
 migrate = Migrate()
 csrf = CSRFProtect()
 
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """Turn on SQLite foreign key enforcement (off by default) for every new connection."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
 def init_app(app):
     """
     Initialize all Flask extensions with the application instance.
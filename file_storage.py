@@ -0,0 +1,379 @@
+"""
+Storage backends for uploaded resumes.
+
+Routes read and write resumes through one interface instead of branching on
+``ENABLE_GCS_UPLOAD`` and building a ``storage.Client()`` per call:
+
+- ``LocalStorage``: files under a directory (``RESUME_STORAGE_DIR``, kept
+  outside ``static/`` so resumes are never served without the permission
+  checks of ``serve_resume``)
+- ``GCSStorage``: objects in a Google Cloud Storage bucket under a prefix
+  (``resumes/``). The client is created once per process, on first use,
+  and shared by every request, so credentials are loaded and connections
+  are pooled only once
+- ``FakeGCSClient``: an in-process stand-in for the GCS client with the
+  same bucket/blob calls, so ``GCSStorage`` can be tested and benchmarked
+  without network access or credentials
+
+Keys are the resume paths stored in ``Application.resume_path``, e.g.
+``'42/resume.pdf'``. Missing keys raise ``FileNotFoundError`` on every
+backend.
+
+Downloads are two steps: ``stat`` makes the single metadata request (size,
+ETag, modification time) and ``open(key, stat)`` returns a seekable reader
+that fetches the content in ``chunk_size`` pieces, so a download never holds
+the whole file in memory and a ``Range`` request only fetches its bytes.
+
+Configuration:
+    STORAGE_BACKEND (str): 'local', 'gcs' or 'fake'; defaults to 'gcs' when
+        ENABLE_GCS_UPLOAD and GCS_BUCKET_NAME are set, 'local' otherwise
+    GCS_BUCKET_NAME (str): Bucket used by the 'gcs' and 'fake' backends
+
+Usage:
+    storage = get_resume_storage()
+    storage.save(f'{user_id}/{filename}', file_storage.stream, 'application/pdf')
+    data = storage.read(f'{user_id}/{filename}')
+"""
+
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote, urlencode
+
+from flask import current_app
+from google.api_core.exceptions import NotFound
+from werkzeug.security import safe_join
+
+RESUME_PREFIX = 'resumes/'
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+# Metadata from one ``stat`` call; ``handle`` is backend specific (path or blob)
+StoredObject = namedtuple('StoredObject', ['key', 'size', 'etag', 'updated', 'content_type', 'handle'])
+
+_clients_lock = threading.Lock()
+_storage_lock = threading.Lock()
+_gcs_client = None
+_fake_client = None
+
+
+class LocalStorage:
+    """
+    Files under a local directory.
+
+    Args:
+        root (str): Directory holding the files
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        path = safe_join(self.root, key)
+        if path is None:
+            raise FileNotFoundError(key)
+        return path
+
+    def local_path(self, key):
+        """Return the file path of ``key`` (it may not exist)."""
+        return self._path(key)
+
+    def save(self, key, stream, content_type=None):
+        """Write ``stream`` to ``key``, replacing any existing file atomically."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stream.seek(0)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while chunk := stream.read(65536):
+                    out.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def stat(self, key):
+        """Return the StoredObject of ``key``; the ETag derives from mtime and size."""
+        path = self._path(key)
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise FileNotFoundError(key) from None
+        return StoredObject(key, st.st_size, f'{st.st_mtime_ns:x}-{st.st_size:x}',
+                            datetime.fromtimestamp(st.st_mtime, timezone.utc), None, path)
+
+    def open(self, key, stat=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Return a seekable binary file object reading ``key``."""
+        return open(stat.handle if stat else self._path(key), 'rb', buffering=chunk_size)
+
+    def read(self, key):
+        """Return the bytes stored at ``key``."""
+        with self.open(key) as f:
+            return f.read()
+
+    def download_to_filename(self, key, filename, stat=None):
+        """Copy ``key`` (the file ``stat`` describes, if given) to the local file ``filename``."""
+        with self.open(key, stat) as src, open(filename, 'wb') as dst:
+            while chunk := src.read(65536):
+                dst.write(chunk)
+
+    def exists(self, key):
+        """Return True if ``key`` is stored."""
+        try:
+            return os.path.isfile(self._path(key))
+        except FileNotFoundError:
+            return False
+
+    def delete(self, key):
+        """Remove ``key``."""
+        os.remove(self._path(key))
+
+
+class GCSStorage:
+    """
+    Objects in a Google Cloud Storage bucket.
+
+    Args:
+        bucket: ``google.cloud.storage.Bucket`` (or a ``FakeGCSClient`` bucket)
+        prefix (str): Prepended to every key to form the object name
+    """
+
+    def __init__(self, bucket, prefix=RESUME_PREFIX):
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _blob(self, key):
+        return self.bucket.blob(f'{self.prefix}{key}')
+
+    def save(self, key, stream, content_type=None):
+        """Upload ``stream`` to ``key``."""
+        stream.seek(0)
+        self._blob(key).upload_from_file(stream, content_type=content_type)
+
+    def stat(self, key):
+        """Return the StoredObject of ``key`` (one metadata request); the ETag is the generation."""
+        blob = self.bucket.get_blob(f'{self.prefix}{key}')
+        if blob is None:
+            raise FileNotFoundError(key)
+        return StoredObject(key, blob.size, str(blob.generation), blob.updated, blob.content_type, blob)
+
+    def open(self, key, stat=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Return a seekable reader fetching ``key`` in ``chunk_size`` ranged requests.
+
+        With ``stat``, the reader reuses its blob: no further metadata request
+        is made and reads are pinned to that generation.
+        """
+        stat = stat or self.stat(key)
+        return stat.handle.open('rb', chunk_size=chunk_size)
+
+    def signed_url(self, key, expires_in, download_name=None):
+        """
+        Return a V4 signed URL downloading ``key`` straight from the bucket.
+
+        Signing needs credentials holding a private key (a service account).
+
+        Args:
+            key (str): Object key
+            expires_in (int): Seconds the URL stays valid
+            download_name (str): Attachment file name, if any
+        """
+        disposition = f'attachment; filename="{download_name}"' if download_name else None
+        return self._blob(key).generate_signed_url(
+            version='v4', expiration=timedelta(seconds=expires_in), method='GET',
+            response_disposition=disposition)
+
+    def read(self, key):
+        """Return the bytes stored at ``key``."""
+        try:
+            return self._blob(key).download_as_bytes()
+        except NotFound:
+            raise FileNotFoundError(key) from None
+
+    def download_to_filename(self, key, filename, stat=None):
+        """
+        Copy ``key`` to the local file ``filename``.
+
+        With ``stat``, the download is pinned to its generation: if the object
+        was replaced since, FileNotFoundError is raised instead of copying
+        content that does not match ``stat``.
+        """
+        blob = stat.handle if stat else self._blob(key)
+        try:
+            blob.download_to_filename(filename)
+        except NotFound:
+            raise FileNotFoundError(key) from None
+
+    def exists(self, key):
+        """Return True if ``key`` is stored."""
+        return self._blob(key).exists()
+
+    def delete(self, key):
+        """Remove ``key``."""
+        try:
+            self._blob(key).delete()
+        except NotFound:
+            raise FileNotFoundError(key) from None
+
+
+class FakeBlob:
+    """In-memory object with the subset of the ``google.cloud.storage.Blob`` API in use."""
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.size = self.generation = self.md5_hash = self.content_type = self.updated = None
+
+    def _data(self):
+        try:
+            data = self.bucket._objects[self.name]
+            generation = self.bucket._metadata[self.name][0]
+        except KeyError:
+            raise NotFound(f'No such object: {self.bucket.name}/{self.name}') from None
+        # A blob loaded with a generation reads only that generation, like GCS
+        # (the bucket is not versioned, so a replaced generation is gone)
+        if self.generation is not None and self.generation != generation:
+            raise NotFound(f'No such object: {self.bucket.name}/{self.name}#{self.generation}')
+        return data
+
+    def upload_from_file(self, file_obj, content_type=None, **kwargs):
+        data = file_obj.read()
+        with self.bucket._lock:
+            self.bucket._objects[self.name] = data
+            self.bucket._generation += 1
+            self.bucket._metadata[self.name] = (self.bucket._generation, content_type,
+                                                datetime.now(timezone.utc))
+        self.reload()
+
+    def upload_from_string(self, data, content_type=None):
+        self.upload_from_file(io.BytesIO(data.encode() if isinstance(data, str) else data),
+                              content_type=content_type)
+
+    def reload(self):
+        self.generation = None
+        data = self._data()
+        self.size = len(data)
+        self.generation, self.content_type, self.updated = self.bucket._metadata[self.name]
+        self.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode('ascii')
+
+    def exists(self):
+        return self.name in self.bucket._objects
+
+    def download_as_bytes(self, start=None, end=None):
+        data = self._data()
+        return data[start or 0:None if end is None else end + 1]
+
+    def download_to_filename(self, filename):
+        data = self._data()
+        with open(filename, 'wb') as f:
+            f.write(data)
+
+    def open(self, mode='rb', chunk_size=None):
+        return io.BytesIO(self._data())
+
+    def generate_signed_url(self, version='v4', expiration=None, method='GET', response_disposition=None):
+        query = urlencode({'X-Goog-Expires': int(expiration.total_seconds()),
+                           'response-content-disposition': response_disposition or ''})
+        return f'https://storage.googleapis.com/{self.bucket.name}/{quote(self.name)}?{query}'
+
+    def delete(self):
+        with self.bucket._lock:
+            self._data()
+            del self.bucket._objects[self.name]
+            del self.bucket._metadata[self.name]
+
+
+class FakeBucket:
+    """In-memory bucket handed out by ``FakeGCSClient``."""
+
+    def __init__(self, name):
+        self.name = name
+        self._objects = {}
+        self._metadata = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        blob = FakeBlob(self, name)
+        try:
+            blob.reload()
+        except NotFound:
+            return None
+        return blob
+
+
+class FakeGCSClient:
+    """Process-local stand-in for ``google.cloud.storage.Client``."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, name):
+        with self._lock:
+            return self._buckets.setdefault(name, FakeBucket(name))
+
+
+def gcs_client():
+    """Return the process-wide GCS client, creating it on first use."""
+    global _gcs_client
+    if _gcs_client is None:
+        with _clients_lock:
+            if _gcs_client is None:
+                from google.cloud import storage
+                _gcs_client = storage.Client()
+    return _gcs_client
+
+
+def fake_gcs_client():
+    """Return the process-wide in-memory GCS stand-in, creating it on first use."""
+    global _fake_client
+    if _fake_client is None:
+        with _clients_lock:
+            if _fake_client is None:
+                _fake_client = FakeGCSClient()
+    return _fake_client
+
+
+def create_storage(config):
+    """
+    Build the resume storage backend described by a configuration.
+
+    Args:
+        config (dict): Application configuration
+
+    Returns:
+        LocalStorage or GCSStorage
+
+    Raises:
+        ValueError: Unknown ``STORAGE_BACKEND``, or 'gcs' without a bucket
+    """
+    backend = config.get('STORAGE_BACKEND', 'local')
+    if backend == 'local':
+        return LocalStorage(config['RESUME_STORAGE_DIR'])
+    if backend == 'fake':
+        return GCSStorage(fake_gcs_client().bucket(config.get('GCS_BUCKET_NAME') or 'fake-bucket'))
+    if backend == 'gcs':
+        if not config.get('GCS_BUCKET_NAME'):
+            raise ValueError('STORAGE_BACKEND is gcs but GCS_BUCKET_NAME is not set')
+        return GCSStorage(gcs_client().bucket(config['GCS_BUCKET_NAME']))
+    raise ValueError(f'Unknown STORAGE_BACKEND {backend!r}')
+
+
+def get_resume_storage():
+    """Return the application's resume storage, creating it on first use."""
+    storage = current_app.extensions.get('resume_storage')
+    if storage is None:
+        with _storage_lock:
+            storage = current_app.extensions.get('resume_storage')
+            if storage is None:
+                storage = current_app.extensions['resume_storage'] = create_storage(current_app.config)
+    return storage
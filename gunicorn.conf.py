@@ -0,0 +1,22 @@
+"""
+Gunicorn hooks for the Job Portal.
+
+Gunicorn loads this file from the working directory. Each worker starts the
+cluster scheduler once it has loaded the app (also with ``--preload``, since
+this runs after the fork); the scheduler's lease elects the one worker
+across all nodes that runs the periodic jobs (see scheduler.py).
+"""
+
+from scheduler import init_scheduler
+
+
+def post_worker_init(worker):
+    """Start the scheduler in a worker that has loaded the app."""
+    init_scheduler(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    """Release the scheduler lease when a worker stops, so another takes over at once."""
+    scheduler = getattr(worker, 'wsgi', None) and worker.wsgi.extensions.get('scheduler')
+    if scheduler is not None:
+        scheduler.stop(wait=False)
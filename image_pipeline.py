@@ -0,0 +1,335 @@
+"""
+Profile picture processing off the request path, and company logo storage.
+
+An uploaded picture used to be saved, fully decoded, thumbnailed and saved
+again inside ``auth.profile``. The pipeline instead:
+
+1. Reads only the image header (``probe_image``) to reject non-images and
+   oversized dimensions before anything is decoded
+2. Streams the upload to a private work directory under
+   ``IMAGE_STAGING_DIR`` (outside ``static/``) and returns to the request
+3. In a process pool, decodes it once, using JPEG draft mode so large JPEGs
+   are scaled down by the decoder instead of in memory, and writes one file
+   per size in ``PROFILE_PICTURE_SIZES`` (``<stem>_<size>.webp``) into the
+   work directory
+4. When rendering completes, moves only the variants into the public
+   folder, removes the work directory (also when rendering failed), points
+   ``User.profile_picture`` at the largest variant and removes the user's
+   previous variants. This runs on a small
+   thread pool, not in the process pool's result-handling thread, so a slow
+   commit never holds up the results of other renders
+
+Company logos are rendered at upload time (``store_company_logo``) into the
+sizes in ``LOGO_SIZES`` and named after the SHA-256 of the uploaded bytes, so
+an employer uploading the same logo for every job stores it once.
+``Job.company_logo`` points at the largest variant.
+
+Templates pick a smaller variant with the ``picture_variant`` filter, e.g.
+``current_user.profile_picture|picture_variant(40)`` for the navbar avatar or
+``job.company_logo|picture_variant(80)`` on job listings.
+
+Configuration:
+    IMAGE_WORKERS (int): Worker processes; 0 renders inline in the request
+    PROFILE_PICTURE_FORMAT (str): Pillow format of the variants (e.g. 'WEBP')
+    PROFILE_PICTURE_MAX_PIXELS (int): Largest accepted width x height
+    IMAGE_STAGING_DIR (str): Work directories of uploads being rendered
+"""
+
+import hashlib
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from extensions import db
+from models import User
+from utils import logger
+
+# Navbar avatar and profile page; User.profile_picture points at the largest
+PROFILE_PICTURE_SIZES = (40, 300)
+# Job listing thumbnail and job detail page; Job.company_logo points at the largest
+LOGO_SIZES = (80, 200)
+VARIANT_SIZES = frozenset(PROFILE_PICTURE_SIZES + LOGO_SIZES)
+DEFAULT_MAX_PIXELS = 40_000_000
+ACCEPTED_FORMATS = {'JPEG', 'PNG'}
+FORMAT_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+
+_VARIANT_RE = re.compile(r'^(?P<stem>.+)_(?P<size>\d+)\.(?P<ext>webp|jpg|png)$')
+_pool_lock = threading.Lock()
+
+
+class InvalidImageError(ValueError):
+    """Raised when an upload is not a supported image or is too large."""
+
+
+def probe_image(stream, max_pixels=DEFAULT_MAX_PIXELS):
+    """
+    Check an upload from its header, without decoding the pixel data.
+
+    Args:
+        stream: Readable, seekable binary file object; rewound afterwards
+        max_pixels (int): Largest accepted width x height
+
+    Returns:
+        tuple: (format, width, height)
+
+    Raises:
+        InvalidImageError: Not a JPEG/PNG, or larger than ``max_pixels``
+    """
+    try:
+        with Image.open(stream) as img:
+            image_format, (width, height) = img.format, img.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise InvalidImageError(f'unreadable image: {e}') from e
+    finally:
+        stream.seek(0)
+    if image_format not in ACCEPTED_FORMATS:
+        raise InvalidImageError(f'unsupported image format {image_format}')
+    if width * height > max_pixels:
+        raise InvalidImageError(f'image too large ({width}x{height})')
+    return image_format, width, height
+
+
+def render_variants(source_path, dest_dir, stem, sizes=PROFILE_PICTURE_SIZES, image_format='WEBP',
+                    quality=80):
+    """
+    Decode an image once and write a square-bounded variant per size.
+
+    Runs in the worker processes, so it only takes and returns plain values.
+
+    Args:
+        source_path (str): Staged upload; deleted afterwards
+        dest_dir (str): Directory receiving the variants
+        stem (str): File name prefix of the variants
+        sizes (iterable): Bounding box sizes in pixels
+        image_format (str): Pillow output format
+        quality (int): Encoder quality for lossy formats
+
+    Returns:
+        dict: Size -> variant file name (``<stem>_<size>.<ext>``)
+
+    Raises:
+        InvalidImageError: The pixel data could not be decoded
+    """
+    extension = FORMAT_EXTENSIONS[image_format]
+    sizes = sorted(set(sizes), reverse=True)
+    try:
+        with Image.open(source_path) as img:
+            if img.format == 'JPEG':
+                # Let the decoder scale down by 1/2, 1/4 or 1/8 while reading
+                img.draft('RGB', (sizes[0], sizes[0]))
+            img = ImageOps.exif_transpose(img)
+            has_alpha = img.mode in ('RGBA', 'LA', 'P') and image_format != 'JPEG'
+            img = img.convert('RGBA' if has_alpha else 'RGB')
+            names = {}
+            for size in sizes:  # largest first, each one shrinks the previous
+                img.thumbnail((size, size), reducing_gap=2.0)
+                names[size] = f'{stem}_{size}.{extension}'
+                img.save(os.path.join(dest_dir, names[size]), image_format, quality=quality)
+            return names
+    except OSError as e:
+        raise InvalidImageError(f'undecodable image: {e}') from e
+    finally:
+        os.remove(source_path)
+
+
+def picture_variant(path, size):
+    """
+    Template filter: the path of another size of a pipeline-rendered image.
+
+    Paths that are not pipeline variants (e.g. the default picture or logos
+    uploaded before variants existed) are returned unchanged.
+
+    Args:
+        path (str): Static path stored in ``User.profile_picture`` or
+                    ``Job.company_logo``
+        size (int): Wanted size from ``PROFILE_PICTURE_SIZES``/``LOGO_SIZES``
+
+    Returns:
+        str: Static path of that size
+    """
+    if not path:
+        return path
+    directory, name = os.path.split(path)
+    match = _VARIANT_RE.match(name)
+    if not match or size not in VARIANT_SIZES:
+        return path
+    return os.path.join(directory, f"{match['stem']}_{size}.{match['ext']}")
+
+
+def store_company_logo(stream, folder, sizes=LOGO_SIZES, image_format='WEBP'):
+    """
+    Store a logo under its content hash, rendered into display sizes.
+
+    Uploads with the same bytes map to the same files, which are only
+    rendered the first time. Variants are rendered in a scratch directory
+    and moved into place, so concurrent identical uploads never expose a
+    partly written file.
+
+    Args:
+        stream: Readable, seekable binary file object of the upload
+        folder (str): Logo directory
+        sizes (iterable): Bounding box sizes in pixels
+        image_format (str): Pillow output format
+
+    Returns:
+        dict: Size -> variant file name (``<sha256 prefix>_<size>.<ext>``)
+
+    Raises:
+        InvalidImageError: Not a decodable JPEG/PNG, or too large
+    """
+    probe_image(stream)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(65536), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    stem = digest.hexdigest()[:32]
+    names = {size: f'{stem}_{size}.{FORMAT_EXTENSIONS[image_format]}' for size in sizes}
+    if all(os.path.exists(os.path.join(folder, name)) for name in names.values()):
+        return names
+
+    workdir = tempfile.mkdtemp(dir=folder)
+    try:
+        source = os.path.join(workdir, 'upload')
+        with open(source, 'wb') as out:
+            shutil.copyfileobj(stream, out)
+        render_variants(source, workdir, stem, sizes, image_format)
+        for name in names.values():
+            os.replace(os.path.join(workdir, name), os.path.join(folder, name))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return names
+
+
+def _image_pool(app):
+    """Return the application's worker pool, creating it on first use."""
+    pool = app.extensions.get('image_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('image_pool')
+            if pool is None:
+                # spawn: never fork the web process with its threads and open sockets
+                pool = ProcessPoolExecutor(max_workers=app.config['IMAGE_WORKERS'],
+                                           mp_context=multiprocessing.get_context('spawn'))
+                app.extensions['image_pool'] = pool
+    return pool
+
+
+def _finisher_pool(app):
+    """Return the application's thread pool for completing renders, creating it on first use."""
+    pool = app.extensions.get('image_finisher')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('image_finisher')
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-finish')
+                app.extensions['image_finisher'] = pool
+    return pool
+
+
+def _publish_variants(workdir, names, folder):
+    """Move rendered variants from a work directory into the public folder."""
+    for name in names.values():
+        shutil.move(os.path.join(workdir, name), os.path.join(folder, name))
+    return names
+
+
+def _apply_profile_picture(user_id, names):
+    """Point the user at the new variants and delete the previous ones."""
+    folder = current_app.config['PROFILE_UPLOAD_FOLDER']
+    largest = f"img/profiles/{names[max(names)]}"
+    user = db.session.get(User, user_id)
+    if user is None:
+        logger.warning(f"User {user_id} was deleted before their profile picture was processed")
+        for name in names.values():
+            os.remove(os.path.join(folder, name))
+        return None
+    previous = user.profile_picture
+    user.profile_picture = largest
+    db.session.commit()
+    logger.info(f"Profile picture for user {user_id} updated to {largest}")
+
+    if previous and previous != largest and _VARIANT_RE.match(os.path.basename(previous)):
+        for size in PROFILE_PICTURE_SIZES:
+            old = os.path.join(folder, os.path.basename(picture_variant(previous, size)))
+            if os.path.exists(old):
+                os.remove(old)
+    return largest
+
+
+def submit_profile_picture(user_id, picture_file):
+    """
+    Validate an uploaded picture and render its variants in the background.
+
+    Args:
+        user_id (int): Owner of the picture
+        picture_file (FileStorage): Uploaded image
+
+    Returns:
+        Future: Resolves to the new ``User.profile_picture`` path once the
+                user record is updated (already resolved when
+                ``IMAGE_WORKERS`` is 0)
+
+    Raises:
+        InvalidImageError: Not a JPEG/PNG, or too large
+
+    Side Effects:
+        - Writes the upload to a work directory under ``IMAGE_STAGING_DIR``,
+          removed when rendering completes or fails
+        - Updates ``User.profile_picture`` when rendering completes
+    """
+    app = current_app._get_current_object()
+    config = app.config
+    probe_image(picture_file.stream, config['PROFILE_PICTURE_MAX_PIXELS'])
+
+    folder = config['PROFILE_UPLOAD_FOLDER']
+    os.makedirs(config['IMAGE_STAGING_DIR'], exist_ok=True)
+    # The raw upload never enters the static folder; only finished variants do
+    workdir = tempfile.mkdtemp(dir=config['IMAGE_STAGING_DIR'])
+    stem = uuid.uuid4().hex[:16]
+    source = os.path.join(workdir, 'upload')
+    try:
+        picture_file.save(source)
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    args = (source, workdir, stem, PROFILE_PICTURE_SIZES, config['PROFILE_PICTURE_FORMAT'])
+
+    done = Future()
+    if config['IMAGE_WORKERS'] <= 0:
+        try:
+            names = _publish_variants(workdir, render_variants(*args), folder)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        done.set_result(_apply_profile_picture(user_id, names))
+        return done
+
+    def finish(rendered):
+        with app.app_context():
+            try:
+                names = _publish_variants(workdir, rendered.result(), folder)
+                path = _apply_profile_picture(user_id, names)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Processing profile picture for user {user_id} failed: {str(e)}")
+                done.set_exception(e)
+            else:
+                done.set_result(path)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+                db.session.remove()
+
+    # Done callbacks run on the pool's result-handling thread: only hand the
+    # result over there, the database work happens on the finisher threads
+    finisher = _finisher_pool(app)
+    _image_pool(app).submit(render_variants, *args).add_done_callback(
+        lambda rendered: finisher.submit(finish, rendered))
+    logger.info(f"Queued profile picture {stem} for user {user_id}")
+    return done
@@ -0,0 +1,183 @@
+"""
+Per-request SQL query instrumentation.
+
+Hooks SQLAlchemy's ``before_cursor_execute`` on the application's engine and
+records every statement executed while handling a request:
+
+- Counts statements per request
+- Groups them by *shape* (the SQL text with literals and ``IN`` lists
+  collapsed) to spot the N+1 pattern: the same shape repeated once per row
+- Enforces per-route query budgets declared with ``@query_budget(n)``
+
+When a route exceeds its budget a warning naming the most repeated statement
+shape is logged; with ``QUERY_BUDGET_STRICT`` (on in the testing configs)
+``QueryBudgetExceeded`` is raised instead so the test suite fails.
+
+Configuration:
+    QUERY_INSTRUMENTATION (bool): Enable the hooks (default True)
+    QUERY_BUDGET_STRICT (bool): Raise instead of logging on budget overruns
+    QUERY_REPEAT_THRESHOLD (int): Repeats of one shape that count as N+1
+
+Usage:
+    @jobs_bp.route('/list')
+    @query_budget(3)
+    def jobs_list():
+        ...
+"""
+
+import re
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+from utils import logger
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_IN_LIST_RE = re.compile(r'\((?:\s*(?:\?|%s|:\w+|%\(\w+\)s)\s*,)+\s*(?:\?|%s|:\w+|%\(\w+\)s)\s*\)')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a route executes more queries than its budget."""
+
+
+class QueryStats:
+    """
+    Statements executed during one request.
+
+    Attributes:
+        count (int): Total number of statements executed
+        shapes (Counter): Number of executions per statement shape
+        budget (int): Query budget declared by the route, or None
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.shapes = Counter()
+        self.budget = None
+
+    def record(self, statement):
+        self.count += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    def most_repeated(self):
+        """Return ``(shape, times)`` for the most frequently executed shape."""
+        if not self.shapes:
+            return None, 0
+        return self.shapes.most_common(1)[0]
+
+
+def statement_shape(statement):
+    """
+    Normalize a SQL statement so executions differing only in values compare equal.
+
+    Args:
+        statement (str): SQL text as sent to the DBAPI cursor
+
+    Returns:
+        str: Statement with whitespace collapsed and literals, numbers and
+             parameter lists replaced by placeholders
+
+    Example:
+        statement_shape('SELECT * FROM job WHERE id IN (?, ?, ?)')
+        -> 'SELECT * FROM job WHERE id IN (?)'
+    """
+    shape = _WHITESPACE_RE.sub(' ', statement).strip()
+    shape = _STRING_RE.sub('?', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    return _IN_LIST_RE.sub('(?)', shape)
+
+
+def current_stats():
+    """Return the QueryStats of the current request, or None outside a request."""
+    if not has_request_context():
+        return None
+    return g.get('query_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement)
+
+
+def _start_request():
+    g.query_stats = QueryStats()
+
+
+def _check_request(response):
+    stats = current_stats()
+    if stats is None:
+        return response
+
+    shape, times = stats.most_repeated()
+    if times >= current_app.config['QUERY_REPEAT_THRESHOLD']:
+        logger.warning(
+            f"Possible N+1 on {request.endpoint}: statement repeated {times} times: {shape}")
+
+    if stats.budget is not None and stats.count > stats.budget:
+        message = (f"{request.endpoint} executed {stats.count} queries (budget {stats.budget}); "
+                   f"most repeated ({times}x): {shape}")
+        if current_app.config['QUERY_BUDGET_STRICT']:
+            raise QueryBudgetExceeded(message)
+        logger.warning(f"Query budget exceeded: {message}")
+    return response
+
+
+def init_query_instrumentation(app):
+    """
+    Attach query counting to the app's engine and request lifecycle.
+
+    Args:
+        app (Flask): Flask application instance
+
+    Side Effects:
+        - Registers a before_cursor_execute listener on the app's engine
+        - Registers before/after request hooks that reset and check the counts
+    """
+    if not app.config.get('QUERY_INSTRUMENTATION', True):
+        return
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_check_request)
+
+
+def query_budget(max_queries):
+    """
+    Decorator declaring the maximum number of SQL statements a route may run.
+
+    The count covers the whole request, including template rendering and
+    context processors. Place it below ``login_required``/``role_required``.
+
+    Args:
+        max_queries (int): Statements allowed per request
+
+    Returns:
+        Decorator function recording the budget for the request
+
+    Side Effects:
+        - Logs a warning (or raises QueryBudgetExceeded in strict mode) when
+          the route runs more statements than its budget
+
+    Example:
+        @admin_bp.route('/jobs')
+        @login_required
+        @role_required('admin')
+        @query_budget(4)
+        def admin_jobs():
+            ...
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            stats = current_stats()
+            if stats is not None:
+                stats.budget = max_queries
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
@@ -1,9 +1,13 @@
 """Logging Configuration Module.
 
 This module configures application-wide logging with:
-- Rotating file handler (max 10MB per file, keeps 5 backups)
-- Standardized log format
-- Console output in development mode
+- A queue pipeline: loggers only enqueue records (``QueueHandler``); a
+  background ``QueueListener`` thread formats and writes them, so request
+  threads never block on disk or console I/O
+- Rotating file handlers (max 10MB per file, keeps 10 backups)
+- Standardized log format and console output
+- Level taken from ``LOG_LEVEL``
+- Per-logger rate sampling for high-volume loggers
 - Automatic log directory creation
 
 Log Format:
@@ -11,7 +15,15 @@ Log Format:
 
 Log Files:
     - logs/job_portal.log (main application log)
-    - logs/job_portal_error.log (error-only log)
+    - logs/errors.log (error-only log)
+
+High-volume loggers:
+    - job_portal.access: page access lines (``utils.access_logger``)
+    - job_portal.search: search filters and result counts (``utils.search_logger``)
+
+    ``LOG_SAMPLE_RATES`` maps a logger name to the fraction of its records
+    that are kept (e.g. 0.1 keeps one in ten). Warnings and errors are never
+    sampled.
 
 Usage:
     from logging_config import setup_logger
@@ -19,34 +31,98 @@ Usage:
     setup_logger(app)
 """
 
+import atexit
+import itertools
+import math
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
 
+# The active pipeline; replaced when another app is configured in the same process
+_queue_handler = None
+_listener = None
+_attached = []
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fixed fraction of the records of selected loggers.
+
+    Sampling is deterministic per logger: with a rate of 0.1 the 1st, 11th,
+    21st... records are kept. Records at WARNING and above always pass.
+
+    Args:
+        rates (dict): Logger name -> fraction of records to keep (0..1)
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._seen = defaultdict(itertools.count)
+
+    def filter(self, record):
+        rate = self.rates.get(record.name)
+        if rate is None or rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        if rate <= 0:
+            return False
+        n = next(self._seen[record.name])
+        return math.ceil((n + 1) * rate) > math.ceil(n * rate)
+
+
+def _resolve_level(name):
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def _shutdown():
+    """Stop the listener, flushing queued records, and detach the queue handler."""
+    global _queue_handler, _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    for logger in _attached:
+        logger.removeHandler(_queue_handler)
+    _attached.clear()
+    _queue_handler = None
+    _listener = None
+
+
+atexit.register(_shutdown)
+
 
 def setup_logger(app):
     """Configure application logging handlers and formatters.
-    
+
     Args:
         app (Flask): Flask application instance
-        
+
     Side Effects:
         - Creates 'logs' directory if not exists
-        - Configures two file handlers:
+        - Starts a QueueListener thread writing to:
             - job_portal.log (all logs)
-            - job_portal_error.log (errors only)
-        - Adds console handler in debug mode
+            - errors.log (errors only)
+            - the console
+        - Attaches one QueueHandler (with the sampling filter) to the Flask
+          and 'job_portal' loggers, replacing any previous pipeline
         - Sets log level based on app config
-        
+
     Configuration:
         LOG_LEVEL (str): Defaults to 'INFO'
-        DEBUG (bool): Enables console output when True
+        LOG_SAMPLE_RATES (dict): Logger name -> fraction of records kept
     """
+    global _queue_handler, _listener
+
     # Create logs directory if it doesn't exist
     if not os.path.exists('logs'):
         os.makedirs('logs')
 
+    level = _resolve_level(app.config.get('LOG_LEVEL', 'INFO'))
+
     # Configure the main application logger
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -59,7 +135,6 @@ def setup_logger(app):
         backupCount=10
     )
     file_handler.setFormatter(formatter)
-    file_handler.setLevel(logging.INFO)
 
     # Error file handler for errors only
     error_file_handler = RotatingFileHandler(
@@ -69,23 +144,30 @@ def setup_logger(app):
     )
     error_file_handler.setFormatter(formatter)
     error_file_handler.setLevel(logging.ERROR)
-    
+
     # Console handler for outputting logs to the console
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    console_handler.setLevel(logging.INFO)
+
+    # Only one pipeline per process: create_app may run more than once
+    _shutdown()
+
+    # Request threads only enqueue; the listener thread does the I/O
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(app.config.get('LOG_SAMPLE_RATES')))
+    _listener = QueueListener(log_queue, file_handler, error_file_handler, console_handler,
+                              respect_handler_level=True)
+    _listener.start()
 
     # Configure Flask logger
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(error_file_handler)
-    app.logger.addHandler(console_handler)
-    app.logger.setLevel(logging.INFO)
+    app.logger.addHandler(_queue_handler)
+    app.logger.setLevel(level)
 
     # Create a general purpose logger
     logger = logging.getLogger('job_portal')
-    logger.addHandler(file_handler)
-    logger.addHandler(error_file_handler)
-    logger.addHandler(console_handler)
-    logger.setLevel(logging.INFO)
+    logger.addHandler(_queue_handler)
+    logger.setLevel(level)
+    _attached.extend([app.logger, logger])
 
     return logger
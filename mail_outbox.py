@@ -0,0 +1,338 @@
+"""
+Outgoing mail through a persistent outbox.
+
+``main.contact`` used to call ``mail.send`` inline, retrying with
+``time.sleep(1)``, so a slow or unreachable SMTP server held the worker for
+seconds. Now:
+
+- ``queue_email`` adds an ``OutgoingEmail`` row to the session; the caller
+  commits it with the rest of its work and calls ``dispatch_mail``, which
+  wakes the background sender (``background.PollingWorker``) or, with
+  ``MAIL_OUTBOX_WORKERS = 0``, sends inline
+- ``send_due_emails`` claims up to ``MAIL_BATCH_SIZE`` due rows with one
+  UPDATE (so several processes can share the outbox) and sends them over a
+  single SMTP connection (``mail.connect()``)
+- A temporary failure (4xx reply, connection refused or dropped) is retried
+  after ``MAIL_RETRY_SECONDS``, doubling each time up to an hour; a
+  permanent one (5xx reply, malformed message) or running out of
+  ``MAIL_MAX_ATTEMPTS`` moves the row to the dead letters ('dead'), which
+  ``flask retry-dead-mail`` requeues
+
+Each row is committed as soon as the server accepts it, so a crash resends
+at most the message in flight; claims expire after ``CLAIM_LEASE``.
+
+``LocalSMTPServer`` is a minimal in-process SMTP server to send to in tests
+and development, with switches for temporary and permanent failures.
+
+Configuration:
+    MAIL_OUTBOX_WORKERS (int): Sender threads; 0 sends inline after commit
+    MAIL_BATCH_SIZE (int): Emails claimed and sent per SMTP connection
+    MAIL_MAX_ATTEMPTS (int): Attempts before an email is dead-lettered
+    MAIL_RETRY_SECONDS (int): Delay before the first retry
+    MAIL_POLL_SECONDS (int): How often an idle sender looks for due emails
+"""
+
+import smtplib
+import socketserver
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import click
+import sqlalchemy as sa
+from flask import current_app
+from flask_mail import BadHeaderError, Message
+
+from background import get_worker
+from extensions import db, mail
+from models import OutgoingEmail
+from utils import logger
+
+STATUS_PENDING = 'pending'
+STATUS_SENT = 'sent'
+STATUS_DEAD = 'dead'
+# A claimed email is not retried by another sender for this long
+CLAIM_LEASE = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+# Raised for one message; the SMTP session stays usable for the next one
+_MESSAGE_ERRORS = (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused, BadHeaderError,
+                   AssertionError, UnicodeError)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def queue_email(subject, recipients, body, html=None, sender=None, reply_to=None):
+    """
+    Add an email to the outbox.
+
+    Only adds to the session: the caller commits and then calls ``dispatch_mail``.
+
+    Args:
+        subject (str): Subject line
+        recipients (list[str]): To addresses
+        body (str): Plain text body
+        html (str): HTML body
+        sender (str): From address; ``MAIL_DEFAULT_SENDER`` if None
+        reply_to (str): Reply-To address
+
+    Returns:
+        OutgoingEmail: The outbox row
+    """
+    email = OutgoingEmail(subject=subject, recipients=', '.join(recipients), body=body, html=html,
+                          sender=sender, reply_to=reply_to, status=STATUS_PENDING, next_attempt_at=_now())
+    db.session.add(email)
+    return email
+
+
+def _message(email):
+    # A None sender makes Message use the app's MAIL_DEFAULT_SENDER
+    return Message(subject=email.subject, recipients=[r.strip() for r in email.recipients.split(',') if r.strip()],
+                   body=email.body, html=email.html, sender=email.sender, reply_to=email.reply_to)
+
+
+def _is_permanent(error):
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return isinstance(error, (BadHeaderError, AssertionError, UnicodeError))
+
+
+def _failed(email, error, permanent):
+    email.claim_token = None
+    email.last_error = str(error)[:1000]
+    if permanent or email.attempts >= current_app.config['MAIL_MAX_ATTEMPTS']:
+        email.status = STATUS_DEAD
+        logger.error(f"Dead-lettered email {email.id} to {email.recipients} after {email.attempts} "
+                     f"attempts: {str(error)}")
+        return
+    base = timedelta(seconds=current_app.config['MAIL_RETRY_SECONDS'])
+    email.next_attempt_at = _now() + min(base * 2 ** (email.attempts - 1), MAX_RETRY_DELAY)
+    logger.warning(f"Sending email {email.id} failed (attempt {email.attempts}), "
+                   f"retrying at {email.next_attempt_at:%H:%M:%S}: {str(error)}")
+
+
+def _claim(batch_size):
+    now = _now()
+    token = uuid.uuid4().hex
+    due = (sa.select(OutgoingEmail.id)
+           .where(OutgoingEmail.status == STATUS_PENDING, OutgoingEmail.next_attempt_at <= now)
+           .order_by(OutgoingEmail.next_attempt_at)
+           .limit(batch_size))
+    db.session.execute(
+        sa.update(OutgoingEmail)
+        .where(OutgoingEmail.id.in_(due.scalar_subquery()), OutgoingEmail.status == STATUS_PENDING,
+               OutgoingEmail.next_attempt_at <= now)
+        .values(claim_token=token, next_attempt_at=now + CLAIM_LEASE, attempts=OutgoingEmail.attempts + 1)
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+    return db.session.scalars(
+        sa.select(OutgoingEmail).where(OutgoingEmail.claim_token == token).order_by(OutgoingEmail.id)).all()
+
+
+def send_due_emails(batch_size=None):
+    """
+    Send one batch of due emails over a single SMTP connection.
+
+    Args:
+        batch_size (int): Most emails sent; ``MAIL_BATCH_SIZE`` if None
+
+    Returns:
+        tuple: (emails claimed, emails sent)
+
+    Side Effects:
+        - Commits each email's outcome as soon as it is known
+    """
+    batch = _claim(batch_size or current_app.config['MAIL_BATCH_SIZE'])
+    if not batch:
+        return 0, 0
+    unsent = list(batch)
+    sent = 0
+    try:
+        with mail.connect() as connection:
+            while unsent:
+                email = unsent[0]
+                try:
+                    connection.send(_message(email))
+                except _MESSAGE_ERRORS as e:
+                    _failed(email, e, _is_permanent(e))
+                else:
+                    email.status = STATUS_SENT
+                    email.sent_at = _now()
+                    email.claim_token = None
+                    email.last_error = None
+                    sent += 1
+                db.session.commit()
+                unsent.pop(0)
+    except Exception as e:
+        # Connecting failed or the connection dropped: the rest of the batch waits
+        logger.warning(f"SMTP connection failed with {len(unsent)} emails unsent: {str(e)}")
+        for email in unsent:
+            _failed(email, e, permanent=False)
+        db.session.commit()
+    logger.info(f"Mail outbox batch: {sent} of {len(batch)} emails sent")
+    return len(batch), sent
+
+
+def drain_outbox(max_batches=20):
+    """
+    Send due emails batch after batch until none are left.
+
+    Args:
+        max_batches (int): Most batches (SMTP connections) in one call
+
+    Returns:
+        int: Number of emails sent
+    """
+    total = 0
+    for _ in range(max_batches):
+        claimed, sent = send_due_emails()
+        total += sent
+        if claimed == 0 or sent < claimed:
+            break  # nothing due, or the server is refusing: wait for the retry delay
+    return total
+
+
+def dispatch_mail():
+    """
+    Start sending committed outbox emails.
+
+    With ``MAIL_OUTBOX_WORKERS = 0`` they are sent inline; failures stay in
+    the outbox for a later attempt instead of being raised.
+    """
+    app = current_app._get_current_object()
+    if app.config['MAIL_OUTBOX_WORKERS'] <= 0:
+        drain_outbox()
+        return
+    get_worker(app, 'mail_outbox', drain_outbox, app.config['MAIL_OUTBOX_WORKERS'],
+               app.config['MAIL_POLL_SECONDS']).notify()
+
+
+def retry_dead_emails():
+    """
+    Move dead-lettered emails back to the outbox with a fresh attempt count.
+
+    Returns:
+        int: Number of emails requeued
+    """
+    result = db.session.execute(
+        sa.update(OutgoingEmail).where(OutgoingEmail.status == STATUS_DEAD)
+        .values(status=STATUS_PENDING, attempts=0, next_attempt_at=_now())
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+    return result.rowcount
+
+
+def register_commands(app):
+    """Register the mail outbox CLI commands on the Flask app."""
+    @app.cli.command('send-mail')
+    def send_mail_command():
+        """Send every email in the outbox that is due now."""
+        sent = drain_outbox(max_batches=1000)
+        click.echo(f"Sent {sent} emails.")
+
+    @app.cli.command('retry-dead-mail')
+    def retry_dead_mail_command():
+        """Requeue dead-lettered emails."""
+        requeued = retry_dead_emails()
+        click.echo(f"Requeued {requeued} emails.")
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def _read_data(self):
+        lines = []
+        while (line := self.rfile.readline()) not in (b'.\r\n', b'.\n', b''):
+            lines.append(line[1:] if line.startswith(b'..') else line)
+        return b''.join(lines)
+
+    def handle(self):
+        server = self.server.owner
+        with server.lock:
+            server.connections += 1
+        self._reply('220 localhost stand-in SMTP')
+        mail_from, rcpt_to = None, []
+        while line := self.rfile.readline():
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self._reply('250 localhost')
+            elif verb == 'MAIL':
+                mail_from, rcpt_to = command.partition(':')[2].strip().strip('<>'), []
+                self._reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.partition(':')[2].strip().strip('<>')
+                if address in server.rejected:
+                    self._reply('550 No such user')
+                else:
+                    rcpt_to.append(address)
+                    self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                data = self._read_data()
+                with server.lock:
+                    failure = server.failures.pop(0) if server.failures else None
+                    if failure is None:
+                        server.messages.append((mail_from, rcpt_to, data))
+                self._reply(f'{failure} Try again later' if failure else '250 OK queued')
+            elif verb in ('RSET', 'NOOP'):
+                mail_from, rcpt_to = (None, []) if verb == 'RSET' else (mail_from, rcpt_to)
+                self._reply('250 OK')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class LocalSMTPServer:
+    """
+    Minimal SMTP server on localhost, running in a background thread.
+
+    Accepted messages are kept in ``messages`` as (from, [to], raw bytes).
+    Each code appended to ``failures`` makes the next message's DATA fail
+    with that reply code (e.g. 451 temporary, 554 permanent); recipients in
+    ``rejected`` are refused with 550.
+
+    Args:
+        port (int): Port to listen on; 0 picks a free one (see ``port``)
+
+    Example:
+        with LocalSMTPServer() as smtp:
+            app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=smtp.port)
+    """
+
+    def __init__(self, port=0):
+        self.messages = []
+        self.failures = []
+        self.rejected = set()
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', port), _SMTPHandler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        """Start accepting connections."""
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), name='local-smtp',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server and close its socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
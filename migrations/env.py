@@ -5,6 +5,8 @@ from flask import current_app
 
 from alembic import context
 
+from search import FTS_TABLE
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -51,6 +53,21 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate away from the full-text search index.
+
+    The index is raw DDL (see search.py): on SQLite the FTS5 table and its
+    shadow tables (``job_fts_data``, ``job_fts_idx``, ...), on PostgreSQL the
+    ``ix_job_*_tsv`` expression indexes. None of it is in the models'
+    metadata, so without this filter every new migration would drop it.
+    """
+    if type_ == 'table' and name.startswith(FTS_TABLE):
+        return False
+    if type_ == 'index' and name and name.startswith('ix_job_') and name.endswith('_tsv'):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +82,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,10 +111,20 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            # The app turns on foreign key enforcement for every SQLite
+            # connection; batch migrations recreate tables, and dropping the
+            # old copy must not cascade to (or be blocked by) referencing rows
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            # The PRAGMA autobegins a transaction; commit it so Alembic's
+            # begin_transaction() below owns (and commits) the migration
+            connection.commit()
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
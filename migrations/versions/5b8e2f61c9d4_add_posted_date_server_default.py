@@ -0,0 +1,38 @@
+"""Add server-side timestamp defaults and job keyset index
+
+Revision ID: 5b8e2f61c9d4
+Revises: a41c7e9d2b10
+Create Date: 2025-05-08 09:41:27.530112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2f61c9d4'
+down_revision = 'a41c7e9d2b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.alter_column('posted_date', existing_type=sa.DateTime(),
+                              server_default=sa.func.now())
+        batch_op.create_index('ix_job_posted_date_id', ['posted_date', 'id'], unique=False)
+
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.alter_column('application_date', existing_type=sa.DateTime(),
+                              server_default=sa.func.now())
+
+
+def downgrade():
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.alter_column('application_date', existing_type=sa.DateTime(),
+                              server_default=None)
+
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_posted_date_id')
+        batch_op.alter_column('posted_date', existing_type=sa.DateTime(),
+                              server_default=None)
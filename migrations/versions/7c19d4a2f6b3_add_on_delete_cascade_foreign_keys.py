@@ -0,0 +1,68 @@
+"""Add ON DELETE CASCADE to the job and application foreign keys
+
+Revision ID: 7c19d4a2f6b3
+Revises: e2b6f4c81a37
+Create Date: 2025-05-14 09:52:41.370218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c19d4a2f6b3'
+down_revision = 'e2b6f4c81a37'
+branch_labels = None
+depends_on = None
+
+# table -> [(column, referred table)]
+FOREIGN_KEYS = {
+    'job': [('poster_id', 'user')],
+    'application': [('job_id', 'job'), ('applicant_id', 'user')],
+}
+
+# The original SQLite constraints are unnamed; batch mode names reflected
+# foreign keys with this convention so they can be dropped
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+# Recreating the job table on SQLite drops its full-text search triggers
+# (see a41c7e9d2b10); they are restored afterwards
+FTS_COLUMNS = 'title, description, company, category, location'
+FTS_NEW = 'new.title, new.description, new.company, new.category, new.location'
+FTS_OLD = 'old.title, old.description, old.company, old.category, old.location'
+FTS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN
+        INSERT INTO job_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {FTS_NEW});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN
+        INSERT INTO job_fts(job_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.id, {FTS_OLD});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON job BEGIN
+        INSERT INTO job_fts(job_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.id, {FTS_OLD});
+        INSERT INTO job_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {FTS_NEW});
+    END""",
+]
+
+
+def _replace_foreign_keys(ondelete):
+    sqlite = op.get_bind().dialect.name == 'sqlite'
+    for table, keys in FOREIGN_KEYS.items():
+        with op.batch_alter_table(table, schema=None,
+                                  naming_convention=NAMING_CONVENTION if sqlite else None) as batch_op:
+            for column, referred in keys:
+                # SQLite: the NAMING_CONVENTION name; PostgreSQL: its default constraint name
+                name = f'fk_{table}_{column}_{referred}' if sqlite else f'{table}_{column}_fkey'
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+    if sqlite:
+        for trigger in FTS_TRIGGERS:
+            op.execute(trigger)
+
+
+def upgrade():
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _replace_foreign_keys(None)
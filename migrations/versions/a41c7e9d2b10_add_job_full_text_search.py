@@ -0,0 +1,69 @@
+"""Add full-text search index for jobs
+
+Revision ID: a41c7e9d2b10
+Revises: 8758ee3d4118
+Create Date: 2025-05-06 10:12:41.218930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c7e9d2b10'
+down_revision = '8758ee3d4118'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'title, description, company, category, location'
+NEW_VALUES = 'new.title, new.description, new.company, new.category, new.location'
+OLD_VALUES = 'old.title, old.description, old.company, old.category, old.location'
+PG_DOCUMENT = ("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || "
+               "coalesce(company, '') || ' ' || coalesce(category, '') || ' ' || coalesce(location, ''))")
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5(
+                {COLUMNS},
+                content='job', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN
+                INSERT INTO job_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN
+                INSERT INTO job_fts(job_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE OF {COLUMNS} ON job BEGIN
+                INSERT INTO job_fts(job_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+                INSERT INTO job_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+            END
+        """)
+        # Index the rows that already exist
+        op.execute("INSERT INTO job_fts(job_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_job_search_tsv ON job USING gin ({PG_DOCUMENT})")
+        for column in ('location', 'category', 'company'):
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_job_{column}_tsv ON job "
+                       f"USING gin (to_tsvector('simple', {column}))")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS job_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS job_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS job_fts_ai")
+        op.execute("DROP TABLE IF EXISTS job_fts")
+    elif dialect == 'postgresql':
+        for column in ('location', 'category', 'company'):
+            op.execute(f"DROP INDEX IF EXISTS ix_job_{column}_tsv")
+        op.execute("DROP INDEX IF EXISTS ix_job_search_tsv")
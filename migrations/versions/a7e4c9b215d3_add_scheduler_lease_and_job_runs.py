@@ -0,0 +1,48 @@
+"""Add scheduler_lease and job_run for the cluster scheduler
+
+Revision ID: a7e4c9b215d3
+Revises: f3a8d2c60b17
+Create Date: 2025-05-23 14:10:38.916254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7e4c9b215d3'
+down_revision = 'f3a8d2c60b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_lease',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('holder', sa.String(length=120), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(), nullable=False),
+    sa.Column('renewed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('job_run',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_name', sa.String(length=50), nullable=False),
+    sa.Column('holder', sa.String(length=120), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('duration', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('result', sa.String(length=200), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('job_run', schema=None) as batch_op:
+        batch_op.create_index('ix_job_run_job_name_started_at', ['job_name', 'started_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('job_run', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_run_job_name_started_at')
+
+    op.drop_table('job_run')
+    op.drop_table('scheduler_lease')
@@ -0,0 +1,52 @@
+"""Add resume_upload outbox and Application.resume_pending
+
+Revision ID: b8f3c2e91d04
+Revises: 7c19d4a2f6b3
+Create Date: 2025-05-16 10:41:19.503827
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8f3c2e91d04'
+down_revision = '7c19d4a2f6b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('resume_pending', sa.Boolean(), nullable=False,
+                                      server_default=sa.false()))
+
+    op.create_table('resume_upload',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=200), nullable=False),
+    sa.Column('spool_path', sa.String(length=500), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['application_id'], ['application.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('application_id')
+    )
+    with op.batch_alter_table('resume_upload', schema=None) as batch_op:
+        batch_op.create_index('ix_resume_upload_status_next_attempt_at', ['status', 'next_attempt_at'],
+                              unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('resume_upload', schema=None) as batch_op:
+        batch_op.drop_index('ix_resume_upload_status_next_attempt_at')
+
+    op.drop_table('resume_upload')
+
+    with op.batch_alter_table('application', schema=None) as batch_op:
+        batch_op.drop_column('resume_pending')
@@ -0,0 +1,39 @@
+"""Add job_category_stats summary table
+
+Revision ID: c7d3a9e05f12
+Revises: 5b8e2f61c9d4
+Create Date: 2025-05-09 14:03:55.802114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d3a9e05f12'
+down_revision = '5b8e2f61c9d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_category_stats',
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('job_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+    with op.batch_alter_table('job_category_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_job_category_stats_job_count'), ['job_count'], unique=False)
+
+    # Seed the summary from the existing jobs
+    op.execute("""
+        INSERT INTO job_category_stats (category, job_count)
+        SELECT category, COUNT(*) FROM job GROUP BY category
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('job_category_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_job_category_stats_job_count'))
+
+    op.drop_table('job_category_stats')
@@ -0,0 +1,48 @@
+"""Add outgoing_email outbox
+
+Revision ID: d41a7c5e2f86
+Revises: b8f3c2e91d04
+Create Date: 2025-05-19 15:22:07.618342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7c5e2f86'
+down_revision = 'b8f3c2e91d04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outgoing_email',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=False),
+    sa.Column('sender', sa.String(length=255), nullable=True),
+    sa.Column('recipients', sa.Text(), nullable=False),
+    sa.Column('reply_to', sa.String(length=255), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('html', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('claim_token', sa.String(length=32), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('outgoing_email', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_outgoing_email_claim_token'), ['claim_token'], unique=False)
+        batch_op.create_index('ix_outgoing_email_status_next_attempt_at', ['status', 'next_attempt_at'],
+                              unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('outgoing_email', schema=None) as batch_op:
+        batch_op.drop_index('ix_outgoing_email_status_next_attempt_at')
+        batch_op.drop_index(batch_op.f('ix_outgoing_email_claim_token'))
+
+    op.drop_table('outgoing_email')
@@ -0,0 +1,40 @@
+"""Add denormalized application counters to Job
+
+Revision ID: e2b6f4c81a37
+Revises: c7d3a9e05f12
+Create Date: 2025-05-12 11:27:08.144591
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6f4c81a37'
+down_revision = 'c7d3a9e05f12'
+branch_labels = None
+depends_on = None
+
+STATUSES = ('applied', 'pending', 'reviewed', 'rejected', 'shortlisted', 'hired')
+COUNTERS = ['application_count'] + [f'{status}_count' for status in STATUSES]
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        for column in COUNTERS:
+            batch_op.add_column(sa.Column(column, sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the existing applications
+    assignments = ['application_count = (SELECT COUNT(*) FROM application WHERE application.job_id = job.id)']
+    assignments += [
+        f"{status}_count = (SELECT COUNT(*) FROM application "
+        f"WHERE application.job_id = job.id AND application.status = '{status}')"
+        for status in STATUSES
+    ]
+    op.execute(f"UPDATE job SET {', '.join(assignments)}")
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        for column in reversed(COUNTERS):
+            batch_op.drop_column(column)
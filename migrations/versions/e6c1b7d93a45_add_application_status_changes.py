@@ -0,0 +1,44 @@
+"""Add application_status_change for status digests
+
+Revision ID: e6c1b7d93a45
+Revises: d41a7c5e2f86
+Create Date: 2025-05-21 10:04:51.207316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c1b7d93a45'
+down_revision = 'd41a7c5e2f86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('application_status_change',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('applicant_id', sa.Integer(), nullable=False),
+    sa.Column('old_status', sa.String(length=20), nullable=True),
+    sa.Column('new_status', sa.String(length=20), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.Column('digested_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['application_id'], ['application.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['applicant_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('application_status_change', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_application_status_change_application_id'), ['application_id'],
+                              unique=False)
+        batch_op.create_index('ix_application_status_change_digested_at_applicant_id',
+                              ['digested_at', 'applicant_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('application_status_change', schema=None) as batch_op:
+        batch_op.drop_index('ix_application_status_change_digested_at_applicant_id')
+        batch_op.drop_index(batch_op.f('ix_application_status_change_application_id'))
+
+    op.drop_table('application_status_change')
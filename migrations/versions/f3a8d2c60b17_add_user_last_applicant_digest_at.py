@@ -0,0 +1,26 @@
+"""Add user.last_applicant_digest_at for employer digests
+
+Revision ID: f3a8d2c60b17
+Revises: e6c1b7d93a45
+Create Date: 2025-05-22 09:41:12.583906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8d2c60b17'
+down_revision = 'e6c1b7d93a45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_applicant_digest_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('last_applicant_digest_at')
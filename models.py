@@ -5,13 +5,28 @@ This module defines the data models used throughout the application:
 - User: Represents application users (job seekers, employers, admins)
 - Job: Represents job listings posted by employers
 - Application: Represents job applications submitted by job seekers
+- JobCategoryStat: Per-category job counts summarized for the home page
+- ResumeUpload: Outbox of spooled resumes waiting to be copied to storage
+- OutgoingEmail: Outbox of emails waiting to be sent
+- ApplicationStatusChange: Status changes waiting for the applicant's digest
+- SchedulerLease: Which process currently runs the periodic jobs
+- JobRun: History of periodic job runs
 
 All models use SQLAlchemy ORM for database interactions.
 """
 
 from datetime import datetime, timezone
 from sqlalchemy import UniqueConstraint
-from extensions import db, bcrypt
+from extensions import db
+from passwords import hash_password, verify_password, needs_rehash
+
+# Every value Application.status can take; each has a counter column on Job
+APPLICATION_STATUSES = ('applied', 'pending', 'reviewed', 'rejected', 'shortlisted', 'hired')
+
+
+def _utcnow():
+    """Per-row default timestamp (evaluated at insert time, not import time)."""
+    return datetime.now(timezone.utc)
 
 
 class User(db.Model):
@@ -28,6 +43,8 @@ class User(db.Model):
         password (str): Hashed password
         role (str): User's role (job_seeker, employer, or admin)
         profile_picture (str): Path to user's profile picture
+        last_applicant_digest_at (datetime): Cut-off of the employer's last
+                                             new-applicant digest (see digests.py)
         jobs_posted (relationship): Jobs posted by this user (for employers)
         applications (relationship): Job applications submitted by this user (for job seekers)
     """
@@ -39,19 +56,27 @@ class User(db.Model):
     role = db.Column(db.String(20), nullable=False, index=True)
     profile_picture = db.Column(
         db.String(200), nullable=True, default='img/profiles/default.jpg')
+    last_applicant_digest_at = db.Column(db.DateTime, nullable=True)
 
-    jobs_posted = db.relationship('Job', backref='poster', lazy=True, cascade="all, delete-orphan")
+    # passive_deletes: the ON DELETE CASCADE foreign keys remove unloaded rows
+    jobs_posted = db.relationship(
+        'Job', backref='poster', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
     applications = db.relationship(
-        'Application', backref='applicant', lazy=True, cascade="all, delete-orphan")
+        'Application', backref='applicant', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
 
     def set_password(self, password):
         """
         Set the user's password by hashing it with bcrypt.
         
+        Hashing runs on the password worker pool (see passwords.py).
+        
         Args:
             password (str): The plain text password to hash and store
+            
+        Raises:
+            PasswordHasherBusy: Too many hashes in flight (a 429 response)
         """
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = hash_password(password)
 
     def check_password(self, password):
         """
@@ -62,8 +87,20 @@ class User(db.Model):
             
         Returns:
             bool: True if password matches, False otherwise
+            
+        Raises:
+            PasswordHasherBusy: Too many hashes in flight (a 429 response)
         """
-        return bcrypt.check_password_hash(self.password, password)
+        return verify_password(self.password, password)
+
+    def password_needs_rehash(self):
+        """
+        Check whether the stored hash uses a cost other than BCRYPT_LOG_ROUNDS.
+        
+        Returns:
+            bool: True if the password should be hashed again at the next login
+        """
+        return needs_rehash(self.password)
 
     def __repr__(self):
         """String representation of the User object."""
@@ -85,7 +122,13 @@ class Job(db.Model):
         company_logo (str): Path to company logo
         posted_date (datetime): When the job was posted
         poster_id (int): Foreign key to the employer who posted the job
+        application_count (int): Number of applications for this job
+        <status>_count (int): Number of applications in each status of
+                              APPLICATION_STATUSES (e.g. hired_count)
         applications (relationship): Applications submitted for this job
+
+    The counters are maintained by the Application hooks in ``stats.py`` and
+    can be rebuilt with ``stats.repair_application_counts``.
     """
     __tablename__ = 'job'
     id = db.Column(db.Integer, primary_key=True)
@@ -93,22 +136,37 @@ class Job(db.Model):
     description = db.Column(db.Text, nullable=False)
     salary = db.Column(db.String(50))
     location = db.Column(db.String(100), nullable=False, index=True)
-    category = db.Column(db.String(50), nullable=False, index=True)
+    # active_history: the stats hooks need the previous value even when expired
+    category = db.column_property(
+        db.Column(db.String(50), nullable=False, index=True), active_history=True)
     company = db.Column(db.String(100), nullable=False, index=True)
     company_logo = db.Column(
         db.String(200), nullable=True, default='img/company_logos/default.png')
-    posted_date = db.Column(db.DateTime, default=datetime.now(timezone.utc), index=True)
-    poster_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    posted_date = db.Column(db.DateTime, default=_utcnow, server_default=db.func.now(), index=True)
+    poster_id = db.Column(
+        db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
 
-    applications = db.relationship('Application', backref='job', lazy=True, cascade="all, delete-orphan")
+    # Denormalized application counters
+    application_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    applied_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pending_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    reviewed_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rejected_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    shortlisted_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    hired_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    applications = db.relationship(
+        'Application', backref='job', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
 
     __table_args__ = (UniqueConstraint('title', 'company', 'poster_id', 'location',
-                                       name='uq_job_title_company_poster_location'),)
+                                       name='uq_job_title_company_poster_location'),
+                      # Keyset pagination order for the job listings
+                      db.Index('ix_job_posted_date_id', 'posted_date', 'id'))
 
-    # Property to easily get application count (consider if this causes N+1 issues later)
     @property
-    def application_count(self):
-        return len(self.applications)
+    def status_counts(self):
+        """Application counts keyed by status, read from the counter columns."""
+        return {status: getattr(self, f'{status}_count') for status in APPLICATION_STATUSES}
     
     def __repr__(self):
         """String representation of the Job object."""
@@ -127,16 +185,23 @@ class Application(db.Model):
         status (str): Current status of the application
                      (applied, pending, reviewed, rejected, shortlisted, hired)
         resume_path (str): Path to the uploaded resume file
+        resume_pending (bool): True while the resume is spooled locally and
+                               not yet in the storage backend (see ResumeUpload)
     """
     __tablename__ = 'application'
     id = db.Column(db.Integer, primary_key=True)
-    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False, index=True)
+    # active_history: the counter hooks need the previous value even when expired
+    job_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), nullable=False, index=True),
+        active_history=True)
     applicant_id = db.Column(
-        db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+        db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
     application_date = db.Column(
-        db.DateTime, default=datetime.now(timezone.utc), index=True)
-    status = db.Column(db.String(20), default='applied', index=True)
+        db.DateTime, default=_utcnow, server_default=db.func.now(), index=True)
+    status = db.column_property(
+        db.Column(db.String(20), default='applied', index=True), active_history=True)
     resume_path = db.Column(db.String(200), nullable=True)
+    resume_pending = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
 
     # Add unique constraint to prevent duplicate applications
     __table_args__ = (db.UniqueConstraint('job_id', 'applicant_id', name='_job_applicant_uc'),)
@@ -144,3 +209,211 @@ class Application(db.Model):
     def __repr__(self):
         """String representation of the Application object."""
         return f'<Application {self.id}>'
+
+
+class JobCategoryStat(db.Model):
+    """
+    Summary of how many jobs are listed in each category.
+
+    Maintained incrementally by the Job insert/update/delete hooks in
+    ``stats.py`` so the home page never has to scan the job table, and
+    periodically rebuilt by ``stats.reconcile_category_stats``.
+
+    Attributes:
+        category (str): Job category (primary key)
+        job_count (int): Number of jobs currently in the category
+    """
+    __tablename__ = 'job_category_stats'
+    category = db.Column(db.String(50), primary_key=True)
+    job_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+    def __repr__(self):
+        """String representation of the JobCategoryStat object."""
+        return f'<JobCategoryStat {self.category}: {self.job_count}>'
+
+
+class ResumeUpload(db.Model):
+    """
+    Outbox entry for a resume spooled to local disk at application time.
+
+    Committed in the same transaction as its Application; a background
+    worker copies the spooled file to the storage backend, retrying with
+    exponential backoff, and then marks the entry done (``resume_outbox.py``).
+
+    Attributes:
+        id (int): Primary key
+        application_id (int): Application the resume belongs to
+        key (str): Storage key, also stored in ``Application.resume_path``
+        spool_path (str): Local file holding the resume until it is uploaded
+        content_type (str): MIME type sent by the browser
+        status (str): 'pending', 'done' or 'failed' (attempts exhausted)
+        attempts (int): Upload attempts so far
+        next_attempt_at (datetime): When the worker may try (again)
+        last_error (str): Error of the last failed attempt
+        created_at (datetime): When the resume was spooled
+        completed_at (datetime): When the upload succeeded
+    """
+    __tablename__ = 'resume_upload'
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(
+        db.Integer, db.ForeignKey('application.id', ondelete='CASCADE'), nullable=False, unique=True)
+    key = db.Column(db.String(200), nullable=False)
+    spool_path = db.Column(db.String(500), nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    application = db.relationship('Application')
+
+    # The worker's "what is due" query
+    __table_args__ = (db.Index('ix_resume_upload_status_next_attempt_at', 'status', 'next_attempt_at'),)
+
+    def __repr__(self):
+        """String representation of the ResumeUpload object."""
+        return f'<ResumeUpload {self.key} ({self.status})>'
+
+
+class OutgoingEmail(db.Model):
+    """
+    Outbox entry for an email, sent in batches by ``mail_outbox.py``.
+
+    Attributes:
+        id (int): Primary key
+        subject (str): Subject line
+        sender (str): From address (``MAIL_DEFAULT_SENDER`` if empty)
+        recipients (str): Comma-separated To addresses
+        reply_to (str): Reply-To address, if any
+        body (str): Plain text body
+        html (str): HTML body, if any
+        status (str): 'pending', 'sent' or 'dead' (attempts exhausted or
+                      permanently rejected)
+        attempts (int): Send attempts so far
+        next_attempt_at (datetime): When a sender may try (again)
+        claim_token (str): Batch currently holding the entry
+        last_error (str): Error of the last failed attempt
+        created_at (datetime): When the email was queued
+        sent_at (datetime): When the SMTP server accepted it
+    """
+    __tablename__ = 'outgoing_email'
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(255), nullable=True)
+    recipients = db.Column(db.Text, nullable=False)
+    reply_to = db.Column(db.String(255), nullable=True)
+    body = db.Column(db.Text, nullable=False)
+    html = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    claim_token = db.Column(db.String(32), nullable=True, index=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    # The sender's "what is due" query
+    __table_args__ = (db.Index('ix_outgoing_email_status_next_attempt_at', 'status', 'next_attempt_at'),)
+
+    def __repr__(self):
+        """String representation of the OutgoingEmail object."""
+        return f'<OutgoingEmail {self.id} to {self.recipients} ({self.status})>'
+
+
+class ApplicationStatusChange(db.Model):
+    """
+    A change of ``Application.status``, recorded for the applicant's digest.
+
+    Inserted by an ``Application`` update hook in the same transaction as the
+    change; ``digests.send_status_digests`` sends each applicant one email
+    covering all their undigested changes and stamps ``digested_at``.
+
+    Attributes:
+        id (int): Primary key
+        application_id (int): Application whose status changed
+        applicant_id (int): Applicant to notify (copied from the application)
+        old_status (str): Status before the change
+        new_status (str): Status after the change
+        changed_at (datetime): When the change was committed
+        digested_at (datetime): When it was included in a digest
+    """
+    __tablename__ = 'application_status_change'
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(
+        db.Integer, db.ForeignKey('application.id', ondelete='CASCADE'), nullable=False, index=True)
+    applicant_id = db.Column(
+        db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    old_status = db.Column(db.String(20), nullable=True)
+    new_status = db.Column(db.String(20), nullable=True)
+    changed_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    digested_at = db.Column(db.DateTime, nullable=True)
+
+    # The digest's "what is undigested, per applicant" query
+    __table_args__ = (db.Index('ix_application_status_change_digested_at_applicant_id',
+                               'digested_at', 'applicant_id'),)
+
+    def __repr__(self):
+        """String representation of the ApplicationStatusChange object."""
+        return f'<ApplicationStatusChange {self.application_id}: {self.old_status} -> {self.new_status}>'
+
+
+class SchedulerLease(db.Model):
+    """
+    Lease electing the one process that runs the periodic jobs.
+
+    Every process runs ``scheduler.ClusterScheduler``; the one whose
+    ``holder`` is stored here, with an unexpired ``expires_at``, is the
+    leader and keeps renewing the lease. When it stops renewing, another
+    process takes the lease over once it expires.
+
+    Attributes:
+        name (str): Lease name (primary key)
+        holder (str): Process holding the lease (host:pid:random)
+        expires_at (datetime): When other processes may take the lease
+        acquired_at (datetime): When the current holder took the lease
+        renewed_at (datetime): Last renewal by the current holder
+    """
+    __tablename__ = 'scheduler_lease'
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(120), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    renewed_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+
+    def __repr__(self):
+        """String representation of the SchedulerLease object."""
+        return f'<SchedulerLease {self.name} held by {self.holder}>'
+
+
+class JobRun(db.Model):
+    """
+    One run of a periodic job (``scheduler.py``).
+
+    Attributes:
+        id (int): Primary key
+        job_name (str): Name of the periodic job
+        holder (str): Process that ran it
+        started_at (datetime): When the run started
+        duration (float): Run time in seconds
+        status (str): 'ok' or 'error'
+        result (str): The job's return value, if any
+        error (str): The exception, if the run failed
+    """
+    __tablename__ = 'job_run'
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(50), nullable=False)
+    holder = db.Column(db.String(120), nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    duration = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(10), nullable=False)
+    result = db.Column(db.String(200), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    # Latest runs of a job
+    __table_args__ = (db.Index('ix_job_run_job_name_started_at', 'job_name', 'started_at'),)
+
+    def __repr__(self):
+        """String representation of the JobRun object."""
+        return f'<JobRun {self.job_name} at {self.started_at} ({self.status})>'
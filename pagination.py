@@ -0,0 +1,130 @@
+"""
+Keyset (cursor) pagination for SQLAlchemy queries.
+
+Instead of ``OFFSET``, each page continues from the sort key of the last row
+of the previous page, so every page costs one index range scan no matter how
+deep the client scrolls.
+
+The sort key of the last row is handed to the client as an opaque, signed
+continuation token (``cursor``) which is passed back to fetch the next page.
+
+Usage:
+    keys = [(Job.posted_date, True), (Job.id, True)]
+    page = paginate_keyset(Job.query, keys, cursor=request.args.get('cursor'), per_page=20)
+    page.items, page.next_cursor
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+import sqlalchemy as sa
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+
+KeysetPage = namedtuple('KeysetPage', ['items', 'next_cursor'])
+
+
+class InvalidCursor(ValueError):
+    """Raised when a continuation token is malformed, tampered with or stale."""
+
+
+def _serializer(namespace=''):
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=f'keyset-cursor{namespace}')
+
+
+def encode_cursor(values, namespace=''):
+    """
+    Encode a row's sort key values as an opaque continuation token.
+
+    Args:
+        values (list): Sort key values of the last row on a page
+        namespace (str): Identifies the ordering; a token only decodes
+                         under the namespace it was encoded with
+
+    Returns:
+        str: URL-safe signed token
+    """
+    encoded = [{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    return _serializer(namespace).dumps(encoded)
+
+
+def decode_cursor(token, key_count, namespace=''):
+    """
+    Decode a continuation token produced by ``encode_cursor``.
+
+    Args:
+        token (str): Token from the client
+        key_count (int): Number of sort keys the token must contain
+        namespace (str): Namespace the token must have been encoded with
+
+    Returns:
+        list: Sort key values
+
+    Raises:
+        InvalidCursor: If the token is not valid for this key set
+    """
+    try:
+        encoded = _serializer(namespace).loads(token)
+    except BadSignature as e:
+        raise InvalidCursor('Invalid cursor') from e
+    if not isinstance(encoded, list) or len(encoded) != key_count:
+        raise InvalidCursor('Cursor does not match the requested ordering')
+    try:
+        return [datetime.fromisoformat(v['dt']) if isinstance(v, dict) else v for v in encoded]
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def _after(keys, values):
+    """Build the predicate selecting rows strictly after ``values`` in key order."""
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        # Uniform direction: a row-value comparison the planner can turn into
+        # a single index range scan
+        left = sa.tuple_(*(expression for expression, _ in keys))
+        right = sa.tuple_(*(sa.literal(v) for v in values))
+        return left < right if directions.pop() else left > right
+
+    clauses = []
+    for i, (expression, descending) in enumerate(keys):
+        equal = [keys[j][0] == values[j] for j in range(i)]
+        beyond = expression < values[i] if descending else expression > values[i]
+        clauses.append(sa.and_(*equal, beyond))
+    return sa.or_(*clauses)
+
+
+def paginate_keyset(query, keys, cursor=None, per_page=20, namespace=''):
+    """
+    Fetch one page of a query using keyset pagination.
+
+    Args:
+        query: SQLAlchemy ORM query selecting a single entity
+        keys (list): ``(expression, descending)`` pairs forming a unique
+                     total ordering; the last key should be the primary key
+        cursor (str): Continuation token from a previous page (optional)
+        per_page (int): Maximum number of items to return
+        namespace (str): Ordering identifier baked into the cursor, so a
+                         cursor from one ordering is rejected by another
+
+    Returns:
+        KeysetPage: items on this page and the token for the next page,
+                    or None as next_cursor when this is the last page
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded
+
+    Example:
+        page = paginate_keyset(Job.query, [(Job.posted_date, True), (Job.id, True)])
+    """
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, len(keys), namespace)))
+
+    labelled = [expression.label(f'_keyset_{i}') for i, (expression, _) in enumerate(keys)]
+    ordering = [expression.desc() if descending else expression.asc() for expression, descending in keys]
+    rows = query.add_columns(*labelled).order_by(*ordering).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(list(rows[-1][1:]), namespace)
+    return KeysetPage([row[0] for row in rows], next_cursor)
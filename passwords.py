@@ -0,0 +1,157 @@
+"""
+Password hashing off the request thread.
+
+bcrypt is deliberately slow. Run inline, a burst of logins keeps every worker
+busy hashing and ordinary page views queue behind them. This module:
+
+- Runs bcrypt hash and verify calls on a small per-app thread pool, so at
+  most ``PASSWORD_HASH_WORKERS`` hashes use the CPU at once (bcrypt releases
+  the GIL while it works)
+- Caps the calls in flight (running plus queued) at
+  ``PASSWORD_MAX_IN_FLIGHT``; past that, ``PasswordHasherBusy`` is raised,
+  which Flask turns into a ``429 Too Many Requests`` with ``Retry-After``
+- Hashes with the cost factor ``BCRYPT_LOG_ROUNDS`` and reports stored hashes
+  made with another cost (``needs_rehash``), so ``auth.login`` can upgrade
+  them once the user's password is known
+
+``User.set_password`` and ``User.check_password`` go through this module.
+
+Configuration:
+    BCRYPT_LOG_ROUNDS (int): bcrypt cost factor (work = 2 ** rounds)
+    PASSWORD_HASH_WORKERS (int): Threads hashing at the same time
+    PASSWORD_MAX_IN_FLIGHT (int): Calls running or queued before 429
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt as _bcrypt
+from flask import current_app
+from werkzeug.exceptions import TooManyRequests
+
+
+class PasswordHasherBusy(TooManyRequests):
+    """Raised when too many password hashes are already running or queued."""
+
+    description = 'Too many sign-in requests are being processed. Please try again in a moment.'
+
+
+class PasswordHasher:
+    """
+    Bounded bcrypt worker pool.
+
+    Args:
+        rounds (int): bcrypt cost factor for new hashes
+        workers (int): Pool threads
+        max_in_flight (int): Calls allowed running or queued at once
+    """
+
+    def __init__(self, rounds=12, workers=2, max_in_flight=16):
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy(retry_after=1)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """Return a new bcrypt hash of ``password`` made with ``self.rounds``."""
+        salt = _bcrypt.gensalt(self.rounds)
+        return self._run(_bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, stored_hash, password):
+        """Return True if ``password`` matches ``stored_hash``; False for malformed hashes."""
+        try:
+            return self._run(_bcrypt.checkpw, password.encode('utf-8'), stored_hash.encode('utf-8'))
+        except ValueError:
+            return False
+
+    def needs_rehash(self, stored_hash):
+        """Return True if ``stored_hash`` is a bcrypt hash made with a different cost."""
+        return hash_rounds(stored_hash) not in (None, self.rounds)
+
+    def shutdown(self):
+        """Stop the pool threads once queued calls finish."""
+        self._executor.shutdown(wait=True)
+
+
+def hash_rounds(stored_hash):
+    """
+    Read the cost factor from a bcrypt hash.
+
+    Args:
+        stored_hash (str): Hash such as ``$2b$12$...``
+
+    Returns:
+        int: The cost factor, or None if ``stored_hash`` is not a bcrypt hash
+    """
+    parts = (stored_hash or '').split('$')
+    if len(parts) != 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def init_app(app):
+    """
+    Create the application's password hasher.
+
+    Args:
+        app (Flask): Flask application instance
+
+    Side Effects:
+        - Stores a PasswordHasher in ``app.extensions['password_hasher']``
+    """
+    app.extensions['password_hasher'] = PasswordHasher(
+        rounds=app.config['BCRYPT_LOG_ROUNDS'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_in_flight=app.config['PASSWORD_MAX_IN_FLIGHT'])
+
+
+def _hasher():
+    return current_app.extensions['password_hasher']
+
+
+def hash_password(password):
+    """
+    Hash a password with the configured cost on the worker pool.
+
+    Args:
+        password (str): Plain text password
+
+    Returns:
+        str: bcrypt hash
+
+    Raises:
+        PasswordHasherBusy: Too many hashes in flight (a 429 response)
+    """
+    return _hasher().hash(password)
+
+
+def verify_password(stored_hash, password):
+    """
+    Check a password against a stored hash on the worker pool.
+
+    Args:
+        stored_hash (str): Hash from ``User.password``
+        password (str): Plain text password
+
+    Returns:
+        bool: True if the password matches
+
+    Raises:
+        PasswordHasherBusy: Too many hashes in flight (a 429 response)
+    """
+    return _hasher().verify(stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """Return True if ``stored_hash`` was made with a cost other than ``BCRYPT_LOG_ROUNDS``."""
+    return _hasher().needs_rehash(stored_hash)
@@ -0,0 +1,88 @@
+"""
+Listing queries with declared loader strategies.
+
+Each listing template reads a fixed set of attributes from related rows
+(e.g. ``application.job.title``). Loading those relationships lazily costs
+one query per row; the queries here declare the relationships each page
+needs up front (``joinedload`` for the many-to-one sides) and project only
+the columns the templates render, so a listing page costs a fixed number of
+queries regardless of how many rows it shows.
+
+Keep the ``load_only`` column lists in step with the templates named in each
+function: reading an unlisted column in the template falls back to a lazy load.
+"""
+
+from sqlalchemy.orm import joinedload, load_only
+
+from models import User, Job, Application
+
+# Columns shown wherever a job is summarized next to an application
+_JOB_SUMMARY = (Job.id, Job.title, Job.company, Job.location)
+
+
+def admin_user_listing():
+    """
+    Query for ``admin/users.html``: user rows without password hashes or profile fields.
+
+    Returns:
+        Query: User query projecting the listed columns
+    """
+    return User.query.options(load_only(User.id, User.username, User.email, User.role))
+
+
+def admin_job_listing():
+    """
+    Query for ``admin/jobs.html``: jobs with the poster's username.
+
+    Returns:
+        Query: Job query with the poster joined in
+    """
+    return Job.query.options(
+        load_only(Job.id, Job.title, Job.company, Job.category, Job.location,
+                  Job.posted_date, Job.poster_id),
+        joinedload(Job.poster).load_only(User.id, User.username),
+    )
+
+
+def admin_application_listing():
+    """
+    Query for ``admin/applications.html``: applications with job title and
+    applicant username.
+
+    Returns:
+        Query: Application query with job and applicant joined in
+    """
+    return Application.query.options(
+        joinedload(Application.job).load_only(Job.id, Job.title),
+        joinedload(Application.applicant).load_only(User.id, User.username),
+    )
+
+
+def seeker_application_listing(applicant_id):
+    """
+    Query for ``my_applications.html``: one seeker's applications with job summaries.
+
+    Args:
+        applicant_id (int): ID of the job seeker
+
+    Returns:
+        Query: Application query filtered to the seeker with the job joined in
+    """
+    return Application.query.filter_by(applicant_id=applicant_id).options(
+        joinedload(Application.job).load_only(*_JOB_SUMMARY),
+    )
+
+
+def job_application_listing(job_id):
+    """
+    Query for ``job_applications.html``: one job's applications with applicant details.
+
+    Args:
+        job_id (int): ID of the job
+
+    Returns:
+        Query: Application query filtered to the job with the applicant joined in
+    """
+    return Application.query.filter_by(job_id=job_id).options(
+        joinedload(Application.applicant).load_only(User.id, User.username, User.email),
+    )
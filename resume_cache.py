@@ -0,0 +1,309 @@
+"""
+Size-bounded local disk cache for resumes kept in remote storage.
+
+Employers tend to open the same candidates' resumes again and again. With
+the GCS backend each open fetched the object from the bucket again. The
+cache instead:
+
+- Keeps at most ``RESUME_CACHE_BYTES`` of resumes under ``RESUME_CACHE_DIR``
+  and evicts the least recently used ones beyond that
+- Names entries after the resume key and the object's ETag (its GCS
+  generation), so a re-uploaded resume is never served from a stale copy
+- Downloads into a temporary file and renames it into place, so readers
+  never see a partial file
+- Serializes downloads per key: concurrent requests for the same resume
+  wait for the single download instead of starting their own
+- Counts hits, misses and evictions (``stats``, shown at
+  ``/admin/resume-cache``)
+
+The directory is shared by every worker process, so it is also the index:
+a file's modification time is its last use (a hit touches it), and after
+each download the inserting process takes an exclusive ``flock`` on
+``.lock``, scans the directory and evicts the least recently used files
+until the real total is within the budget. The budget therefore holds for
+the whole directory however many workers fill it, and ``stats`` reports
+the directory's real entries and bytes; hits, misses and evictions are
+counted per process.
+
+The local backend is not cached: its files already are on local disk.
+
+Configuration:
+    RESUME_CACHE_DIR (str): Cache directory (not under ``static/``)
+    RESUME_CACHE_BYTES (int): Byte budget; 0 disables the cache
+
+Usage:
+    stored = storage.stat(key)
+    with open_cached_resume(storage, stored) as f:
+        ...
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from flask import current_app
+from werkzeug.security import safe_join
+
+from file_storage import LocalStorage, get_resume_storage
+from utils import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+_TEMP_PREFIX = '.fetch-'
+_LOCK_NAME = '.lock'
+# Temporary files older than this are left over from a crashed download;
+# younger ones may be another process's download in progress
+_STALE_TEMP_SECONDS = 3600
+_cache_lock = threading.Lock()
+
+
+def _touch(path):
+    # Explicit nanoseconds: the kernel's own "now" is only as fine as a clock tick
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+class _DirectoryLock:
+    """Hold a thread lock and an exclusive ``flock`` on a lock file."""
+
+    def __init__(self, thread_lock, path):
+        self._thread_lock = thread_lock
+        self._path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            try:
+                self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except BaseException:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            os.close(self._fd)  # releases the flock
+            self._fd = None
+        self._thread_lock.release()
+
+
+class ResumeCache:
+    """
+    LRU cache of files under a directory, bounded by their total size.
+
+    Args:
+        directory (str): Cache directory, created if missing; may be shared
+                         by several processes
+        max_bytes (int): Total size of the cached files to keep
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()  # guards the counters and the key locks
+        self._dir_lock = threading.Lock()  # this process's share of the directory lock
+        self._key_locks = {}  # cache key -> [lock, users]
+        os.makedirs(directory, exist_ok=True)
+        with self._directory_lock():
+            self._evict()
+
+    def _path(self, cache_key):
+        path = safe_join(self.directory, cache_key)
+        if path is None:
+            raise FileNotFoundError(cache_key)
+        return path
+
+    def _directory_lock(self):
+        """Exclusive lock on the directory across threads and processes."""
+        return _DirectoryLock(self._dir_lock, os.path.join(self.directory, _LOCK_NAME))
+
+    def _scan(self):
+        """Return ``(mtime_ns, path, size)`` per cached file; remove stale partial downloads."""
+        found = []
+        stale_before = time.time() - _STALE_TEMP_SECONDS
+        pending = [self.directory]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                            continue
+                        if entry.name == _LOCK_NAME:
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                        if entry.name.startswith(_TEMP_PREFIX):
+                            if st.st_mtime < stale_before:
+                                os.remove(entry.path)
+                            continue
+                    except FileNotFoundError:  # removed by another process meanwhile
+                        continue
+                    found.append((st.st_mtime_ns, entry.path, st.st_size))
+        return found
+
+    def _evict(self):
+        """
+        Remove least recently used files until the directory is within budget.
+        Hold the directory lock.
+
+        Returns:
+            tuple: Number of files and bytes left in the directory
+        """
+        found = sorted(self._scan())
+        total = sum(size for _, _, size in found)
+        evicted = 0
+        for _, path, size in found:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+        return len(found) - evicted, total
+
+    def _open_cached(self, cache_key):
+        """Open a cached file and mark it used, or return None if it is not cached."""
+        path = self._path(cache_key)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:  # not downloaded yet, or evicted
+            return None
+        try:
+            _touch(path)  # the modification time is the LRU order
+        except FileNotFoundError:  # evicted since; the open handle still reads it
+            pass
+        with self._lock:
+            self.hits += 1
+        return f
+
+    def _key_lock(self, cache_key):
+        with self._lock:
+            entry = self._key_locks.setdefault(cache_key, [threading.Lock(), 0])
+            entry[1] += 1
+        return entry
+
+    def _release_key_lock(self, cache_key, entry):
+        with self._lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_locks[cache_key]
+
+    def open(self, cache_key, fetch):
+        """
+        Open a cached file, downloading it first on a miss.
+
+        The file is opened before it can be evicted, so the returned handle
+        stays readable even if the cache removes the file meanwhile.
+
+        Args:
+            cache_key (str): Relative path naming the entry
+            fetch (callable): ``fetch(path)`` writes the content to ``path``;
+                              its exceptions (e.g. FileNotFoundError) propagate
+
+        Returns:
+            file: Binary file object positioned at the start
+        """
+        f = self._open_cached(cache_key)
+        if f is not None:
+            return f
+
+        entry = self._key_lock(cache_key)
+        try:
+            with entry[0]:
+                f = self._open_cached(cache_key)  # another request may have finished the download
+                if f is not None:
+                    return f
+                with self._lock:
+                    self.misses += 1
+                return self._download(cache_key, fetch)
+        finally:
+            self._release_key_lock(cache_key, entry)
+
+    def _download(self, cache_key, fetch):
+        path = self._path(cache_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=_TEMP_PREFIX)
+        os.close(fd)
+        try:
+            fetch(tmp_path)
+            size = os.path.getsize(tmp_path)
+            _touch(tmp_path)  # the fetch may have set the object's own mtime
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._directory_lock():
+            f = open(path, 'rb')
+            entries, total = self._evict()
+        logger.debug(f"Resume cache stored {cache_key} ({size} bytes, {entries} files and {total} bytes in cache)")
+        return f
+
+    def stats(self):
+        """
+        Return this process's hits, misses and evictions, and the directory's
+        entries, bytes and max_bytes.
+        """
+        found = self._scan()
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(found), 'bytes': sum(size for _, _, size in found),
+                    'max_bytes': self.max_bytes}
+
+
+def get_resume_cache(storage=None):
+    """
+    Return the application's resume cache, creating it on first use.
+
+    Args:
+        storage: Backend the resumes come from; defaults to the resume storage
+
+    Returns:
+        ResumeCache: The cache, or None when ``RESUME_CACHE_BYTES`` is 0 or
+                     the backend is already local
+    """
+    storage = storage or get_resume_storage()
+    if current_app.config['RESUME_CACHE_BYTES'] <= 0 or isinstance(storage, LocalStorage):
+        return None
+    cache = current_app.extensions.get('resume_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = current_app.extensions.get('resume_cache')
+            if cache is None:
+                cache = current_app.extensions['resume_cache'] = ResumeCache(
+                    current_app.config['RESUME_CACHE_DIR'], current_app.config['RESUME_CACHE_BYTES'])
+    return cache
+
+
+def open_cached_resume(storage, stored):
+    """
+    Open a stored resume through the cache.
+
+    Args:
+        storage: Resume storage backend
+        stored (StoredObject): Result of ``storage.stat``; its ETag names the entry,
+                               and the download is pinned to that version
+
+    Returns:
+        file: Binary file object, or None when caching is disabled
+    """
+    cache = get_resume_cache(storage)
+    if cache is None:
+        return None
+    return cache.open(f'{stored.key}~{stored.etag}',
+                      lambda path: storage.download_to_filename(stored.key, path, stored))
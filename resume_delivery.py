@@ -0,0 +1,162 @@
+"""
+Handing resume downloads to the front proxy or the object store.
+
+Streaming a resume through ``serve_resume`` keeps a worker busy for the whole
+transfer, which on a slow client connection can take much longer than the
+permission checks. With ``RESUME_DELIVERY`` set, Flask only authorizes the
+request and answers with a small response telling someone else to move the
+bytes:
+
+- 'stream': the worker streams the file itself (default)
+- 'x-accel-redirect': an empty response with ``X-Accel-Redirect:
+  <RESUME_ACCEL_PREFIX><key>``; nginx serves it from an ``internal``
+  location, e.g. ``alias`` to ``RESUME_STORAGE_DIR`` or ``proxy_pass`` to
+  the bucket
+- 'x-sendfile': an empty response with ``X-Sendfile: <absolute path>`` (under
+  ``RESUME_STORAGE_DIR``) for Apache mod_xsendfile/lighttpd. Needs files on
+  local disk; with a remote backend the download is streamed instead
+- 'signed-url': a redirect to a URL valid for ``RESUME_SIGNED_URL_TTL``
+  seconds. With ``RESUME_URL_SIGNER = 'gcs'`` it is a V4 signed URL and the
+  browser downloads straight from the bucket; with 'local' it is a token for
+  ``utils.serve_signed_resume``, signed with ``SECRET_KEY``, which stands in
+  for the object store in development and tests
+
+In the offload modes only the storage backend is consulted; the legacy
+"local file first" check of ``serve_resume`` is skipped.
+
+Configuration:
+    RESUME_DELIVERY (str): One of ``DELIVERY_MODES``
+    RESUME_ACCEL_PREFIX (str): nginx internal location for resumes
+    RESUME_SIGNED_URL_TTL (int): Seconds a signed URL stays valid
+    RESUME_URL_SIGNER (str): 'gcs' or 'local'; defaults to 'gcs' when
+        STORAGE_BACKEND is 'gcs'
+"""
+
+import mimetypes
+import os
+from urllib.parse import quote
+
+from flask import current_app, redirect, url_for
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from file_storage import GCSStorage, LocalStorage
+
+DELIVERY_MODES = ('stream', 'x-accel-redirect', 'x-sendfile', 'signed-url')
+
+
+class LocalURLSigner:
+    """
+    Signs resume keys into expiring URL tokens, like an object store would.
+
+    Args:
+        secret_key (str): Signing key (the application ``SECRET_KEY``)
+        salt (str): Namespace keeping these tokens apart from other signatures
+    """
+
+    def __init__(self, secret_key, salt='resume-download'):
+        self._serializer = URLSafeTimedSerializer(secret_key, salt=salt)
+
+    def sign(self, key, download_name):
+        """Return a URL-safe token for ``key``."""
+        return self._serializer.dumps({'k': key, 'n': download_name})
+
+    def unsign(self, token, max_age):
+        """
+        Check a token and return what it was signed for.
+
+        Args:
+            token (str): Token from ``sign``
+            max_age (int): Seconds the token stays valid
+
+        Returns:
+            tuple: (key, download_name)
+
+        Raises:
+            BadSignature: Tampered with, or older than ``max_age``
+                          (``SignatureExpired`` is a subclass)
+        """
+        data = self._serializer.loads(token, max_age=max_age)
+        return data['k'], data['n']
+
+
+def local_signer():
+    """Return the stand-in signer keyed with the application's ``SECRET_KEY``."""
+    return LocalURLSigner(current_app.config['SECRET_KEY'])
+
+
+def _attachment(response, download_name):
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    response.mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    response.cache_control.private = True
+    response.cache_control.no_store = True
+    return response
+
+
+def signed_resume_url(storage, key, download_name):
+    """
+    Return a short-lived URL downloading ``key``.
+
+    Args:
+        storage: Resume storage backend
+        key (str): Resume key, e.g. ``'42/resume.pdf'``
+        download_name (str): File name suggested to the browser
+
+    Returns:
+        str: Absolute URL valid for ``RESUME_SIGNED_URL_TTL`` seconds
+
+    Raises:
+        ValueError: ``RESUME_URL_SIGNER`` is 'gcs' but the backend is not GCS,
+                    or the signer is unknown
+    """
+    config = current_app.config
+    signer = config['RESUME_URL_SIGNER']
+    if signer == 'local':
+        return url_for('utils.serve_signed_resume', token=local_signer().sign(key, download_name),
+                       _external=True)
+    if signer == 'gcs':
+        if not isinstance(storage, GCSStorage):
+            raise ValueError('RESUME_URL_SIGNER is gcs but the resume storage is not a GCS bucket')
+        return storage.signed_url(key, config['RESUME_SIGNED_URL_TTL'], download_name)
+    raise ValueError(f'Unknown RESUME_URL_SIGNER {signer!r}')
+
+
+def offload_resume(storage, key, download_name):
+    """
+    Build the response handing a resume download to the proxy or object store.
+
+    Call only after the requester is authorized. No storage request is made:
+    a missing file is reported by whoever serves the bytes.
+
+    Args:
+        storage: Resume storage backend
+        key (str): Resume key, e.g. ``'42/resume.pdf'``
+        download_name (str): File name suggested to the browser
+
+    Returns:
+        Response: The offload response, or None when the worker should stream
+                  the file itself ('stream' mode, or 'x-sendfile' without a
+                  local backend)
+
+    Raises:
+        ValueError: Unknown ``RESUME_DELIVERY`` or ``RESUME_URL_SIGNER``
+    """
+    config = current_app.config
+    mode = config['RESUME_DELIVERY']
+    if mode == 'stream':
+        return None
+    if mode == 'x-accel-redirect':
+        response = _attachment(current_app.response_class(), download_name)
+        response.headers['X-Accel-Redirect'] = f"{config['RESUME_ACCEL_PREFIX'].rstrip('/')}/{quote(key)}"
+        return response
+    if mode == 'x-sendfile':
+        if not isinstance(storage, LocalStorage):
+            return None
+        response = _attachment(current_app.response_class(), download_name)
+        response.headers['X-Sendfile'] = os.path.abspath(storage.local_path(key))
+        return response
+    if mode == 'signed-url':
+        response = redirect(signed_resume_url(storage, key, download_name))
+        response.cache_control.private = True
+        response.cache_control.no_store = True  # the URL expires; never reuse the redirect
+        return response
+    raise ValueError(f'Unknown RESUME_DELIVERY {mode!r}')
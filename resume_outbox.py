@@ -0,0 +1,226 @@
+"""
+Resume uploads through a transactional outbox.
+
+``jobs.apply_job`` used to upload the resume to storage before creating the
+``Application``, so submitting waited on the object store and failed outright
+on a transient storage error. Now:
+
+1. ``spool_resume`` writes the upload to ``RESUME_SPOOL_DIR`` on local disk
+2. ``enqueue_resume`` adds a ``ResumeUpload`` row and flags the application
+   ``resume_pending``; the route commits both with the application, so there
+   is never an application without its pending upload or the reverse
+3. After the commit, ``dispatch_upload`` wakes the background worker
+   (``background.PollingWorker``; or,
+   with ``RESUME_UPLOAD_WORKERS = 0``, uploads inline)
+4. ``upload_resume`` copies the spooled file to the storage backend, marks
+   the row 'done', clears ``resume_pending`` and deletes the spooled file.
+   A failed attempt is retried after ``RESUME_UPLOAD_RETRY_SECONDS``, doubling
+   each time (capped at an hour); after ``RESUME_UPLOAD_MAX_ATTEMPTS`` the row
+   is marked 'failed' and the spooled file kept for inspection
+
+Workers claim a row by pushing its ``next_attempt_at`` past a lease, so
+several processes can drain the same outbox, and a row claimed by a process
+that died is picked up again once the lease ends. Rows left over from a
+restart are drained when the worker starts (on the next application) or with
+``flask upload-resumes``.
+
+While ``resume_pending`` is set, ``serve_resume`` serves the spooled file.
+
+Configuration:
+    RESUME_SPOOL_DIR (str): Local directory for resumes awaiting upload
+    RESUME_UPLOAD_WORKERS (int): Worker threads; 0 uploads inline after commit
+    RESUME_UPLOAD_MAX_ATTEMPTS (int): Attempts before a row is marked failed
+    RESUME_UPLOAD_RETRY_SECONDS (int): Delay before the first retry
+    RESUME_UPLOAD_POLL_SECONDS (int): How often idle workers look for due rows
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import click
+import sqlalchemy as sa
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+from background import get_worker
+from extensions import db
+from file_storage import get_resume_storage
+from models import Application, ResumeUpload
+from utils import ALLOWED_RESUME_EXTENSIONS, allowed_file, logger
+
+STATUS_PENDING = 'pending'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+# A claimed row is not retried by another worker for this long
+CLAIM_LEASE = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def spool_resume(file_storage, user_id):
+    """
+    Write an uploaded resume to the local spool directory.
+
+    Args:
+        file_storage (FileStorage): The file object from the request
+        user_id (int): The ID of the user uploading the file
+
+    Returns:
+        tuple: (storage key, spool path), or None if the file type is not allowed
+    """
+    if not file_storage or not allowed_file(file_storage.filename, ALLOWED_RESUME_EXTENSIONS):
+        logger.warning(f"spool_resume: Invalid file type attempted: {getattr(file_storage, 'filename', None)}")
+        return None
+
+    filename = secure_filename(file_storage.filename)
+    spool_dir = current_app.config['RESUME_SPOOL_DIR']
+    os.makedirs(spool_dir, exist_ok=True)
+    fd, spool_path = tempfile.mkstemp(dir=spool_dir, prefix=f'{user_id}-', suffix=f'-{filename}')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            file_storage.stream.seek(0)
+            while chunk := file_storage.stream.read(65536):
+                out.write(chunk)
+    except BaseException:
+        os.remove(spool_path)
+        raise
+    return f"{user_id}/{filename}", spool_path
+
+
+def discard_spooled(spool_path):
+    """Remove a spooled resume whose application was not committed."""
+    if spool_path and os.path.exists(spool_path):
+        os.remove(spool_path)
+
+
+def enqueue_resume(application, key, spool_path, content_type=None):
+    """
+    Attach a spooled resume to an application and queue its upload.
+
+    Only adds to the session: the caller commits, together with the application.
+
+    Args:
+        application (Application): New or existing application
+        key (str): Storage key from ``spool_resume``
+        spool_path (str): Spooled file from ``spool_resume``
+        content_type (str): MIME type of the upload
+
+    Returns:
+        ResumeUpload: The outbox row
+    """
+    application.resume_path = key
+    application.resume_pending = True
+    upload = ResumeUpload(application=application, key=key, spool_path=spool_path,
+                          content_type=content_type, status=STATUS_PENDING, next_attempt_at=_now())
+    db.session.add(upload)
+    return upload
+
+
+def _retry_delay(attempts):
+    base = timedelta(seconds=current_app.config['RESUME_UPLOAD_RETRY_SECONDS'])
+    return min(base * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def upload_resume(upload_id):
+    """
+    Make one attempt at copying a due outbox row to the storage backend.
+
+    Args:
+        upload_id (int): ResumeUpload ID
+
+    Returns:
+        bool: True if the resume is now in storage; False if the attempt
+              failed or the row was not due (done, failed, or claimed by
+              another worker)
+
+    Side Effects:
+        - Commits the claim, then the outcome of the attempt
+        - On success clears ``Application.resume_pending`` and deletes the
+          spooled file
+    """
+    now = _now()
+    claimed = db.session.execute(
+        sa.update(ResumeUpload)
+        .where(ResumeUpload.id == upload_id, ResumeUpload.status == STATUS_PENDING,
+               ResumeUpload.next_attempt_at <= now)
+        .values(next_attempt_at=now + CLAIM_LEASE, attempts=ResumeUpload.attempts + 1)
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+    if claimed.rowcount == 0:
+        return False
+
+    upload = db.session.get(ResumeUpload, upload_id)
+    try:
+        with open(upload.spool_path, 'rb') as spooled:
+            get_resume_storage().save(upload.key, spooled, upload.content_type)
+    except Exception as e:
+        upload.last_error = str(e)[:1000]
+        if isinstance(e, FileNotFoundError) or upload.attempts >= current_app.config['RESUME_UPLOAD_MAX_ATTEMPTS']:
+            upload.status = STATUS_FAILED
+            logger.error(f"Giving up uploading resume {upload.key} after {upload.attempts} attempts: {str(e)}")
+        else:
+            upload.next_attempt_at = _now() + _retry_delay(upload.attempts)
+            logger.warning(f"Uploading resume {upload.key} failed (attempt {upload.attempts}), "
+                           f"retrying at {upload.next_attempt_at:%H:%M:%S}: {str(e)}")
+        db.session.commit()
+        return False
+
+    upload.status = STATUS_DONE
+    upload.completed_at = _now()
+    upload.last_error = None
+    db.session.execute(
+        sa.update(Application).where(Application.id == upload.application_id).values(resume_pending=False)
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+    discard_spooled(upload.spool_path)
+    logger.info(f"Uploaded spooled resume {upload.key} for application {upload.application_id}")
+    return True
+
+
+def process_due_uploads(limit=100):
+    """
+    Attempt every outbox row that is due, oldest first.
+
+    Args:
+        limit (int): Most rows attempted in one call
+
+    Returns:
+        int: Number of resumes uploaded
+    """
+    due = db.session.scalars(
+        sa.select(ResumeUpload.id)
+        .where(ResumeUpload.status == STATUS_PENDING, ResumeUpload.next_attempt_at <= _now())
+        .order_by(ResumeUpload.next_attempt_at)
+        .limit(limit)).all()
+    return sum(upload_resume(upload_id) for upload_id in due)
+
+
+def dispatch_upload(upload_id):
+    """
+    Start uploading a committed outbox row.
+
+    With ``RESUME_UPLOAD_WORKERS = 0`` the upload runs inline; a failure is
+    left in the outbox for a later attempt instead of being raised.
+
+    Args:
+        upload_id (int): ResumeUpload ID
+    """
+    app = current_app._get_current_object()
+    if app.config['RESUME_UPLOAD_WORKERS'] <= 0:
+        upload_resume(upload_id)
+        return
+    get_worker(app, 'resume_upload', process_due_uploads, app.config['RESUME_UPLOAD_WORKERS'],
+               app.config['RESUME_UPLOAD_POLL_SECONDS']).notify()
+
+
+def register_commands(app):
+    """Register the outbox CLI command on the Flask app."""
+    @app.cli.command('upload-resumes')
+    def upload_resumes_command():
+        """Upload every spooled resume that is due now."""
+        uploaded = process_due_uploads(limit=None)
+        click.echo(f"Uploaded {uploaded} resumes.")
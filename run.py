@@ -1,9 +1,11 @@
 import os
 from app import create_app
 from config import config
+from scheduler import init_scheduler
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     env = os.environ.get("APP_ENV", "development")
     app = create_app(config[env])
+    init_scheduler(app)  # Only the web server takes part in the scheduler election
     app.run(debug=app.config.get("DEBUG", False), host='0.0.0.0', port=port, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,373 @@
+"""
+Periodic jobs, run by a single leader across the cluster.
+
+With N gunicorn workers on M nodes, a scheduler in every worker would run
+each job N×M times. Instead every web server process starts a
+``ClusterScheduler`` (an APScheduler ``BackgroundScheduler``), but only the
+leader runs the jobs:
+
+- Leadership is the ``scheduler_lease`` row. Every third of
+  ``SCHEDULER_LEASE_SECONDS`` each process tries to take or renew it with one
+  conditional UPDATE, which succeeds only for the current holder or once the
+  lease has expired, so a leader that dies is replaced within one lease
+- Before each run the leader renews the lease again, so a process that lost
+  it (paused, cut off from the database) skips the run instead of running it
+  alongside the new leader
+- Every run is recorded in ``job_run`` with its duration and result or
+  error (``flask scheduler-status`` shows the latest ones); rows older than
+  ``SCHEDULER_HISTORY_DAYS`` are pruned by a job of their own. Jobs declared
+  with ``record_idle=False`` (the frequent outbox drains) are recorded only
+  when they processed something or failed
+
+The lease only needs a database both processes write to, so the same
+mechanism elects one process on a single node with SQLite.
+
+``create_app`` does not start the scheduler, so CLI commands (``flask db
+upgrade``, ``flask run-job``) and scripts never take part in the election.
+``init_scheduler`` is called by the web server entry points only: the
+gunicorn ``post_worker_init`` hook in ``gunicorn.conf.py`` and ``run.py``.
+
+Jobs are declared in ``JOBS``: a name, a function called in an application
+context, and the config setting holding the interval. An interval of 0
+disables the job. ``flask run-job <name>`` runs one immediately.
+
+Configuration:
+    SCHEDULER_ENABLED (bool): Start the scheduler in web server processes
+    SCHEDULER_LEASE_SECONDS (int): How long a lease lasts without renewal
+    SCHEDULER_INTERVAL_MINUTES (int): Category stats reconciliation interval
+    SCHEDULER_REPAIR_HOURS (int): Application counter repair interval
+    SCHEDULER_HISTORY_DAYS (int): How long job runs are kept
+"""
+
+import atexit
+import os
+import socket
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+import click
+import sqlalchemy as sa
+from apscheduler.schedulers.background import BackgroundScheduler
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+import digests
+import mail_outbox
+import resume_outbox
+import stats
+from extensions import db
+from models import SchedulerLease, JobRun
+from utils import logger
+
+LEASE_NAME = 'scheduler'
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+
+
+class PeriodicJob(namedtuple('PeriodicJob', 'name func setting unit record_idle', defaults=(True,))):
+    """
+    A job run every ``app.config[setting]`` ``unit`` (e.g. 'minutes').
+
+    Args:
+        name (str): Job name, used in the run history and ``flask run-job``
+        func (callable): Called without arguments in an application context
+        setting (str): Config key holding the interval; 0 disables the job
+        unit (str): 'seconds', 'minutes' or 'hours'
+        record_idle (bool): Record runs whose result is falsy (nothing done);
+                            False keeps frequent polling jobs out of ``job_run``
+    """
+
+    def interval(self, config):
+        """Return the job's interval as a timedelta (zero when disabled)."""
+        return timedelta(**{self.unit: config[self.setting]})
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def prune_job_runs():
+    """
+    Delete job runs older than ``SCHEDULER_HISTORY_DAYS``.
+
+    Returns:
+        int: Number of runs deleted
+    """
+    cutoff = _now() - timedelta(days=current_app.config['SCHEDULER_HISTORY_DAYS'])
+    result = db.session.execute(sa.delete(JobRun).where(JobRun.started_at < cutoff))
+    db.session.commit()
+    return result.rowcount
+
+
+JOBS = (
+    PeriodicJob('reconcile-category-stats', stats.reconcile_category_stats, 'SCHEDULER_INTERVAL_MINUTES', 'minutes'),
+    PeriodicJob('repair-application-counts', stats.repair_application_counts, 'SCHEDULER_REPAIR_HOURS', 'hours'),
+    PeriodicJob('send-status-digests', digests.send_status_digests, 'STATUS_DIGEST_MINUTES', 'minutes'),
+    PeriodicJob('send-employer-digests', digests.send_employer_digests, 'EMPLOYER_DIGEST_HOURS', 'hours'),
+    # Outbox drains: catch rows left over from a restart, before any request has
+    # started a worker; idle passes (most of them) are not recorded
+    PeriodicJob('send-mail', mail_outbox.drain_outbox, 'MAIL_POLL_SECONDS', 'seconds', record_idle=False),
+    PeriodicJob('upload-resumes', resume_outbox.process_due_uploads, 'RESUME_UPLOAD_POLL_SECONDS', 'seconds',
+                record_idle=False),
+    PeriodicJob('prune-job-runs', prune_job_runs, 'SCHEDULER_REPAIR_HOURS', 'hours'),
+)
+
+
+def acquire_lease(name, holder, ttl):
+    """
+    Take or renew a lease unless another holder's lease is still valid.
+
+    Args:
+        name (str): Lease name
+        holder (str): Identity of the calling process
+        ttl (timedelta): How long the lease lasts from now
+
+    Returns:
+        bool: True if ``holder`` now holds the lease
+
+    Side Effects:
+        - Commits the renewal, or rolls back a lost race to create the row
+    """
+    now = _now()
+    renewed = db.session.execute(
+        sa.update(SchedulerLease)
+        .where(SchedulerLease.name == name,
+               sa.or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+        .values(holder=holder, expires_at=now + ttl, renewed_at=now,
+                acquired_at=sa.case((SchedulerLease.holder == holder, SchedulerLease.acquired_at), else_=now))
+        .execution_options(synchronize_session=False))
+    if renewed.rowcount:
+        db.session.commit()
+        return True
+    if db.session.get(SchedulerLease, name) is not None:
+        db.session.rollback()
+        return False
+    try:
+        db.session.add(SchedulerLease(name=name, holder=holder, expires_at=now + ttl,
+                                      acquired_at=now, renewed_at=now))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # another process created it first
+        return False
+    return True
+
+
+def release_lease(name, holder):
+    """
+    Give up a lease so another process can take it without waiting for it to expire.
+
+    Args:
+        name (str): Lease name
+        holder (str): Identity of the calling process
+    """
+    db.session.execute(
+        sa.update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=_now())
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+
+
+def execute_job(job, holder):
+    """
+    Run a job once and record the run in ``job_run``.
+
+    Args:
+        job (PeriodicJob): The job to run
+        holder (str): Process running it, stored with the run
+
+    Returns:
+        JobRun: The recorded run, or None for an idle run of a job declared
+                with ``record_idle=False``
+    """
+    started_at = _now()
+    start = time.perf_counter()
+    try:
+        result = job.func()
+    except Exception as e:
+        db.session.rollback()
+        status, result, error = STATUS_ERROR, None, f'{type(e).__name__}: {str(e)}'
+        logger.error(f"Periodic job {job.name} failed: {error}")
+    else:
+        status, error = STATUS_OK, None
+    duration = time.perf_counter() - start
+    if status == STATUS_OK and not result and not job.record_idle:
+        logger.debug(f"Periodic job {job.name} had nothing to do ({duration:.3f}s)")
+        return None
+    run = JobRun(job_name=job.name, holder=holder, started_at=started_at, duration=duration, status=status,
+                 result=None if result is None else str(result)[:200], error=error)
+    db.session.add(run)
+    db.session.commit()
+    logger.info(f"Periodic job {job.name} finished in {duration:.3f}s ({status}, result {result})")
+    return run
+
+
+class ClusterScheduler:
+    """
+    APScheduler running ``jobs`` in this process while it holds the lease.
+
+    Args:
+        app (Flask): Application whose context the jobs run in
+        jobs (iterable[PeriodicJob]): Jobs to schedule
+    """
+
+    def __init__(self, app, jobs=JOBS):
+        self.app = app
+        self.jobs = tuple(jobs)
+        self.holder = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.is_leader = False
+        self._scheduler = None
+
+    def _renew(self):
+        ttl = timedelta(seconds=self.app.config['SCHEDULER_LEASE_SECONDS'])
+        try:
+            leader = acquire_lease(LEASE_NAME, self.holder, ttl)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Scheduler lease renewal failed for {self.holder}: {str(e)}")
+            leader = False
+        if leader != self.is_leader:
+            logger.info(f"Scheduler {self.holder} {'is now' if leader else 'is no longer'} the leader")
+        self.is_leader = leader
+        return leader
+
+    def renew(self):
+        """
+        Take or renew the lease.
+
+        Returns:
+            bool: True if this process is the leader
+        """
+        with self.app.app_context():
+            try:
+                return self._renew()
+            finally:
+                db.session.remove()
+
+    def run_job(self, job):
+        """
+        Run a job if this process still holds the lease.
+
+        Args:
+            job (PeriodicJob): The job to run
+
+        Returns:
+            bool: True if the job ran here (see ``job_run`` for the outcome)
+        """
+        with self.app.app_context():
+            try:
+                if not self._renew():
+                    return False
+                execute_job(job, self.holder)
+                return True
+            finally:
+                db.session.remove()
+
+    def start(self):
+        """Start renewing the lease and scheduling the jobs in background threads."""
+        lease_seconds = self.app.config['SCHEDULER_LEASE_SECONDS']
+        scheduler = BackgroundScheduler(timezone=timezone.utc,
+                                        job_defaults={'coalesce': True, 'max_instances': 1})
+        scheduler.add_job(self.renew, 'interval', seconds=max(lease_seconds / 3, 1), id='scheduler-lease',
+                          next_run_time=_now())
+        for job in self.jobs:
+            interval = job.interval(self.app.config)
+            if interval <= timedelta(0):
+                logger.info(f"Periodic job {job.name} is disabled ({job.setting} = 0)")
+                continue
+            scheduler.add_job(self.run_job, 'interval', args=[job], seconds=interval.total_seconds(),
+                              id=job.name, name=job.name)
+        scheduler.start()
+        self._scheduler = scheduler
+        logger.info(f"Scheduler {self.holder} started with {len(scheduler.get_jobs()) - 1} periodic jobs")
+
+    def scheduled_jobs(self):
+        """Return the APScheduler jobs of this process (excluding the lease renewal)."""
+        if self._scheduler is None:
+            return []
+        return [job for job in self._scheduler.get_jobs() if job.id != 'scheduler-lease']
+
+    def stop(self, wait=True):
+        """
+        Stop scheduling and release the lease if held.
+
+        Args:
+            wait (bool): Wait for running jobs to finish
+        """
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=wait)
+        self._scheduler = None
+        if self.is_leader:
+            with self.app.app_context():
+                try:
+                    release_lease(LEASE_NAME, self.holder)
+                except Exception as e:
+                    logger.warning(f"Releasing the scheduler lease failed: {str(e)}")
+                finally:
+                    db.session.remove()
+            self.is_leader = False
+
+
+def init_scheduler(app):
+    """
+    Start the application's cluster scheduler if ``SCHEDULER_ENABLED``.
+
+    Called once per web server process, after it has loaded the app.
+
+    Args:
+        app (Flask): Flask application instance
+
+    Returns:
+        ClusterScheduler: The running scheduler, or None if disabled
+
+    Side Effects:
+        - Stores the scheduler in ``app.extensions['scheduler']``
+        - Releases the lease when the process exits
+    """
+    if not app.config['SCHEDULER_ENABLED']:
+        return None
+    if 'scheduler' in app.extensions:
+        return app.extensions['scheduler']
+    scheduler = app.extensions['scheduler'] = ClusterScheduler(app)
+    scheduler.start()
+    atexit.register(scheduler.stop, wait=False)
+    return scheduler
+
+
+def _find_job(name):
+    for job in JOBS:
+        if job.name == name:
+            return job
+    raise click.BadParameter(f"Unknown job {name!r}; expected one of: {', '.join(job.name for job in JOBS)}")
+
+
+def register_commands(app):
+    """Register the scheduler CLI commands on the Flask app."""
+    @app.cli.command('run-job')
+    @click.argument('name')
+    def run_job_command(name):
+        """Run a periodic job now, without taking the lease."""
+        # A run started by hand is always recorded, even if it had nothing to do
+        job = _find_job(name)._replace(record_idle=True)
+        run = execute_job(job, f'cli:{socket.gethostname()}:{os.getpid()}')
+        click.echo(f"{run.job_name}: {run.status} in {run.duration:.3f}s"
+                   f"{f' ({run.error})' if run.error else f', result {run.result}'}")
+
+    @app.cli.command('scheduler-status')
+    def scheduler_status_command():
+        """Show the lease holder and the latest run of each periodic job."""
+        lease = db.session.get(SchedulerLease, LEASE_NAME)
+        if lease is None:
+            click.echo("No scheduler has taken the lease yet.")
+        else:
+            click.echo(f"Leader: {lease.holder} (since {lease.acquired_at:%Y-%m-%d %H:%M:%S}, "
+                       f"lease expires {lease.expires_at:%H:%M:%S} UTC)")
+        latest = sa.select(sa.func.max(JobRun.id)).group_by(JobRun.job_name)
+        runs = {run.job_name: run for run in db.session.scalars(sa.select(JobRun).where(JobRun.id.in_(latest)))}
+        for job in JOBS:
+            run = runs.get(job.name)
+            last = (f"{run.started_at:%Y-%m-%d %H:%M:%S} {run.status} in {run.duration:.3f}s"
+                    if run else 'never run')
+            click.echo(f"{job.name:28} every {job.interval(app.config)}: {last}")
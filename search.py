@@ -0,0 +1,365 @@
+"""
+Full-text search for job listings.
+
+This module replaces the leading-wildcard ``ILIKE`` scans used by the job
+listing endpoints with a real full-text index:
+
+- SQLite: an external-content FTS5 virtual table (``job_fts``) kept in sync
+  with the ``job`` table by triggers
+- PostgreSQL: GIN indexes over ``to_tsvector`` expressions on the job columns
+- Other databases: falls back to ``ILIKE`` filters
+
+The index DDL is attached to the ``job`` table so ``db.create_all()`` builds it
+alongside the table; existing databases get it from the matching migration.
+
+Search text is parsed by ``parse_query`` into terms that are then rendered
+either as an FTS5 ``MATCH`` expression or as a PostgreSQL ``tsquery``.
+
+``facet_counts`` computes grouped category/location/company counts for the
+same filter set, cached per normalized set of filters.
+"""
+
+import re
+import threading
+from collections import namedtuple
+
+import sqlalchemy as sa
+from cachetools import TTLCache
+from flask import current_app, has_app_context
+from sqlalchemy import DDL, event
+
+from extensions import db
+from models import Job, User
+
+FTS_TABLE = 'job_fts'
+SEARCH_COLUMNS = ('title', 'description', 'company', 'category', 'location')
+FILTER_COLUMNS = ('location', 'category', 'company')
+FACET_COLUMNS = ('category', 'location', 'company')
+
+# Text search configurations: the full document is stemmed, the short
+# per-column filters are not so that filter words match as typed
+TS_CONFIG = 'english'
+TS_FILTER_CONFIG = 'simple'
+
+SearchTerm = namedtuple('SearchTerm', ['words', 'prefix', 'negated'])
+
+_TOKEN_RE = re.compile(r'(-?)"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# --- Index DDL ---
+
+_SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {', '.join(SEARCH_COLUMNS)},
+        content='job', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES (new.id, {', '.join('new.' + c for c in SEARCH_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join('old.' + c for c in SEARCH_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE OF {', '.join(SEARCH_COLUMNS)} ON job BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join('old.' + c for c in SEARCH_COLUMNS)});
+        INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES (new.id, {', '.join('new.' + c for c in SEARCH_COLUMNS)});
+    END
+    """,
+]
+
+_SQLITE_DROP = [f"DROP TABLE IF EXISTS {FTS_TABLE}"]
+
+
+def _pg_document_sql():
+    """SQL expression for the full search document (must match the index)."""
+    parts = " || ' ' || ".join(f"coalesce({c}, '')" for c in SEARCH_COLUMNS)
+    return f"to_tsvector('{TS_CONFIG}', {parts})"
+
+
+_PG_CREATE = [
+    f"CREATE INDEX IF NOT EXISTS ix_job_search_tsv ON job USING gin ({_pg_document_sql()})",
+] + [
+    f"CREATE INDEX IF NOT EXISTS ix_job_{c}_tsv ON job USING gin (to_tsvector('{TS_FILTER_CONFIG}', {c}))"
+    for c in FILTER_COLUMNS
+]
+
+for _statement in _SQLITE_CREATE:
+    event.listen(Job.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in _SQLITE_DROP:
+    event.listen(Job.__table__, 'before_drop', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in _PG_CREATE:
+    event.listen(Job.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+def rebuild_index():
+    """
+    Rebuild the SQLite FTS index from the contents of the ``job`` table.
+
+    Only needed after rows were written with the triggers absent (e.g. a
+    restored backup). PostgreSQL expression indexes never drift, so this is a
+    no-op there.
+    """
+    if _dialect() == 'sqlite':
+        db.session.execute(sa.text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
+
+
+# --- Query parsing ---
+
+def parse_query(text):
+    """
+    Parse free-form search text into a list of search terms.
+
+    Supported syntax:
+        - Bare words match by prefix (``dev`` matches ``developer``)
+        - ``"quoted phrases"`` match the exact word sequence
+        - A trailing ``*`` is accepted and ignored (bare words are prefixes)
+        - A leading ``-`` excludes the term (``python -django``)
+
+    Punctuation is discarded; a token containing several words
+    (``full-stack``) becomes a phrase.
+
+    Args:
+        text (str): Raw search text from the user
+
+    Returns:
+        list[SearchTerm]: Parsed terms, empty if nothing searchable remains
+
+    Example:
+        parse_query('python "data engineer" -junior')
+    """
+    terms = []
+    for negated_phrase, phrase, bare in _TOKEN_RE.findall(text or ''):
+        if phrase or negated_phrase:
+            words = tuple(w.lower() for w in _WORD_RE.findall(phrase))
+            if words:
+                terms.append(SearchTerm(words, False, bool(negated_phrase)))
+            continue
+        negated = bare.startswith('-') and len(bare) > 1
+        words = tuple(w.lower() for w in _WORD_RE.findall(bare))
+        if words:
+            terms.append(SearchTerm(words, len(words) == 1, negated))
+    return terms
+
+
+def to_fts5(terms, column=None):
+    """
+    Render parsed terms as an SQLite FTS5 ``MATCH`` expression.
+
+    Args:
+        terms (list[SearchTerm]): Output of ``parse_query``
+        column (str): Restrict the match to one indexed column (optional)
+
+    Returns:
+        str: FTS5 expression, or None if there is no positive term
+    """
+    def render(term):
+        quoted = '"' + ' '.join(term.words) + '"'
+        return quoted + '*' if term.prefix else quoted
+
+    positive = [render(t) for t in terms if not t.negated]
+    if not positive:
+        return None
+    expression = ' AND '.join(positive)
+    for term in terms:
+        if term.negated:
+            expression = f"({expression}) NOT {render(term)}"
+    if column:
+        expression = f"{column} : ({expression})"
+    return expression
+
+
+def to_tsquery(terms):
+    """
+    Render parsed terms as a PostgreSQL ``to_tsquery`` string.
+
+    Args:
+        terms (list[SearchTerm]): Output of ``parse_query``
+
+    Returns:
+        str: tsquery text, or None if there is no positive term
+    """
+    def render(term):
+        if len(term.words) > 1:
+            return '(' + ' <-> '.join(term.words) + ')'
+        return term.words[0] + (':*' if term.prefix else '')
+
+    if not any(not t.negated for t in terms):
+        return None
+    return ' & '.join(('!' if t.negated else '') + render(t) for t in terms)
+
+
+# --- Query building ---
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def _sqlite_search(query, text_terms, filters):
+    expressions = []
+    text_expression = to_fts5(text_terms) if text_terms else None
+    if text_expression:
+        expressions.append(text_expression)
+    for column, terms in filters.items():
+        column_expression = to_fts5(terms, column=column)
+        if column_expression:
+            expressions.append(column_expression)
+    if not expressions:
+        return query, None
+
+    fts = sa.table(FTS_TABLE, sa.column('rowid'), sa.column('rank'))
+    match = ' AND '.join(f"({e})" for e in expressions)
+    query = query.join(fts, fts.c.rowid == Job.id).filter(
+        sa.literal_column(FTS_TABLE).op('MATCH')(match))
+    # FTS5 'rank' is bm25(); lower is more relevant
+    rank = fts.c.rank if text_expression else None
+    return query, rank
+
+
+def _postgres_search(query, text_terms, filters):
+    rank = None
+    tsquery = to_tsquery(text_terms) if text_terms else None
+    if tsquery:
+        document = sa.literal_column(_pg_document_sql())
+        ts = sa.func.to_tsquery(TS_CONFIG, tsquery)
+        query = query.filter(document.op('@@')(ts))
+        # Negated so that, as with FTS5, ascending order is most relevant first
+        rank = -sa.func.ts_rank(document, ts)
+    for column, terms in filters.items():
+        column_tsquery = to_tsquery(terms)
+        if column_tsquery:
+            # Inline the config name so the expression matches ix_job_<column>_tsv
+            config_name = sa.literal_column(f"'{TS_FILTER_CONFIG}'::regconfig")
+            vector = sa.func.to_tsvector(config_name, getattr(Job, column))
+            query = query.filter(vector.op('@@')(sa.func.to_tsquery(config_name, column_tsquery)))
+    return query, rank
+
+
+def _fallback_search(query, text_terms, filters):
+    for term in text_terms:
+        pattern = f"%{' '.join(term.words)}%"
+        condition = sa.or_(*(getattr(Job, c).ilike(pattern) for c in SEARCH_COLUMNS))
+        query = query.filter(sa.not_(condition) if term.negated else condition)
+    for column, terms in filters.items():
+        for term in terms:
+            query = query.filter(getattr(Job, column).ilike(f"%{' '.join(term.words)}%"))
+    return query, None
+
+
+def build_search_query(q=None, location=None, category=None, company=None):
+    """
+    Build a ranked job query from free text and per-column filters.
+
+    Args:
+        q (str): Free-text query over title, description, company,
+                 category and location (optional)
+        location (str): Location filter (optional)
+        category (str): Category filter (optional)
+        company (str): Company filter (optional)
+
+    Returns:
+        tuple: (query, rank) where query is a ``Job`` query with all filters
+               applied and rank is a SQL expression to order by (ascending is
+               most relevant first), or None when no free text was given
+
+    Example:
+        query, rank = build_search_query(q='python', location='remote')
+    """
+    text_terms = parse_query(q)
+    filters = {}
+    for column, value in (('location', location), ('category', category), ('company', company)):
+        terms = [t for t in parse_query(value) if not t.negated]
+        if terms:
+            # Filters keep their old substring feel: every word is a prefix
+            filters[column] = [SearchTerm((w,), True, False) for t in terms for w in t.words]
+
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        return _sqlite_search(Job.query, text_terms, filters)
+    if dialect == 'postgresql':
+        return _postgres_search(Job.query, text_terms, filters)
+    return _fallback_search(Job.query, text_terms, filters)
+
+
+# --- Facets ---
+
+_facet_cache_lock = threading.Lock()
+
+
+def _facet_cache():
+    """Return the application's facet cache, creating it on first use."""
+    cache = current_app.extensions.get('facet_cache')
+    if cache is None:
+        with _facet_cache_lock:
+            cache = current_app.extensions.setdefault('facet_cache', TTLCache(
+                maxsize=current_app.config['FACET_CACHE_SIZE'],
+                ttl=current_app.config['FACET_CACHE_TTL']))
+    return cache
+
+
+@event.listens_for(Job, 'after_insert')
+@event.listens_for(Job, 'after_update')
+@event.listens_for(Job, 'after_delete')
+@event.listens_for(User, 'after_delete')  # cascades to the user's jobs in the database
+def _invalidate_facet_cache(mapper, connection, target):
+    if not has_app_context():
+        return
+    cache = current_app.extensions.get('facet_cache')
+    if cache is not None:
+        with _facet_cache_lock:
+            cache.clear()
+
+
+def facet_counts(q=None, location=None, category=None, company=None, facets=FACET_COLUMNS, limit=10):
+    """
+    Count matching jobs per category, location and company.
+
+    Each facet is one grouped aggregate query over the same filter set as
+    ``build_search_query``; no job rows are loaded. Results are cached per
+    normalized filter tuple (see ``FACET_CACHE_TTL``) and the cache is
+    cleared whenever a job is written.
+
+    Args:
+        q, location, category, company: Same filters as ``build_search_query``
+        facets (iterable): Facet columns to compute (subset of FACET_COLUMNS)
+        limit (int): Number of top values returned per facet
+
+    Returns:
+        dict: Facet name to a list of ``{'value': ..., 'count': ...}`` dicts,
+              most frequent first
+
+    Example:
+        facet_counts(q='python', facets=('category',), limit=5)
+    """
+    filters = {'q': q, 'location': location, 'category': category, 'company': company}
+    normalized = tuple((name, tuple(parse_query(value))) for name, value in filters.items())
+    cache = _facet_cache()
+    result = {}
+    for column in facets:
+        key = (normalized, column, limit)
+        with _facet_cache_lock:
+            counts = cache.get(key)
+        if counts is None:
+            query, _ = build_search_query(**filters)
+            attribute = getattr(Job, column)
+            count = sa.func.count(Job.id)
+            rows = (query.with_entities(attribute, count)
+                    .group_by(attribute)
+                    .order_by(count.desc(), attribute)
+                    .limit(limit)
+                    .all())
+            counts = [{'value': value, 'count': n} for value, n in rows]
+            with _facet_cache_lock:
+                cache[key] = counts
+        result[column] = counts
+    return result
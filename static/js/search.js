@@ -25,7 +25,7 @@ function handleSearch(event) {
                     <div class="row g-4">
                         <div class="col-sm-12 col-md-8 d-flex align-items-center">
                             <img class="flex-shrink-0 img-fluid border rounded" 
-                                src="/static/${job.company_logo}" 
+                                src="/static/${job.company_logo_thumbnail}" 
                                 alt="${job.company} logo"
                                 style="width: 80px; height: 80px; object-fit: cover;">
                             <div class="text-start ps-4">
@@ -0,0 +1,227 @@
+"""
+Incrementally maintained summary statistics.
+
+- Home page category counts: ``job_category_stats`` is adjusted in the same
+  transaction as every ORM insert, update and delete of a ``Job``
+- Application counters: ``Job.application_count`` and the per-status
+  ``<status>_count`` columns are adjusted in the same transaction as every
+  ORM insert, status change and delete of an ``Application``
+
+Deleting a ``User`` cascades to their jobs and applications in the database
+(``ON DELETE CASCADE``) without loading them, so a ``before_delete`` hook on
+``User`` subtracts those rows from both summaries with grouped statements.
+
+Other writes that bypass the ORM (bulk Core inserts, raw SQL deletes) do not
+fire these hooks. ``reconcile_category_stats`` and
+``repair_application_counts`` rebuild the summaries in bulk and are available
+as ``flask reconcile-stats`` and ``flask repair-application-counts``.
+"""
+
+import click
+import sqlalchemy as sa
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import User, Job, JobCategoryStat, Application, APPLICATION_STATUSES
+from utils import logger
+
+_stats = JobCategoryStat.__table__
+_jobs = Job.__table__
+_applications = Application.__table__
+
+
+def _adjust(connection, category, delta):
+    """Add ``delta`` to a category's job count inside the current transaction."""
+    if category is None or delta == 0:
+        return
+    dialect = connection.dialect.name
+    if delta > 0 and dialect in ('sqlite', 'postgresql'):
+        insert = (sqlite.insert if dialect == 'sqlite' else postgresql.insert)(_stats)
+        connection.execute(
+            insert.values(category=category, job_count=delta).on_conflict_do_update(
+                index_elements=[_stats.c.category],
+                set_={'job_count': _stats.c.job_count + delta}))
+        return
+
+    result = connection.execute(
+        _stats.update()
+        .where(_stats.c.category == category)
+        .values(job_count=_stats.c.job_count + delta))
+    if result.rowcount == 0 and delta > 0:
+        connection.execute(_stats.insert().values(category=category, job_count=delta))
+    elif delta < 0:
+        connection.execute(
+            _stats.delete().where(_stats.c.category == category, _stats.c.job_count <= 0))
+
+
+@event.listens_for(Job, 'after_insert')
+def _job_inserted(mapper, connection, target):
+    _adjust(connection, target.category, 1)
+
+
+@event.listens_for(Job, 'after_delete')
+def _job_deleted(mapper, connection, target):
+    _adjust(connection, target.category, -1)
+
+
+@event.listens_for(Job, 'after_update')
+def _job_updated(mapper, connection, target):
+    history = inspect(target).attrs.category.history
+    if not history.has_changes():
+        return
+    for old in history.deleted:
+        _adjust(connection, old, -1)
+    for new in history.added:
+        _adjust(connection, new, 1)
+
+
+def _adjust_application_counts(connection, job_id, status, delta):
+    """Add ``delta`` to a job's total and per-status application counters."""
+    if job_id is None:
+        return
+    values = {'application_count': _jobs.c.application_count + delta}
+    if status in APPLICATION_STATUSES:
+        column = _jobs.c[f'{status}_count']
+        values[column.name] = column + delta
+    connection.execute(_jobs.update().where(_jobs.c.id == job_id).values(**values))
+
+
+@event.listens_for(Application, 'after_insert')
+def _application_inserted(mapper, connection, target):
+    _adjust_application_counts(connection, target.job_id, target.status, 1)
+
+
+@event.listens_for(Application, 'after_delete')
+def _application_deleted(mapper, connection, target):
+    _adjust_application_counts(connection, target.job_id, target.status, -1)
+
+
+@event.listens_for(Application, 'after_update')
+def _application_updated(mapper, connection, target):
+    state = inspect(target)
+    job_history = state.attrs.job_id.history
+    status_history = state.attrs.status.history
+    if not job_history.has_changes() and not status_history.has_changes():
+        return
+    old_job_id = job_history.deleted[0] if job_history.deleted else target.job_id
+    old_status = status_history.deleted[0] if status_history.deleted else target.status
+    _adjust_application_counts(connection, old_job_id, old_status, -1)
+    _adjust_application_counts(connection, target.job_id, target.status, 1)
+
+
+def _count_applications(*conditions):
+    """Correlated subquery counting a job's applications matching ``conditions``."""
+    return (sa.select(sa.func.count())
+            .where(_applications.c.job_id == _jobs.c.id, *conditions)
+            .scalar_subquery())
+
+
+@event.listens_for(User, 'before_delete')
+def _user_deleting(mapper, connection, target):
+    # Jobs and applications still in the database at this point are about to
+    # be removed by the foreign key cascade (ones loaded in the session were
+    # already deleted through the ORM and adjusted by the hooks above)
+    categories = connection.execute(
+        sa.select(_jobs.c.category, sa.func.count())
+        .where(_jobs.c.poster_id == target.id)
+        .group_by(_jobs.c.category)).all()
+    for category, count in categories:
+        _adjust(connection, category, -count)
+
+    by_user = _applications.c.applicant_id == target.id
+    values = {'application_count': _jobs.c.application_count - _count_applications(by_user)}
+    for status in APPLICATION_STATUSES:
+        column = _jobs.c[f'{status}_count']
+        values[column.name] = column - _count_applications(by_user, _applications.c.status == status)
+    connection.execute(
+        _jobs.update()
+        .where(_jobs.c.id.in_(sa.select(_applications.c.job_id).where(by_user)))
+        .values(**values))
+
+
+def top_categories(limit=None):
+    """
+    Read job counts per category from the summary table.
+
+    Args:
+        limit (int): Maximum number of categories to return (optional)
+
+    Returns:
+        list[tuple]: (category, count) pairs, largest first
+    """
+    query = (db.session.query(JobCategoryStat.category, JobCategoryStat.job_count)
+             .filter(JobCategoryStat.job_count > 0)
+             .order_by(JobCategoryStat.job_count.desc(), JobCategoryStat.category))
+    if limit:
+        query = query.limit(limit)
+    return [(category, count) for category, count in query.all()]
+
+
+def reconcile_category_stats():
+    """
+    Rebuild ``job_category_stats`` from the job table.
+
+    Corrects any drift caused by writes that bypassed the ORM hooks.
+
+    Returns:
+        int: Number of categories whose count was corrected
+
+    Side Effects:
+        - Rewrites rows in job_category_stats and commits
+        - Logs the number of corrected categories
+    """
+    actual = dict(db.session.query(Job.category, sa.func.count(Job.id)).group_by(Job.category).all())
+    stored = dict(db.session.query(JobCategoryStat.category, JobCategoryStat.job_count).all())
+
+    corrected = 0
+    for category in set(actual) | set(stored):
+        count = actual.get(category, 0)
+        if stored.get(category) == count:
+            continue
+        corrected += 1
+        if count:
+            db.session.merge(JobCategoryStat(category=category, job_count=count))
+        else:
+            db.session.query(JobCategoryStat).filter_by(category=category).delete()
+    db.session.commit()
+    if corrected:
+        logger.warning(f"Reconciled job_category_stats: corrected {corrected} categories")
+    return corrected
+
+
+def repair_application_counts():
+    """
+    Recompute every job's application counters from the application table.
+
+    Runs as a single ``UPDATE`` with correlated aggregate subqueries, so no
+    rows are loaded into Python regardless of table size.
+
+    Returns:
+        int: Number of job rows updated
+
+    Side Effects:
+        - Rewrites the counter columns of every job and commits
+    """
+    values = {'application_count': _count_applications()}
+    for status in APPLICATION_STATUSES:
+        values[f'{status}_count'] = _count_applications(_applications.c.status == status)
+    result = db.session.execute(_jobs.update().values(**values))
+    db.session.commit()
+    logger.info(f"Repaired application counters for {result.rowcount} jobs")
+    return result.rowcount
+
+
+def register_commands(app):
+    """Register the stats maintenance CLI commands on the Flask app."""
+    @app.cli.command('reconcile-stats')
+    def reconcile_stats_command():
+        """Rebuild the home page category counts from the job table."""
+        corrected = reconcile_category_stats()
+        click.echo(f"Corrected {corrected} categories.")
+
+    @app.cli.command('repair-application-counts')
+    def repair_application_counts_command():
+        """Recompute the application counters on every job."""
+        updated = repair_application_counts()
+        click.echo(f"Repaired application counters for {updated} jobs.")
@@ -154,6 +154,19 @@ def test_admin_delete_job(admin_client):
     resp = admin_client.post(f'/admin/jobs/{job.id}/delete', follow_redirects=True)
     assert b'deleted' in resp.data or resp.status_code == 200
 
+def test_admin_delete_job_cascades_applications(admin_client):
+    seeker = User(username='seeker', email='seeker@example.com', password='hash', role='job_seeker')
+    job = Job(title='CascadeJob', description='desc', location='Pune', category='IT', company='Acme', poster_id=1)
+    db.session.add_all([seeker, job])
+    db.session.commit()
+    db.session.add(Application(job_id=job.id, applicant_id=seeker.id, status='applied'))
+    db.session.commit()
+    job_id = job.id
+    db.session.expunge_all()
+    resp = admin_client.post(f'/admin/jobs/{job_id}/delete', follow_redirects=True)
+    assert b'Job deleted successfully' in resp.data
+    assert Application.query.filter_by(job_id=job_id).count() == 0
+
 def test_admin_applications(admin_client):
     resp = admin_client.get('/admin/applications')
     assert resp.status_code == 200
@@ -0,0 +1,34 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks import endpoints
+from benchmarks.endpoints import run_suite, compare
+
+@pytest.fixture
+def tiny_size(monkeypatch):
+    monkeypatch.setitem(endpoints.SIZES, 'tiny',
+                        dict(admins=1, employers=3, seekers=20, jobs=30, applications=100))
+    return 'tiny'
+
+def test_run_suite_records_metrics(tiny_size, tmp_path):
+    results = run_suite([tiny_size], iterations=3, warmup=1, data_dir=str(tmp_path),
+                        endpoints=['jobs.jobs_list', 'admin.admin_applications', 'auth.login',
+                                   'utils.serve_resume'])
+    metrics = results['results'][tiny_size]
+    assert set(metrics) == {'jobs.jobs_list', 'admin.admin_applications', 'auth.login', 'utils.serve_resume'}
+    for values in metrics.values():
+        assert values['p50_ms'] <= values['p95_ms'] <= values['p99_ms']
+        assert values['queries'] >= 1
+        assert values['peak_kib'] > 0
+    assert metrics['auth.login']['status'] == 302
+    assert results['meta']['sizes'][tiny_size]['jobs'] == 30
+
+def test_compare_flags_latency_and_query_regressions():
+    def result(p95, queries):
+        return {'results': {'small': {'main.index': {'p95_ms': p95, 'queries': queries}}}}
+
+    assert compare(result(11.0, 2), result(10.0, 2))[0]['regressed'] is False
+    assert compare(result(13.0, 2), result(10.0, 2))[0]['regressed'] is True
+    assert compare(result(9.0, 3), result(10.0, 2))[0]['regressed'] is True
+    assert compare(result(9.0, 2), {'results': {}}) == []
@@ -0,0 +1,88 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job, Application
+
+@pytest.fixture
+def admin_client():
+    app = create_app(config['testing'])
+    app.config['ADMIN_PER_PAGE'] = 2
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@example.com', password='hash', role='admin')
+            db.session.add(admin)
+            db.session.add_all([
+                User(username=f'user{i}', email=f'user{i}@example.com', password='hash',
+                     role='employer' if i % 2 else 'job_seeker')
+                for i in range(5)
+            ])
+            db.session.commit()
+            with client.session_transaction() as sess:
+                sess['user_id'] = admin.id
+                sess['role'] = 'admin'
+            yield client
+            db.session.remove()
+            db.drop_all()
+
+def fetch_all(client, url):
+    rows, pages = [], 0
+    while url:
+        data = client.get(url).get_json()
+        rows.extend(data['rows'])
+        url = data['next']
+        pages += 1
+    return rows, pages
+
+def test_users_json_pages_through_every_row(admin_client):
+    rows, pages = fetch_all(admin_client, '/admin/users?format=json')
+    assert pages == 3
+    assert [row['id'] for row in rows] == [6, 5, 4, 3, 2, 1]
+
+def test_users_sort_and_filter(admin_client):
+    rows, _ = fetch_all(admin_client, '/admin/users?format=json&sort=username&dir=asc&role=employer')
+    assert [row['username'] for row in rows] == ['user1', 'user3']
+    rows, _ = fetch_all(admin_client, '/admin/users?format=json&sort=email&dir=desc&email=user')
+    assert [row['email'] for row in rows] == [f'user{i}@example.com' for i in range(4, -1, -1)]
+
+def test_unknown_sort_and_filter_values_fall_back(admin_client):
+    data = admin_client.get('/admin/users?format=json&sort=password&role=root&dir=up').get_json()
+    assert data['sort'] == 'id' and data['dir'] == 'desc'
+    assert data['filters'] == {}
+
+def test_prefix_filter_escapes_wildcards(admin_client):
+    data = admin_client.get('/admin/users?format=json&username=%25').get_json()
+    assert data['rows'] == []
+
+def test_cursor_is_tied_to_ordering(admin_client):
+    data = admin_client.get('/admin/users?format=json&sort=username').get_json()
+    assert admin_client.get(f"/admin/users?sort=email&cursor={data['next_cursor']}").status_code == 400
+    assert admin_client.get('/admin/users?cursor=bogus').status_code == 400
+
+def test_html_table_links_next_page(admin_client):
+    resp = admin_client.get('/admin/users?sort=username&dir=asc')
+    assert resp.status_code == 200
+    assert b'Next Page' in resp.data
+    assert b'user0' in resp.data and b'user1' not in resp.data
+
+def test_jobs_and_applications_tables(admin_client):
+    employer = User.query.filter_by(username='user1').first()
+    seeker = User.query.filter_by(username='user0').first()
+    job = Job(title='Engineer', description='Build', location='Remote', category='IT',
+              company='Acme', poster_id=employer.id)
+    db.session.add(job)
+    db.session.commit()
+    db.session.add(Application(job_id=job.id, applicant_id=seeker.id, status='pending'))
+    db.session.commit()
+
+    data = admin_client.get('/admin/jobs?format=json&company=Ac&sort=posted_date').get_json()
+    assert [(row['title'], row['posted_by']) for row in data['rows']] == [('Engineer', 'user1')]
+
+    data = admin_client.get('/admin/applications?format=json&status=pending').get_json()
+    assert [(row['job_title'], row['applicant']) for row in data['rows']] == [('Engineer', 'user0')]
+    assert admin_client.get('/admin/applications?format=json&status=hired').get_json()['rows'] == []
+    assert admin_client.get('/admin/applications?sort=status').status_code == 200
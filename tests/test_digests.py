@@ -0,0 +1,195 @@
+import sys
+import os
+import pytest
+from datetime import datetime, timedelta, timezone
+from contextlib import contextmanager
+from sqlalchemy import event
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job, Application, ApplicationStatusChange, OutgoingEmail
+from mail_outbox import LocalSMTPServer
+from digests import send_status_digests, send_employer_digests
+
+@pytest.fixture
+def smtp():
+    with LocalSMTPServer() as server:
+        yield server
+
+@pytest.fixture
+def app(smtp):
+    app = create_app(config['testing'])
+    state = app.extensions['mail']
+    state.server, state.port, state.use_tls, state.suppress = '127.0.0.1', smtp.port, False, False
+    state.default_sender = 'portal@example.com'
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(username='employer', email='employer@example.com', password='hash', role='employer'),
+            User(username='admin', email='admin@example.com', password='hash', role='admin'),
+            User(username='alice', email='alice@example.com', password='hash', role='job_seeker'),
+            User(username='bob', email='bob@example.com', password='hash', role='job_seeker'),
+        ])
+        db.session.add_all([
+            Job(title='Engineer', description='Build', location='Remote', category='IT', company='Acme', poster_id=1),
+            Job(title='Designer', description='Draw', location='Remote', category='Design', company='Acme',
+                poster_id=1),
+        ])
+        db.session.flush()
+        db.session.add_all([
+            Application(job_id=1, applicant_id=3), Application(job_id=2, applicant_id=3),
+            Application(job_id=1, applicant_id=4),
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@contextmanager
+def count_queries():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+def login(app, user_id, role):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['role'] = role
+    return client
+
+def test_status_updates_are_recorded(app):
+    employer, admin = login(app, 1, 'employer'), login(app, 2, 'admin')
+    assert employer.post('/applications/1/update', data={'status': 'reviewed'}).status_code == 302
+    assert admin.post('/admin/applications/1/update', data={'status': 'shortlisted'}).status_code == 302
+    changes = ApplicationStatusChange.query.order_by(ApplicationStatusChange.id).all()
+    assert [(c.applicant_id, c.old_status, c.new_status) for c in changes] == [
+        (3, 'applied', 'reviewed'), (3, 'reviewed', 'shortlisted')]
+    assert all(c.digested_at is None for c in changes)
+
+def test_unchanged_status_is_not_recorded(app):
+    application = db.session.get(Application, 1)
+    application.status = 'applied'
+    db.session.commit()
+    assert ApplicationStatusChange.query.count() == 0
+
+def test_one_digest_per_applicant(app, smtp):
+    employer = login(app, 1, 'employer')
+    for application_id, status in [(1, 'reviewed'), (1, 'shortlisted'), (2, 'rejected'), (3, 'hired')]:
+        employer.post(f'/applications/{application_id}/update', data={'status': status})
+
+    assert send_status_digests() == 2
+    assert smtp.connections == 1
+    assert sorted(rcpt[0] for _, rcpt, _ in smtp.messages) == ['alice@example.com', 'bob@example.com']
+
+    alice = OutgoingEmail.query.filter_by(recipients='alice@example.com').one()
+    assert alice.subject == 'Updates on 2 of your job applications'
+    assert 'Engineer at Acme: Shortlisted' in alice.body
+    assert 'Designer at Acme: Rejected' in alice.body
+    assert 'Reviewed' not in alice.body  # only the latest status of each application
+    assert '<strong>Engineer</strong>' in alice.html
+    bob = OutgoingEmail.query.filter_by(recipients='bob@example.com').one()
+    assert bob.subject == 'An update on your job application'
+
+    assert ApplicationStatusChange.query.filter(ApplicationStatusChange.digested_at.is_(None)).count() == 0
+    assert send_status_digests() == 0
+
+def test_later_changes_go_in_the_next_digest(app, smtp):
+    employer = login(app, 1, 'employer')
+    employer.post('/applications/1/update', data={'status': 'reviewed'})
+    assert send_status_digests() == 1
+    employer.post('/applications/1/update', data={'status': 'hired'})
+    assert send_status_digests() == 1
+    assert [e.body.count('Engineer at Acme') for e in OutgoingEmail.query.order_by(OutgoingEmail.id)] == [1, 1]
+    assert 'Hired' in OutgoingEmail.query.order_by(OutgoingEmail.id.desc()).first().body
+
+def test_late_committed_change_is_not_stamped(app, monkeypatch):
+    import digests
+    employer = login(app, 1, 'employer')
+    employer.post('/applications/1/update', data={'status': 'reviewed'})
+    employer.post('/applications/3/update', data={'status': 'reviewed'})
+    # The change with the lower id commits only after the digest has read the others
+    late = ApplicationStatusChange.query.filter_by(applicant_id=3).one()
+    late_values = dict(id=late.id, application_id=late.application_id, applicant_id=late.applicant_id,
+                       old_status=late.old_status, new_status=late.new_status, changed_at=late.changed_at)
+    db.session.delete(late)
+    db.session.commit()
+    read = digests._pending_status_changes
+    def read_then_commit_late_change():
+        rows = read()
+        db.session.add(ApplicationStatusChange(**late_values))
+        db.session.flush()
+        return rows
+    monkeypatch.setattr(digests, '_pending_status_changes', read_then_commit_late_change)
+
+    assert send_status_digests() == 1
+    assert db.session.get(ApplicationStatusChange, late_values['id']).digested_at is None
+    monkeypatch.undo()
+    assert send_status_digests() == 1
+    assert OutgoingEmail.query.filter_by(recipients='alice@example.com').count() == 1
+
+def test_digest_reads_changes_with_one_query(app):
+    employer = login(app, 1, 'employer')
+    for application_id in (1, 2, 3):
+        employer.post(f'/applications/{application_id}/update', data={'status': 'reviewed'})
+    with count_queries() as statements:
+        assert send_status_digests() == 2
+    reads = [s for s in statements if s.lstrip().startswith('SELECT') and 'application_status_change' in s]
+    assert len(reads) == 1
+
+def add_applicants(job_id, count, hours_ago=1):
+    applied = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    for n in range(count):
+        seeker = User(username=f'seeker{job_id}-{n}-{hours_ago}', email=f'seeker{job_id}-{n}-{hours_ago}@example.com',
+                      password='hash', role='job_seeker')
+        db.session.add(seeker)
+        db.session.flush()
+        db.session.add(Application(job_id=job_id, applicant_id=seeker.id, application_date=applied))
+    db.session.commit()
+
+def test_employer_digest(app, smtp):
+    db.session.add(User(username='other', email='other@example.com', password='hash', role='employer'))
+    db.session.flush()
+    db.session.add(Job(title='Writer', description='Write', location='Remote', category='Media', company='Beta',
+                       poster_id=5))
+    db.session.commit()
+    add_applicants(3, 1)
+
+    assert send_employer_digests() == 2
+    assert smtp.connections == 1
+    acme = OutgoingEmail.query.filter_by(recipients='employer@example.com').one()
+    assert acme.subject == '3 new applicants for your jobs'
+    assert 'Engineer at Acme: 2 new' in acme.body
+    assert 'Designer at Acme: 1 new' in acme.body
+    other = OutgoingEmail.query.filter_by(recipients='other@example.com').one()
+    assert other.subject == '1 new applicant for Writer'
+    assert db.session.get(User, 1).last_applicant_digest_at is not None
+
+    # Only applications received since the last digest are counted
+    assert send_employer_digests() == 0
+    add_applicants(1, 2, hours_ago=0)
+    assert send_employer_digests() == 1
+    latest = OutgoingEmail.query.order_by(OutgoingEmail.id.desc()).first()
+    assert latest.subject == '2 new applicants for your jobs'
+    assert 'Designer' not in latest.body
+
+def test_first_employer_digest_looks_back_one_interval(app):
+    add_applicants(1, 2, hours_ago=30)
+    assert send_employer_digests() == 1
+    # The fixture's applications count; the two from 30 hours ago do not
+    email = OutgoingEmail.query.one()
+    assert email.subject == '3 new applicants for your jobs'
+    assert 'Engineer at Acme: 2 new' in email.body
+
+def test_employer_digest_reads_applications_with_one_query(app):
+    add_applicants(2, 3)
+    with count_queries() as statements:
+        assert send_employer_digests() == 1
+    reads = [s for s in statements if s.lstrip().startswith('SELECT') and 'application_date' in s]
+    assert len(reads) == 1
@@ -17,7 +17,8 @@ def employer_client():
         with app.app_context():
             db.create_all()
             employer = User(username='employer', email='employer@example.com', password='hash', role='employer')
-            db.session.add(employer)
+            other = User(id=999, username='other', email='other@example.com', password='hash', role='employer')
+            db.session.add_all([employer, other])
             db.session.commit()
             with client.session_transaction() as sess:
                 sess['user_id'] = employer.id
@@ -0,0 +1,203 @@
+import sys
+import os
+import io
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job, Application
+import file_storage
+from file_storage import FakeGCSClient, GCSStorage, LocalStorage, create_storage, get_resume_storage
+
+@pytest.fixture
+def app():
+    app = create_app(config['testing'])
+    app.config['GCS_BUCKET_NAME'] = f'bucket-{id(app)}'  # a fresh in-memory bucket per test
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(username='employer', email='employer@example.com', password='hash', role='employer'),
+            User(username='seeker', email='seeker@example.com', password='hash', role='job_seeker'),
+        ])
+        db.session.add(Job(title='Engineer', description='Build', location='Remote', category='IT',
+                           company='Acme', poster_id=1))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture(params=['local', 'fake'])
+def storage(request, tmp_path):
+    if request.param == 'local':
+        return LocalStorage(str(tmp_path))
+    return GCSStorage(FakeGCSClient().bucket('test'))
+
+def test_round_trip(storage):
+    storage.save('7/resume.pdf', io.BytesIO(b'%PDF resume'), 'application/pdf')
+    assert storage.exists('7/resume.pdf')
+    assert storage.read('7/resume.pdf') == b'%PDF resume'
+    with storage.open('7/resume.pdf') as f:
+        assert f.read() == b'%PDF resume'
+    storage.delete('7/resume.pdf')
+    assert not storage.exists('7/resume.pdf')
+
+def test_missing_keys_raise_file_not_found(storage, tmp_path):
+    for call in (storage.read, storage.open, storage.delete,
+                 lambda key: storage.download_to_filename(key, str(tmp_path / 'out'))):
+        with pytest.raises(FileNotFoundError):
+            call('7/missing.pdf')
+
+def test_local_storage_rejects_traversal(tmp_path):
+    storage = LocalStorage(str(tmp_path / 'root'))
+    with pytest.raises(FileNotFoundError):
+        storage.save('../escape.pdf', io.BytesIO(b'x'))
+    assert not storage.exists('../escape.pdf')
+
+def test_gcs_client_is_created_once(monkeypatch):
+    created = []
+    class CountingClient(FakeGCSClient):
+        def __init__(self):
+            created.append(self)
+            super().__init__()
+    monkeypatch.setattr('google.cloud.storage.Client', CountingClient)
+    monkeypatch.setattr(file_storage, '_gcs_client', None)
+    settings = {'STORAGE_BACKEND': 'gcs', 'GCS_BUCKET_NAME': 'resumes-bucket'}
+    for _ in range(3):
+        create_storage(settings).save('1/a.pdf', io.BytesIO(b'a'))
+    assert len(created) == 1
+
+def test_create_storage_validates_configuration(tmp_path):
+    assert isinstance(create_storage({'STORAGE_BACKEND': 'local', 'RESUME_STORAGE_DIR': str(tmp_path)}), LocalStorage)
+    with pytest.raises(ValueError):
+        create_storage({'STORAGE_BACKEND': 'gcs', 'GCS_BUCKET_NAME': None})
+    with pytest.raises(ValueError):
+        create_storage({'STORAGE_BACKEND': 'ftp'})
+
+def test_local_backend_is_not_public(app, tmp_path):
+    assert not os.path.abspath(config['default'].RESUME_STORAGE_DIR).startswith(os.path.abspath(app.static_folder))
+    app.config.update(STORAGE_BACKEND='local', RESUME_STORAGE_DIR=str(tmp_path))
+    app.extensions.pop('resume_storage', None)
+    get_resume_storage().save('999/secret_cv.pdf', io.BytesIO(b'secret'))
+    assert (tmp_path / '999' / 'secret_cv.pdf').read_bytes() == b'secret'
+    resp = app.test_client().get('/static/resumes/999/secret_cv.pdf')
+    assert resp.status_code == 404
+
+def test_apply_and_download_through_fake_bucket(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 2
+        sess['role'] = 'job_seeker'
+    resp = client.post('/jobs/apply/1', data={'resume': (io.BytesIO(b'%PDF resume'), 'my resume.pdf')},
+                       content_type='multipart/form-data')
+    assert resp.status_code == 302
+    application = Application.query.one()
+    assert application.resume_path == '2/my_resume.pdf'
+    assert get_resume_storage().read('2/my_resume.pdf') == b'%PDF resume'
+
+    resp = client.get('/resume/2/my_resume.pdf')
+    assert resp.status_code == 200
+    assert resp.data == b'%PDF resume'
+
+def test_stat_reports_size_and_etag(storage):
+    storage.save('7/resume.pdf', io.BytesIO(b'%PDF resume'), 'application/pdf')
+    stored = storage.stat('7/resume.pdf')
+    assert stored.size == len(b'%PDF resume')
+    assert stored.etag and stored.updated is not None
+    with storage.open('7/resume.pdf', stored, chunk_size=4) as f:
+        f.seek(5)
+        assert f.read(3) == b'res'
+    with pytest.raises(FileNotFoundError):
+        storage.stat('7/missing.pdf')
+
+@pytest.fixture
+def resume_client(app):
+    db.session.add(Application(job_id=1, applicant_id=2, resume_path='2/cv.pdf'))
+    db.session.commit()
+    get_resume_storage().save('2/cv.pdf', io.BytesIO(b'0123456789'), 'application/pdf')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 2
+        sess['role'] = 'job_seeker'
+    return client
+
+def test_resume_download_is_streamed_with_etag(resume_client):
+    resp = resume_client.get('/resume/2/cv.pdf')
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.data == b'0123456789'
+    assert resp.headers['Content-Length'] == '10'
+    assert resp.headers['Accept-Ranges'] == 'bytes'
+    assert resp.headers['Content-Type'] == 'application/pdf'
+    assert 'attachment' in resp.headers['Content-Disposition']
+
+    etag = resp.headers['ETag']
+    resp = resume_client.get('/resume/2/cv.pdf', headers={'If-None-Match': etag})
+    assert resp.status_code == 304
+    assert resp.data == b''
+
+def test_resume_range_requests(resume_client):
+    resp = resume_client.get('/resume/2/cv.pdf', headers={'Range': 'bytes=2-5'})
+    assert resp.status_code == 206
+    assert resp.data == b'2345'
+    assert resp.headers['Content-Range'] == 'bytes 2-5/10'
+    assert resp.headers['Content-Length'] == '4'
+
+    resp = resume_client.get('/resume/2/cv.pdf', headers={'Range': 'bytes=-3'})
+    assert resp.status_code == 206
+    assert resp.data == b'789'
+
+    resp = resume_client.get('/resume/2/cv.pdf', headers={'Range': 'bytes=20-30'})
+    assert resp.status_code == 416
+
+def test_x_accel_redirect_offloads_transfer(app, resume_client):
+    app.config['RESUME_DELIVERY'] = 'x-accel-redirect'
+    resp = resume_client.get('/resume/2/cv.pdf')
+    assert resp.status_code == 200
+    assert resp.headers['X-Accel-Redirect'] == '/protected-resumes/2/cv.pdf'
+    assert 'filename=cv.pdf' in resp.headers['Content-Disposition']
+    assert resp.data == b''
+
+def test_x_sendfile_needs_local_files(app, resume_client, tmp_path, monkeypatch):
+    app.config['RESUME_DELIVERY'] = 'x-sendfile'
+    resp = resume_client.get('/resume/2/cv.pdf')  # fake bucket: streamed by the worker
+    assert 'X-Sendfile' not in resp.headers
+    assert resp.data == b'0123456789'
+
+    monkeypatch.setitem(app.extensions, 'resume_storage', LocalStorage(str(tmp_path)))
+    resp = resume_client.get('/resume/2/cv.pdf')
+    assert resp.headers['X-Sendfile'] == str(tmp_path / '2' / 'cv.pdf')
+    assert resp.data == b''
+
+def test_signed_url_with_local_signer(app, resume_client):
+    app.config['RESUME_DELIVERY'] = 'signed-url'
+    resp = resume_client.get('/resume/2/cv.pdf')
+    assert resp.status_code == 302
+    assert 'no-store' in resp.headers['Cache-Control']
+    signed = resp.headers['Location']
+    assert '/resume/signed/' in signed
+
+    anonymous = app.test_client()
+    resp = anonymous.get(signed, headers={'Range': 'bytes=0-3'})
+    assert resp.status_code == 206
+    assert resp.data == b'0123'
+    assert anonymous.get(signed[:-2] + 'xx').status_code == 403
+
+    app.config['RESUME_SIGNED_URL_TTL'] = -1
+    assert anonymous.get(signed).status_code == 403
+
+def test_signed_url_with_gcs_signer(app, resume_client):
+    app.config.update(RESUME_DELIVERY='signed-url', RESUME_URL_SIGNER='gcs')
+    resp = resume_client.get('/resume/2/cv.pdf')
+    assert resp.status_code == 302
+    assert resp.headers['Location'].startswith(f"https://storage.googleapis.com/{app.config['GCS_BUCKET_NAME']}/resumes/2/cv.pdf?")
+    assert 'X-Goog-Expires=300' in resp.headers['Location']
+
+def test_offload_still_checks_permissions(app, resume_client):
+    app.config['RESUME_DELIVERY'] = 'x-accel-redirect'
+    with resume_client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['role'] = 'job_seeker'
+    resp = resume_client.get('/resume/2/cv.pdf')
+    assert resp.status_code == 403
+    assert 'X-Accel-Redirect' not in resp.headers
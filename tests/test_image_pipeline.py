@@ -0,0 +1,154 @@
+import sys
+import os
+import io
+import threading
+import pytest
+from PIL import Image
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job
+import image_pipeline
+from image_pipeline import (InvalidImageError, picture_variant, probe_image, render_variants,
+                            store_company_logo, submit_profile_picture)
+from werkzeug.datastructures import FileStorage
+
+def image_bytes(size=(1200, 900), image_format='JPEG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color='blue').save(buffer, format=image_format)
+    buffer.seek(0)
+    return buffer
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(config['testing'])
+    app.config['PROFILE_UPLOAD_FOLDER'] = str(tmp_path)
+    app.config['IMAGE_STAGING_DIR'] = str(tmp_path.parent / f'{tmp_path.name}-staging')
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='pic', email='pic@example.com', password='hash', role='job_seeker'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def test_probe_reads_header_only():
+    assert probe_image(image_bytes(image_format='PNG'), 10**7) == ('PNG', 1200, 900)
+    with pytest.raises(InvalidImageError):
+        probe_image(io.BytesIO(b'not an image'), 10**7)
+    with pytest.raises(InvalidImageError):
+        probe_image(image_bytes(), 1000)
+    with pytest.raises(InvalidImageError):
+        probe_image(image_bytes(image_format='GIF'), 10**7)
+
+def test_render_variants_writes_each_size(tmp_path):
+    source = tmp_path / 'upload'
+    source.write_bytes(image_bytes((2400, 1200)).read())
+    names = render_variants(str(source), str(tmp_path), 'abc')
+    assert names == {300: 'abc_300.webp', 40: 'abc_40.webp'}
+    assert not source.exists()
+    with Image.open(tmp_path / 'abc_300.webp') as img:
+        assert img.format == 'WEBP' and img.size == (300, 150)
+    with Image.open(tmp_path / 'abc_40.webp') as img:
+        assert img.size == (40, 20)
+
+def test_render_variants_rejects_truncated_image(tmp_path):
+    source = tmp_path / 'upload'
+    source.write_bytes(image_bytes().read()[:200])
+    with pytest.raises(InvalidImageError):
+        render_variants(str(source), str(tmp_path), 'bad')
+    assert not source.exists()
+
+def test_picture_variant():
+    assert picture_variant('img/profiles/abc_300.webp', 40) == 'img/profiles/abc_40.webp'
+    assert picture_variant('img/profiles/default.jpg', 40) == 'img/profiles/default.jpg'
+    assert picture_variant('img/profiles/abc_300.webp', 64) == 'img/profiles/abc_300.webp'
+    assert picture_variant(None, 40) is None
+
+def test_profile_upload_updates_user_and_navbar(app, tmp_path):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['role'] = 'job_seeker'
+    data = {'username': 'pic', 'email': 'pic@example.com', 'profile_picture': (image_bytes(), 'me.jpg')}
+    client.post('/profile', data=data, content_type='multipart/form-data')
+    first = db.session.get(User, 1).profile_picture
+    assert first.endswith('_300.webp')
+    resp = client.get('/about')
+    assert picture_variant(first, 40).encode() in resp.data
+
+    data['profile_picture'] = (image_bytes(), 'me.jpg')
+    client.post('/profile', data=data, content_type='multipart/form-data')
+    db.session.expire_all()
+    second = db.session.get(User, 1).profile_picture
+    assert second != first
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [os.path.basename(second), os.path.basename(picture_variant(second, 40))])
+
+def test_profile_rejects_unreadable_picture(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+    data = {'username': 'pic', 'email': 'pic@example.com',
+            'profile_picture': (io.BytesIO(b'not an image'), 'me.png')}
+    resp = client.post('/profile', data=data, content_type='multipart/form-data')
+    assert b'could not be read' in resp.data
+    assert db.session.get(User, 1).profile_picture == 'img/profiles/default.jpg'
+
+def test_raw_upload_is_staged_outside_the_public_folder(app):
+    app.config['IMAGE_WORKERS'] = 1
+    data = image_bytes().read()
+    truncated = io.BytesIO(data[:len(data) // 2])  # passes the header probe, fails to decode
+    with app.test_request_context():
+        future = submit_profile_picture(1, FileStorage(truncated, filename='me.jpg'))
+        with pytest.raises(InvalidImageError):
+            future.result(timeout=60)
+    app.extensions['image_pool'].shutdown()
+    app.extensions['image_finisher'].shutdown()
+    # Staged under IMAGE_STAGING_DIR; a failed render leaves nothing there or in the public folder
+    assert os.path.isdir(app.config['IMAGE_STAGING_DIR'])
+    assert os.listdir(app.config['IMAGE_STAGING_DIR']) == []
+    assert os.listdir(app.config['PROFILE_UPLOAD_FOLDER']) == []
+    assert db.session.get(User, 1).profile_picture == 'img/profiles/default.jpg'
+
+def test_worker_pool_updates_user_when_done(app):
+    app.config['IMAGE_WORKERS'] = 1
+    upload = FileStorage(image_bytes(), filename='me.jpg')
+    with app.test_request_context():
+        future = submit_profile_picture(1, upload)
+        path = future.result(timeout=60)
+    app.extensions['image_pool'].shutdown()
+    app.extensions['image_finisher'].shutdown()
+    db.session.expire_all()
+    assert db.session.get(User, 1).profile_picture == path
+    assert path.endswith('_300.webp')
+
+def test_store_company_logo_rejects_non_images(tmp_path):
+    with pytest.raises(InvalidImageError):
+        store_company_logo(io.BytesIO(b'not an image'), str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+def test_listings_use_logo_thumbnail(app, tmp_path):
+    names = store_company_logo(image_bytes(image_format='PNG'), str(tmp_path))
+    db.session.add(Job(title='Engineer', description='Build', location='Remote', category='IT',
+                       company='Acme', poster_id=1, company_logo=f'img/company_logos/{names[200]}'))
+    db.session.commit()
+    resp = app.test_client().get('/jobs/list')
+    assert f'img/company_logos/{names[80]}'.encode() in resp.data
+    data = app.test_client().get('/jobs/search').get_json()
+    assert data['jobs'][0]['company_logo_thumbnail'] == f'img/company_logos/{names[80]}'
+
+def test_worker_pool_completion_runs_off_the_result_thread(app, monkeypatch):
+    app.config['IMAGE_WORKERS'] = 1
+    threads = []
+    apply = image_pipeline._apply_profile_picture
+    def recording_apply(user_id, names):
+        threads.append(threading.current_thread().name)
+        return apply(user_id, names)
+    monkeypatch.setattr(image_pipeline, '_apply_profile_picture', recording_apply)
+    with app.test_request_context():
+        submit_profile_picture(1, FileStorage(image_bytes(), filename='me.jpg')).result(timeout=60)
+    app.extensions['image_pool'].shutdown()
+    app.extensions['image_finisher'].shutdown()
+    assert threads and threads[0].startswith('image-finish')
@@ -0,0 +1,58 @@
+import sys
+import os
+import logging
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job
+from instrumentation import statement_shape, query_budget, QueryBudgetExceeded
+
+def make_app(strict):
+    app = create_app(config['testing'])
+    app.config['QUERY_BUDGET_STRICT'] = strict
+
+    @query_budget(2)
+    def chatty():
+        # One query per row: the N+1 pattern
+        for job_id in range(1, 7):
+            db.session.get(Job, job_id)
+        return 'ok'
+
+    app.add_url_rule('/chatty', 'chatty', chatty)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='poster', email='poster@example.com', password='hash', role='employer'))
+        for i in range(6):
+            db.session.add(Job(title=f'J{i}', description='d', location='L', category='C', company='X', poster_id=1))
+        db.session.commit()
+        db.session.expunge_all()
+    return app
+
+def test_statement_shape():
+    assert statement_shape("SELECT *\n  FROM job WHERE id IN (?, ?, ?) LIMIT 5") == \
+        "SELECT * FROM job WHERE id IN (?) LIMIT ?"
+    assert statement_shape("SELECT * FROM job WHERE title = 'x''y'") == "SELECT * FROM job WHERE title = ?"
+    assert statement_shape("SELECT anon_1.id FROM t") == "SELECT anon_1.id FROM t"
+
+def test_budget_exceeded_fails_in_strict_mode():
+    app = make_app(strict=True)
+    with pytest.raises(QueryBudgetExceeded, match='chatty executed 6 queries'):
+        app.test_client().get('/chatty')
+
+def test_budget_exceeded_logs_in_production_mode(caplog):
+    app = make_app(strict=False)
+    with caplog.at_level(logging.WARNING, logger='job_portal'):
+        response = app.test_client().get('/chatty')
+    assert response.status_code == 200
+    messages = [r.getMessage() for r in caplog.records]
+    assert any('Query budget exceeded' in m and 'most repeated (6x)' in m for m in messages)
+    assert any('Possible N+1 on chatty' in m for m in messages)
+
+def test_routes_within_budget():
+    app = make_app(strict=True)
+    client = app.test_client()
+    assert client.get('/').status_code == 200
+    assert client.get('/jobs/list').status_code == 200
+    assert client.get('/jobs/search?facets=true').status_code == 200
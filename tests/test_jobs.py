@@ -104,3 +104,59 @@ def test_apply_job_post_error(jobs_client, monkeypatch):
     }
     response = jobs_client.post(f'/jobs/apply/{job.id}', data=data, content_type='multipart/form-data', follow_redirects=True)
     assert b'error' in response.data or response.status_code == 200
+
+def test_jobs_list_keyword_search(jobs_client):
+    response = jobs_client.get('/jobs/list?q=testjob')
+    assert response.status_code == 200
+    assert b'TestJob' in response.data
+    response = jobs_client.get('/jobs/list?q=nomatch')
+    assert b'No jobs found' in response.data
+
+def test_job_search_api_keyword(jobs_client):
+    response = jobs_client.get('/jobs/search?q=desc&company=test')
+    assert [job['title'] for job in response.get_json()['jobs']] == ['TestJob']
+    response = jobs_client.get('/jobs/search?q=desc+-testjob')
+    assert response.get_json()['jobs'] == []
+
+def test_job_search_api_pagination(jobs_client):
+    for i in range(4):
+        db.session.add(Job(title=f'PagedJob{i}', company='PageCo', location='Remote', description='desc',
+                           category='IT', poster_id=1))
+    db.session.commit()
+    first = jobs_client.get('/jobs/search?company=pageco&per_page=3').get_json()
+    assert len(first['jobs']) == 3
+    assert first['next'] and first['next_cursor']
+    second = jobs_client.get(first['next']).get_json()
+    assert len(second['jobs']) == 1
+    assert second['next'] is None
+    titles = {job['title'] for job in first['jobs'] + second['jobs']}
+    assert titles == {f'PagedJob{i}' for i in range(4)}
+
+def test_job_search_api_invalid_cursor(jobs_client):
+    response = jobs_client.get('/jobs/search?cursor=garbage')
+    assert response.status_code == 400
+
+def test_jobs_list_next_page_link(jobs_client):
+    db.session.add(Job(title='OtherJob', company='TestCo', location='Remote', description='desc',
+                       category='IT', poster_id=1))
+    db.session.commit()
+    response = jobs_client.get('/jobs/list?per_page=1')
+    assert b'Next Page' in response.data
+
+def test_job_search_api_ranked_pagination(jobs_client):
+    db.session.add(Job(title='Desc Desc', company='RankCo', location='Remote', description='desc desc desc',
+                       category='IT', poster_id=1))
+    db.session.commit()
+    first = jobs_client.get('/jobs/search?q=desc&per_page=1').get_json()
+    assert [job['title'] for job in first['jobs']] == ['Desc Desc']
+    second = jobs_client.get(first['next']).get_json()
+    assert [job['title'] for job in second['jobs']] == ['TestJob']
+    assert second['next'] is None
+
+def test_job_search_api_facets(jobs_client):
+    data = jobs_client.get('/jobs/search?location=remote&facets=category,company').get_json()
+    assert data['facets'] == {
+        'category': [{'value': 'IT', 'count': 1}],
+        'company': [{'value': 'TestCo', 'count': 1}],
+    }
+    assert 'facets' not in jobs_client.get('/jobs/search').get_json()
@@ -0,0 +1,32 @@
+import sys
+import os
+import logging
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging.handlers import QueueHandler
+from app import create_app
+from config import config
+from logging_config import SamplingFilter
+
+def record(name, level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, 'message', None, None)
+
+def test_sampling_filter_keeps_fraction_per_logger():
+    sampler = SamplingFilter({'job_portal.access': 0.25, 'job_portal.search': 0})
+    kept = [sampler.filter(record('job_portal.access')) for _ in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+    assert not sampler.filter(record('job_portal.search'))
+    assert sampler.filter(record('job_portal.search', logging.WARNING))
+    assert all(sampler.filter(record('job_portal')) for _ in range(3))
+
+def test_setup_logger_honours_level_and_replaces_pipeline():
+    class QuietConfig(config['testing']):
+        LOG_LEVEL = 'WARNING'
+
+    create_app(config['testing'])
+    app = create_app(QuietConfig)
+    logger = logging.getLogger('job_portal')
+    assert logger.level == logging.WARNING
+    assert app.logger.level == logging.WARNING
+    queue_handlers = [h for h in logger.handlers if isinstance(h, QueueHandler)]
+    assert len(queue_handlers) == 1
+    assert not [h for h in logger.handlers if isinstance(h, logging.FileHandler)]
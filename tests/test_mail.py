@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch
 from app import create_app
 from config import config
+from models import OutgoingEmail
 
 @pytest.fixture
 def client():
@@ -11,8 +12,9 @@ def client():
         with app.app_context():
             yield client
 
-@patch('extensions.mail.send')
-def test_contact_form_sends_email(mock_send, client):
+@patch('flask_mail.Connection.send')
+def test_contact_form_sends_email(mock_send, client, monkeypatch):
+    monkeypatch.setenv('CONTACT_EMAIL_RECIPIENT', 'contact@example.com')
     response = client.post('/contact', data={
         'name': 'Test User',
         'email': 'test@example.com',
@@ -20,4 +22,5 @@ def test_contact_form_sends_email(mock_send, client):
         'message': 'Hello! How are you? What is your name?'
     }, follow_redirects=True)
     assert mock_send.called
-    assert b'Thank you' in response.data or response.status_code == 200
\ No newline at end of file
+    assert OutgoingEmail.query.one().recipients == 'contact@example.com'
+    assert b'Thank you' in response.data or response.status_code == 200
@@ -0,0 +1,131 @@
+import sys
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import OutgoingEmail
+from mail_outbox import (LocalSMTPServer, queue_email, send_due_emails, drain_outbox, dispatch_mail,
+                         retry_dead_emails)
+
+@pytest.fixture
+def smtp():
+    with LocalSMTPServer() as server:
+        yield server
+
+@pytest.fixture
+def app(smtp):
+    app = create_app(config['testing'])
+    state = app.extensions['mail']
+    state.server, state.port, state.use_tls, state.suppress = '127.0.0.1', smtp.port, False, False
+    state.default_sender = 'portal@example.com'
+    with app.app_context():
+        db.create_all()
+        yield app
+        worker = app.extensions.get('mail_outbox_worker')
+        if worker is not None:
+            worker.stop()
+        db.session.remove()
+        db.drop_all()
+
+def queue(n, **kwargs):
+    emails = [queue_email(f'Subject {i}', [f'user{i}@example.com'], f'Body {i}', **kwargs) for i in range(n)]
+    db.session.commit()
+    return emails
+
+def make_due():
+    db.session.query(OutgoingEmail).update({'next_attempt_at': datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.session.commit()
+
+def test_batch_is_sent_over_one_connection(app, smtp):
+    queue(5)
+    assert send_due_emails() == (5, 5)
+    assert smtp.connections == 1
+    assert [rcpt for _, rcpt, _ in smtp.messages] == [[f'user{i}@example.com'] for i in range(5)]
+    assert smtp.messages[0][0] == 'portal@example.com'
+    assert b'Subject: Subject 0' in smtp.messages[0][2]
+    assert {e.status for e in OutgoingEmail.query} == {'sent'}
+    assert send_due_emails() == (0, 0)
+
+def test_batch_size_limits_claims(app, smtp):
+    queue(5)
+    app.config['MAIL_BATCH_SIZE'] = 2
+    assert send_due_emails() == (2, 2)
+    assert drain_outbox() == 3
+    assert smtp.connections == 3
+
+def test_temporary_failure_backs_off(app, smtp):
+    queue(2)
+    smtp.failures.append(451)
+    assert send_due_emails() == (2, 1)
+    failed = OutgoingEmail.query.filter_by(status='pending').one()
+    assert failed.attempts == 1 and '451' in failed.last_error
+    delay = failed.next_attempt_at - datetime.now(timezone.utc).replace(tzinfo=None)
+    assert timedelta(seconds=55) < delay <= timedelta(seconds=60)
+    assert send_due_emails() == (0, 0)  # waiting out the delay
+
+    make_due()
+    assert send_due_emails() == (1, 1)
+    assert len(smtp.messages) == 2
+
+def test_permanent_failure_is_dead_lettered(app, smtp):
+    queue(2)
+    smtp.rejected.add('user0@example.com')
+    assert send_due_emails() == (2, 1)
+    dead = OutgoingEmail.query.filter_by(status='dead').one()
+    assert dead.recipients == 'user0@example.com'
+    assert dead.attempts == 1
+
+    smtp.rejected.clear()
+    assert retry_dead_emails() == 1
+    assert send_due_emails() == (1, 1)
+
+def test_attempts_run_out(app, smtp):
+    app.config['MAIL_MAX_ATTEMPTS'] = 2
+    queue(1)
+    smtp.failures.extend([421, 421])
+    send_due_emails()
+    make_due()
+    send_due_emails()
+    email = OutgoingEmail.query.one()
+    assert (email.status, email.attempts) == ('dead', 2)
+
+def test_unreachable_server_keeps_batch(app, smtp):
+    queue(3)
+    app.extensions['mail'].port = 1  # nothing listens there
+    assert send_due_emails() == (3, 0)
+    assert {(e.status, e.attempts) for e in OutgoingEmail.query} == {('pending', 1)}
+    assert all(e.claim_token is None for e in OutgoingEmail.query)
+
+def test_contact_form_queues_and_sends(app, smtp, monkeypatch):
+    monkeypatch.setenv('CONTACT_EMAIL_RECIPIENT', 'contact@example.com')
+    resp = app.test_client().post('/contact', data={
+        'name': 'Jane Doe', 'email': 'jane@example.com', 'subject': 'Hello there',
+        'message': 'I would like to know more about the portal.'})
+    assert resp.status_code == 302
+    email = OutgoingEmail.query.one()
+    assert email.status == 'sent'
+    assert smtp.messages[0][1] == ['contact@example.com']
+    assert b'jane@example.com' in smtp.messages[0][2]
+
+def test_contact_form_does_not_wait_for_smtp(app, smtp, monkeypatch):
+    monkeypatch.setenv('CONTACT_EMAIL_RECIPIENT', 'contact@example.com')
+    app.extensions['mail'].port = 1
+    resp = app.test_client().post('/contact', data={
+        'name': 'Jane Doe', 'email': 'jane@example.com', 'subject': 'Hello there',
+        'message': 'I would like to know more about the portal.'})
+    assert resp.status_code == 302  # queued; delivery is retried later
+    assert OutgoingEmail.query.one().status == 'pending'
+
+def test_background_sender(app, smtp):
+    app.config.update(MAIL_OUTBOX_WORKERS=1, MAIL_POLL_SECONDS=5)
+    queue(3)
+    dispatch_mail()
+    deadline = time.monotonic() + 5
+    while len(smtp.messages) < 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(smtp.messages) == 3
+    assert smtp.connections == 1
@@ -6,7 +6,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from app import create_app
 from config import config
 from extensions import db
-from models import Job
+from models import User, Job
 
 @pytest.fixture
 def main_client():
@@ -18,6 +18,7 @@ def main_client():
         with app.app_context():
             db.create_all()
             # Add a job for featured jobs
+            db.session.add(User(id=1, username='poster', email='poster@example.com', password='hash', role='employer'))
             job = Job(title='TestJob', company='TestCo', location='Remote', description='desc', salary='$100', category='IT', poster_id=1)
             db.session.add(job)
             db.session.commit()
@@ -85,3 +86,7 @@ def test_contact_page_post_invalid(main_client):
     }
     response = main_client.post('/contact', data=data, follow_redirects=True)
     assert b'danger' in response.data or response.status_code == 200
+
+def test_home_page_category_counts(main_client):
+    response = main_client.get('/')
+    assert b'1 Vacancy' in response.data
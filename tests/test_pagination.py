@@ -0,0 +1,67 @@
+import sys
+import os
+from datetime import datetime, timedelta
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job
+from pagination import paginate_keyset, encode_cursor, decode_cursor, InvalidCursor
+
+@pytest.fixture
+def app():
+    app = create_app(config['testing'])
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='poster', email='poster@example.com', password='hash', role='employer'))
+        same_time = datetime(2025, 1, 1, 12, 0, 0)
+        for i in range(7):
+            # Several rows share a timestamp so the id tie-breaker matters
+            posted = same_time - timedelta(days=i // 3)
+            db.session.add(Job(title=f'Job {i}', description='desc', location='Remote', category='IT',
+                               company=f'Co {i}', poster_id=1, posted_date=posted))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def test_cursor_round_trip(app):
+    token = encode_cursor([datetime(2025, 1, 1, 12, 30), 42, 1.5])
+    assert decode_cursor(token, 3) == [datetime(2025, 1, 1, 12, 30), 42, 1.5]
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token + 'x', 3)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, 2)
+
+def test_paginate_keyset_walks_every_row_once(app):
+    keys = [(Job.posted_date, True), (Job.id, True)]
+    seen, cursor = [], None
+    while True:
+        page = paginate_keyset(Job.query, keys, cursor=cursor, per_page=3)
+        seen.extend(job.id for job in page.items)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+    expected = [job.id for job in Job.query.order_by(Job.posted_date.desc(), Job.id.desc())]
+    assert seen == expected
+    assert len(seen) == 7
+
+def test_paginate_keyset_mixed_directions(app):
+    keys = [(Job.posted_date, False), (Job.id, True)]
+    first = paginate_keyset(Job.query, keys, per_page=4)
+    second = paginate_keyset(Job.query, keys, cursor=first.next_cursor, per_page=4)
+    expected = [job.id for job in Job.query.order_by(Job.posted_date.asc(), Job.id.desc())]
+    assert [j.id for j in first.items + second.items] == expected
+    assert second.next_cursor is None
+
+def test_posted_date_default_is_per_row(app):
+    job_a = Job(title='A', description='d', location='L', category='C', company='X', poster_id=1)
+    db.session.add(job_a)
+    db.session.commit()
+    job_b = Job(title='B', description='d', location='L', category='C', company='X', poster_id=1)
+    db.session.add(job_b)
+    db.session.commit()
+    assert job_a.posted_date is not None
+    assert job_b.posted_date >= job_a.posted_date
+    assert job_a.posted_date > datetime(2025, 1, 2)
@@ -0,0 +1,83 @@
+import sys
+import os
+import threading
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User
+from passwords import PasswordHasher, PasswordHasherBusy, hash_rounds
+
+@pytest.fixture
+def app():
+    app = create_app(config['testing'])
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def test_hash_and_verify_use_configured_cost(app):
+    user = User(username='u', email='u@example.com', role='job_seeker')
+    user.set_password('Secret123!')
+    assert hash_rounds(user.password) == 4
+    assert user.check_password('Secret123!')
+    assert not user.check_password('wrong')
+    assert not user.password_needs_rehash()
+
+def test_malformed_hash_never_matches():
+    hasher = PasswordHasher(rounds=4)
+    assert hasher.verify('hash', 'hash') is False
+    assert hasher.needs_rehash('hash') is False
+    assert hash_rounds('$2b$12$abcdefghijklmnopqrstuuvwxyz') == 12
+
+def test_slots_are_released():
+    hasher = PasswordHasher(rounds=4, workers=1, max_in_flight=1)
+    hashed = hasher.hash('pw')
+    for _ in range(3):
+        assert hasher.verify(hashed, 'pw')
+
+def test_concurrent_calls_over_the_cap_are_rejected():
+    hasher = PasswordHasher(rounds=4, workers=1, max_in_flight=1)
+    started, release = threading.Event(), threading.Event()
+    def block():
+        started.set()
+        release.wait()
+    worker = threading.Thread(target=hasher._run, args=(block,))
+    worker.start()
+    started.wait()
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('pw')
+    release.set()
+    worker.join()
+    assert hasher.verify(hasher.hash('pw'), 'pw')
+
+def test_login_rehashes_password_with_old_cost(app):
+    old = PasswordHasher(rounds=5)
+    db.session.add(User(username='u', email='u@example.com', role='job_seeker',
+                        password=old.hash('Secret123!')))
+    db.session.commit()
+    client = app.test_client()
+    resp = client.post('/login', data={'email': 'u@example.com', 'password': 'Secret123!'})
+    assert resp.status_code == 302
+    user = User.query.filter_by(email='u@example.com').one()
+    assert hash_rounds(user.password) == 4
+    assert user.check_password('Secret123!')
+
+def test_login_returns_429_when_hashing_is_saturated(app):
+    user = User(username='u', email='u@example.com', role='job_seeker')
+    user.set_password('Secret123!')
+    db.session.add(user)
+    db.session.commit()
+    app.extensions['password_hasher'] = PasswordHasher(rounds=4, max_in_flight=0)
+    client = app.test_client()
+    resp = client.post('/login', data={'email': 'u@example.com', 'password': 'Secret123!'})
+    assert resp.status_code == 429
+    assert resp.headers['Retry-After'] == '1'
+    resp = client.post('/register', data={'username': 'new', 'email': 'new@example.com',
+                                          'password': 'Secret123!', 'confirm_password': 'Secret123!',
+                                          'role': 'job_seeker'})
+    assert resp.status_code == 429
+    assert not db.session.new  # nothing half-built left in the session
+    assert User.query.filter_by(email='new@example.com').first() is None
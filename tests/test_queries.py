@@ -0,0 +1,88 @@
+import sys
+import os
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job, Application
+
+@pytest.fixture
+def app():
+    app = create_app(config['testing'])
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@contextmanager
+def count_queries():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+def seed(rows):
+    """Create an admin, an employer with one job and `rows` seekers who applied to it."""
+    admin = User(username='admin', email='admin@example.com', password='hash', role='admin')
+    employer = User(username='employer', email='employer@example.com', password='hash', role='employer')
+    db.session.add_all([admin, employer])
+    db.session.commit()
+    job = Job(title='Listed', description='desc', location='Remote', category='IT', company='Co',
+              poster_id=employer.id)
+    db.session.add(job)
+    db.session.commit()
+    seekers = [User(username=f'seeker{i}', email=f'seeker{i}@example.com', password='hash',
+                    role='job_seeker') for i in range(rows)]
+    db.session.add_all(seekers)
+    db.session.commit()
+    for seeker in seekers:
+        # One extra job per seeker so job listings grow with `rows` too
+        extra = Job(title=f'Extra {seeker.id}', description='desc', location='Remote', category='IT',
+                    company='Co', poster_id=employer.id)
+        db.session.add(extra)
+        db.session.commit()
+        db.session.add_all([Application(job_id=job.id, applicant_id=seeker.id),
+                            Application(job_id=extra.id, applicant_id=seeker.id)])
+    db.session.commit()
+    return admin, employer, job, seekers[0]
+
+def queries_for(app, user_id, role, path):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['role'] = role
+    db.session.expunge_all()
+    app.extensions.pop('user_cache', None)  # measure the uncached page view
+    with count_queries() as statements:
+        response = client.get(path)
+    assert response.status_code == 200
+    return len(statements)
+
+@pytest.mark.parametrize('role, path', [
+    ('admin', '/admin/jobs'),
+    ('admin', '/admin/applications'),
+    ('job_seeker', '/my_applications'),
+    ('employer', '/jobs/{job_id}/applications'),
+])
+def test_listing_query_count_is_constant(app, role, path):
+    admin, employer, job, seeker = seed(6)
+    user_id = {'admin': admin, 'employer': employer, 'job_seeker': seeker}[role].id
+    seeker_id, job_id = seeker.id, job.id
+    path = path.format(job_id=job_id)
+    many = queries_for(app, user_id, role, path)
+
+    # Drop to a single row of each kind and compare
+    db.session.query(Application).filter(Application.applicant_id != seeker_id).delete()
+    db.session.query(Job).filter(Job.id != job_id, Job.title != f'Extra {seeker_id}').delete()
+    db.session.commit()
+    few = queries_for(app, user_id, role, path)
+    assert many == few
+    assert many <= 4
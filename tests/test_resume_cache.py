@@ -0,0 +1,189 @@
+import sys
+import os
+import io
+import threading
+import time
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job, Application
+from file_storage import get_resume_storage
+from resume_cache import ResumeCache, open_cached_resume
+
+def writer(data, calls=None):
+    def fetch(path):
+        if calls is not None:
+            calls.append(path)
+        with open(path, 'wb') as f:
+            f.write(data)
+    return fetch
+
+def test_miss_then_hit(tmp_path):
+    cache = ResumeCache(str(tmp_path), 100)
+    calls = []
+    for _ in range(3):
+        with cache.open('1/cv.pdf~1', writer(b'resume', calls)) as f:
+            assert f.read() == b'resume'
+    assert len(calls) == 1
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 0, 'entries': 1, 'bytes': 6,
+                             'max_bytes': 100}
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = ResumeCache(str(tmp_path), 25)
+    for key in ('a', 'b'):
+        cache.open(key, writer(b'x' * 10)).close()
+    cache.open('a', writer(b'x' * 10)).close()  # 'b' is now least recently used
+    cache.open('c', writer(b'x' * 10)).close()
+    assert sorted(name for name in os.listdir(tmp_path) if not name.startswith('.')) == ['a', 'c']
+    stats = cache.stats()
+    assert (stats['evictions'], stats['bytes']) == (1, 20)
+
+def test_handle_survives_eviction(tmp_path):
+    cache = ResumeCache(str(tmp_path), 10)
+    f = cache.open('big', writer(b'y' * 50))  # larger than the budget: evicted at once
+    assert not os.path.exists(tmp_path / 'big')
+    assert f.read() == b'y' * 50
+    f.close()
+
+def test_failed_download_leaves_nothing(tmp_path):
+    cache = ResumeCache(str(tmp_path), 100)
+    def fetch(path):
+        with open(path, 'wb') as f:
+            f.write(b'partial')
+        raise FileNotFoundError('gone')
+    with pytest.raises(FileNotFoundError):
+        cache.open('1/cv.pdf~1', fetch)
+    assert os.listdir(tmp_path / '1') == []
+    assert cache.stats()['entries'] == 0
+
+def test_concurrent_misses_download_once(tmp_path):
+    cache = ResumeCache(str(tmp_path), 100)
+    calls = []
+    def slow_fetch(path):
+        calls.append(path)
+        time.sleep(0.05)
+        writer(b'resume')(path)
+    results = []
+    def worker():
+        with cache.open('k', slow_fetch) as f:
+            results.append(f.read())
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [b'resume'] * 8
+    assert len(calls) == 1
+    assert cache.stats()['misses'] == 1
+    assert cache._key_locks == {}
+
+def test_existing_files_are_counted_and_stale_partials_dropped(tmp_path):
+    (tmp_path / '1').mkdir()
+    (tmp_path / '1' / 'cv.pdf~1').write_bytes(b'cached')
+    (tmp_path / '1' / '.fetch-old').write_bytes(b'crashed')
+    os.utime(tmp_path / '1' / '.fetch-old', (time.time() - 7200,) * 2)
+    (tmp_path / '1' / '.fetch-new').write_bytes(b'in progress')  # another process downloading
+    cache = ResumeCache(str(tmp_path), 100)
+    assert cache.stats()['bytes'] == 6
+    assert not (tmp_path / '1' / '.fetch-old').exists()
+    assert (tmp_path / '1' / '.fetch-new').exists()
+    with cache.open('1/cv.pdf~1', writer(b'never')) as f:
+        assert f.read() == b'cached'
+
+def test_budget_holds_across_processes(tmp_path):
+    # Two workers sharing the directory: the budget bounds the directory, not each worker
+    first, second = ResumeCache(str(tmp_path), 25), ResumeCache(str(tmp_path), 25)
+    first.open('a', writer(b'x' * 10)).close()
+    second.open('b', writer(b'x' * 10)).close()
+    first.open('a', writer(b'never')).close()  # a hit in one worker is recent use for all
+    second.open('c', writer(b'x' * 10)).close()
+    assert sorted(name for name in os.listdir(tmp_path) if not name.startswith('.')) == ['a', 'c']
+    assert first.stats()['bytes'] == second.stats()['bytes'] == 20
+    assert (first.stats()['hits'], second.stats()['evictions']) == (1, 1)
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(config['testing'])
+    app.config.update(GCS_BUCKET_NAME=f'bucket-{id(app)}', RESUME_CACHE_BYTES=1024,
+                      RESUME_CACHE_DIR=str(tmp_path / 'cache'))
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(username='employer', email='employer@example.com', password='hash', role='employer'),
+            User(username='seeker', email='seeker@example.com', password='hash', role='job_seeker'),
+            User(username='admin', email='admin@example.com', password='hash', role='admin'),
+        ])
+        db.session.add(Job(title='Engineer', description='Build', location='Remote', category='IT',
+                           company='Acme', poster_id=1))
+        db.session.add(Application(job_id=1, applicant_id=2, resume_path='2/cv.pdf'))
+        db.session.commit()
+        get_resume_storage().save('2/cv.pdf', io.BytesIO(b'first'), 'application/pdf')
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def employer(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['role'] = 'employer'
+    return client
+
+def test_serve_resume_uses_cache(app, employer):
+    for _ in range(3):
+        resp = employer.get('/resume/2/cv.pdf')
+        assert resp.status_code == 200
+        assert resp.data == b'first'
+    stats = app.extensions['resume_cache'].stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+
+    resp = employer.get('/resume/2/cv.pdf', headers={'Range': 'bytes=1-2'})
+    assert resp.status_code == 206
+    assert resp.data == b'ir'
+
+def test_reupload_is_not_served_stale(app, employer):
+    assert employer.get('/resume/2/cv.pdf').data == b'first'
+    get_resume_storage().save('2/cv.pdf', io.BytesIO(b'second'), 'application/pdf')
+    assert employer.get('/resume/2/cv.pdf').data == b'second'
+    assert app.extensions['resume_cache'].stats()['misses'] == 2
+
+def test_download_is_pinned_to_the_stat_generation(app):
+    storage = get_resume_storage()
+    stale = storage.stat('2/cv.pdf')
+    storage.save('2/cv.pdf', io.BytesIO(b'second'), 'application/pdf')
+    with pytest.raises(FileNotFoundError):
+        open_cached_resume(storage, stale)  # never cached under the old ETag
+    current = storage.stat('2/cv.pdf')
+    with open_cached_resume(storage, current) as f:
+        assert f.read() == b'second'
+    assert app.extensions['resume_cache'].stats()['entries'] == 1
+
+def test_reupload_between_stat_and_download(app, employer, monkeypatch):
+    storage = get_resume_storage()
+    stat = storage.stat
+    def stat_then_reupload(key):
+        stored = stat(key)
+        monkeypatch.setattr(storage, 'stat', stat)
+        storage.save(key, io.BytesIO(b'second'), 'application/pdf')
+        return stored
+    monkeypatch.setattr(storage, 'stat', stat_then_reupload)
+    resp = employer.get('/resume/2/cv.pdf')
+    assert resp.status_code == 200
+    assert resp.data == b'second'
+    assert resp.content_length == 6
+    assert resp.headers['ETag'] == f'"{storage.stat("2/cv.pdf").etag}"'
+
+def test_admin_cache_stats(app, employer):
+    employer.get('/resume/2/cv.pdf')
+    admin = app.test_client()
+    with admin.session_transaction() as sess:
+        sess['user_id'] = 3
+        sess['role'] = 'admin'
+    data = admin.get('/admin/resume-cache').get_json()
+    assert data['enabled'] and data['misses'] == 1 and data['bytes'] == 5
+
+    app.config['RESUME_CACHE_BYTES'] = 0
+    assert admin.get('/admin/resume-cache').get_json() == {'enabled': False}
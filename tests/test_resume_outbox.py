@@ -0,0 +1,142 @@
+import sys
+import os
+import io
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job, Application, ResumeUpload
+from file_storage import get_resume_storage
+from resume_outbox import process_due_uploads, upload_resume
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(config['testing'])
+    app.config.update(GCS_BUCKET_NAME=f'bucket-{id(app)}', RESUME_SPOOL_DIR=str(tmp_path / 'spool'))
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(username='employer', email='employer@example.com', password='hash', role='employer'),
+            User(username='seeker', email='seeker@example.com', password='hash', role='job_seeker'),
+        ])
+        db.session.add(Job(title='Engineer', description='Build', location='Remote', category='IT',
+                           company='Acme', poster_id=1))
+        db.session.commit()
+        yield app
+        worker = app.extensions.get('resume_upload_worker')
+        if worker is not None:
+            worker.stop()
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def seeker(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 2
+        sess['role'] = 'job_seeker'
+    return client
+
+def apply(client):
+    return client.post('/jobs/apply/1', data={'resume': (io.BytesIO(b'%PDF resume'), 'cv.pdf')},
+                       content_type='multipart/form-data')
+
+@pytest.fixture
+def failing_storage(app, monkeypatch):
+    storage = get_resume_storage()
+    def unavailable(*args, **kwargs):
+        raise ConnectionError('storage unavailable')
+    monkeypatch.setattr(storage, 'save', unavailable)
+    return storage
+
+def make_due(upload):
+    upload.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.session.commit()
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)  # SQLite returns naive UTC
+
+def spooled_files(app):
+    return os.listdir(app.config['RESUME_SPOOL_DIR'])
+
+def test_apply_uploads_after_commit(app, seeker):
+    assert apply(seeker).status_code == 302
+    application = Application.query.one()
+    upload = ResumeUpload.query.one()
+    assert application.resume_path == upload.key == '2/cv.pdf'
+    assert not application.resume_pending
+    assert (upload.status, upload.attempts) == ('done', 1)
+    assert get_resume_storage().read('2/cv.pdf') == b'%PDF resume'
+    assert spooled_files(app) == []
+
+def test_storage_outage_does_not_fail_apply(app, seeker, failing_storage, monkeypatch):
+    assert apply(seeker).status_code == 302
+    application = Application.query.one()
+    upload = ResumeUpload.query.one()
+    assert application.resume_pending
+    assert (upload.status, upload.attempts) == ('pending', 1)
+    assert 'storage unavailable' in upload.last_error
+    assert upload.next_attempt_at > utcnow() + timedelta(seconds=25)
+
+    # The applicant can still download the resume from the spool
+    resp = seeker.get('/resume/2/cv.pdf')
+    assert resp.status_code == 200
+    assert resp.data == b'%PDF resume'
+    resp.close()
+
+    assert process_due_uploads() == 0  # not due yet
+    monkeypatch.undo()
+    make_due(upload)
+    assert process_due_uploads() == 1
+    db.session.expire_all()
+    assert not db.session.get(Application, application.id).resume_pending
+    assert db.session.get(ResumeUpload, upload.id).status == 'done'
+    assert get_resume_storage().read('2/cv.pdf') == b'%PDF resume'
+    assert spooled_files(app) == []
+
+def test_retries_back_off_then_give_up(app, seeker, failing_storage):
+    app.config['RESUME_UPLOAD_MAX_ATTEMPTS'] = 3
+    apply(seeker)
+    upload = ResumeUpload.query.one()
+    delays = []
+    for _ in range(2):
+        delays.append((upload.next_attempt_at - utcnow()).total_seconds())
+        make_due(upload)
+        assert not upload_resume(upload.id)
+        db.session.refresh(upload)
+    assert delays == [pytest.approx(30, abs=5), pytest.approx(60, abs=5)]
+    assert upload.status == 'failed'
+    assert upload.attempts == 3
+    assert len(spooled_files(app)) == 1  # kept for inspection
+    assert Application.query.one().resume_pending
+
+def test_claimed_rows_are_skipped(app, seeker, failing_storage):
+    apply(seeker)
+    upload = ResumeUpload.query.one()
+    # Another worker claimed the row: its next_attempt_at is in the future
+    assert not upload_resume(upload.id)
+    db.session.refresh(upload)
+    assert upload.attempts == 1
+
+def test_failed_commit_discards_spooled_file(app, seeker, monkeypatch):
+    monkeypatch.setattr(db.session, 'commit', lambda: (_ for _ in ()).throw(Exception('fail')))
+    resp = apply(seeker)
+    assert resp.status_code == 200
+    monkeypatch.undo()
+    assert Application.query.count() == 0
+    assert spooled_files(app) == []
+
+def test_background_worker_uploads(app, seeker):
+    app.config.update(RESUME_UPLOAD_WORKERS=1, RESUME_UPLOAD_POLL_SECONDS=5)
+    assert apply(seeker).status_code == 302
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        db.session.expire_all()
+        if ResumeUpload.query.one().status == 'done':
+            break
+        time.sleep(0.02)
+    assert ResumeUpload.query.one().status == 'done'
+    assert get_resume_storage().read('2/cv.pdf') == b'%PDF resume'
@@ -0,0 +1,179 @@
+import sys
+import os
+import time
+import runpy
+from datetime import datetime, timedelta, timezone
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import SchedulerLease, JobRun, User, Job, JobCategoryStat
+from scheduler import (JOBS, LEASE_NAME, PeriodicJob, ClusterScheduler, acquire_lease, release_lease,
+                       execute_job, prune_job_runs)
+
+@pytest.fixture
+def app():
+    app = create_app(config['testing'])
+    app.config['SCHEDULER_LEASE_SECONDS'] = 30
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def schedulers(app):
+    started = []
+    def make(jobs=()):
+        scheduler = ClusterScheduler(app, jobs)
+        started.append(scheduler)
+        return scheduler
+    yield make
+    for scheduler in started:
+        scheduler.stop()
+
+def expire_lease():
+    db.session.query(SchedulerLease).update({'expires_at': datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.session.commit()
+
+def test_one_holder_at_a_time(app):
+    ttl = timedelta(seconds=30)
+    assert acquire_lease(LEASE_NAME, 'a', ttl)
+    assert not acquire_lease(LEASE_NAME, 'b', ttl)
+    assert acquire_lease(LEASE_NAME, 'a', ttl)  # renewal
+    expire_lease()
+    assert acquire_lease(LEASE_NAME, 'b', ttl)
+    assert not acquire_lease(LEASE_NAME, 'a', ttl)
+    assert db.session.get(SchedulerLease, LEASE_NAME).holder == 'b'
+
+def test_release_hands_over(app):
+    ttl = timedelta(seconds=30)
+    assert acquire_lease(LEASE_NAME, 'a', ttl)
+    release_lease(LEASE_NAME, 'b')  # not the holder: no effect
+    assert not acquire_lease(LEASE_NAME, 'b', ttl)
+    release_lease(LEASE_NAME, 'a')
+    assert acquire_lease(LEASE_NAME, 'b', ttl)
+
+def test_only_the_leader_runs_jobs(app, schedulers):
+    calls = []
+    job = PeriodicJob('count', lambda: calls.append(1) or len(calls), 'SCHEDULER_INTERVAL_MINUTES', 'minutes')
+    first, second = schedulers(), schedulers()
+    assert first.renew()
+    assert not second.renew()
+    assert first.run_job(job)
+    assert not second.run_job(job)
+    assert calls == [1]
+
+    # The leader stops renewing (dies): the other process takes over once the lease expires
+    expire_lease()
+    assert second.run_job(job)
+    assert not first.run_job(job)
+    assert calls == [1, 1]
+    runs = JobRun.query.order_by(JobRun.id).all()
+    assert [(run.holder, run.result) for run in runs] == [(first.holder, '1'), (second.holder, '2')]
+
+def test_runs_are_recorded(app):
+    def failing():
+        raise RuntimeError('boom')
+    run = execute_job(PeriodicJob('ok', lambda: 7, 'SCHEDULER_INTERVAL_MINUTES', 'minutes'), 'me')
+    assert (run.status, run.result, run.error) == ('ok', '7', None)
+    assert run.duration >= 0
+    run = execute_job(PeriodicJob('bad', failing, 'SCHEDULER_INTERVAL_MINUTES', 'minutes'), 'me')
+    assert (run.status, run.result, run.error) == ('error', None, 'RuntimeError: boom')
+    assert JobRun.query.count() == 2
+
+def test_idle_runs_of_polling_jobs_are_not_recorded(app):
+    pending = []
+    job = PeriodicJob('drain', lambda: len(pending) and pending.pop(), 'SCHEDULER_INTERVAL_MINUTES', 'minutes',
+                      record_idle=False)
+    assert execute_job(job, 'me') is None
+    pending.append(3)
+    assert execute_job(job, 'me').result == '3'
+    assert JobRun.query.count() == 1
+    assert {job.name for job in JOBS if not job.record_idle} == {'send-mail', 'upload-resumes'}
+
+def test_run_job_command_records_idle_runs(app):
+    result = app.test_cli_runner().invoke(args=['run-job', 'send-mail'])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith('send-mail: ok')
+    assert JobRun.query.filter_by(job_name='send-mail').count() == 1
+
+def test_registered_jobs_run(app):
+    db.session.add(User(username='employer', email='employer@example.com', password='hash', role='employer'))
+    db.session.flush()
+    db.session.add(Job(title='Engineer', description='Build', location='Remote', category='IT', company='Acme',
+                       poster_id=1))
+    db.session.commit()
+    db.session.query(JobCategoryStat).delete()
+    db.session.commit()
+    names = {job.name for job in JOBS}
+    assert {'reconcile-category-stats', 'repair-application-counts', 'send-status-digests',
+            'send-employer-digests', 'send-mail', 'upload-resumes'} <= names
+    for job in JOBS:
+        assert execute_job(job._replace(record_idle=True), 'me').status == 'ok', job.name
+    assert db.session.get(JobCategoryStat, 'IT').job_count == 1
+
+def test_prune_job_runs(app):
+    old = datetime.now(timezone.utc) - timedelta(days=31)
+    db.session.add_all([JobRun(job_name='a', holder='me', started_at=old, duration=0, status='ok'),
+                        JobRun(job_name='a', holder='me', duration=0, status='ok')])
+    db.session.commit()
+    assert prune_job_runs() == 1
+    assert JobRun.query.count() == 1
+
+def test_scheduler_schedules_enabled_jobs(app, schedulers):
+    app.config.update(SCHEDULER_REPAIR_HOURS=0)
+    scheduler = schedulers(JOBS)
+    scheduler.start()
+    scheduled = {job.id: job.trigger.interval for job in scheduler.scheduled_jobs()}
+    assert scheduled['reconcile-category-stats'] == timedelta(minutes=15)
+    assert scheduled['send-mail'] == timedelta(seconds=30)
+    assert 'repair-application-counts' not in scheduled
+    assert 'prune-job-runs' not in scheduled
+
+def test_background_election(app, schedulers):
+    calls = []
+    app.config['SCHEDULER_LEASE_SECONDS'] = 3
+    app.config['TEST_JOB_SECONDS'] = 0.1
+    job = PeriodicJob('tick', lambda: calls.append(time.monotonic()), 'TEST_JOB_SECONDS', 'seconds')
+    first, second = schedulers([job]), schedulers([job])
+    first.start()
+    second.start()
+    deadline = time.monotonic() + 5
+    while len(calls) < 5 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(calls) >= 5
+    assert [first.is_leader, second.is_leader].count(True) == 1
+    holders = {holder for (holder,) in db.session.query(JobRun.holder).distinct()}
+    assert len(holders) == 1
+
+    leader, follower = (first, second) if first.is_leader else (second, first)
+    leader.stop()  # releases the lease
+    deadline = time.monotonic() + 5
+    while not follower.is_leader and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert follower.is_leader
+
+def test_factory_does_not_start_scheduler():
+    config['development'].SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    app = create_app(config['development'])
+    assert app.config['SCHEDULER_ENABLED']
+    assert 'scheduler' not in app.extensions  # CLI commands and scripts stay out of the election
+
+def test_gunicorn_worker_hooks_start_and_stop_scheduler(app):
+    hooks = runpy.run_path(os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py'))
+    app.config['SCHEDULER_ENABLED'] = True
+    worker = type('Worker', (), {'wsgi': app})()
+    hooks['post_worker_init'](worker)
+    scheduler = app.extensions['scheduler']
+    try:
+        assert scheduler.scheduled_jobs()
+        deadline = time.monotonic() + 5
+        while not scheduler.is_leader and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert scheduler.is_leader
+    finally:
+        hooks['worker_exit'](None, worker)
+    assert not scheduler.is_leader
+    assert db.session.get(SchedulerLease, LEASE_NAME).expires_at <= datetime.now(timezone.utc).replace(tzinfo=None)
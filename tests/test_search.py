@@ -0,0 +1,97 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job
+from search import parse_query, to_fts5, to_tsquery, build_search_query, rebuild_index, facet_counts
+
+@pytest.fixture
+def app():
+    app = create_app(config['testing'])
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='poster', email='poster@example.com', password='hash', role='employer'))
+        db.session.add_all([
+            Job(title='Senior Python Developer', description='Build APIs with Flask', location='New York',
+                category='IT', company='Acme', poster_id=1),
+            Job(title='Django Engineer', description='Python and Django work', location='Remote',
+                category='IT', company='Globex', poster_id=1),
+            Job(title='Accountant', description='Ledgers and audits', location='New Delhi',
+                category='Finance', company='Initech', poster_id=1),
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def titles(q=None, **filters):
+    query, rank = build_search_query(q=q, **filters)
+    if rank is not None:
+        query = query.order_by(rank)
+    return [job.title for job in query.all()]
+
+def test_parse_query_terms():
+    terms = parse_query('Python "data engineer" -junior full-stack')
+    assert [t.words for t in terms] == [('python',), ('data', 'engineer'), ('junior',), ('full', 'stack')]
+    assert [t.prefix for t in terms] == [True, False, True, False]
+    assert [t.negated for t in terms] == [False, False, True, False]
+
+def test_parse_query_ignores_punctuation():
+    assert parse_query('!!! "" -') == []
+    assert [t.words for t in parse_query('c++ dev*')] == [('c',), ('dev',)]
+
+def test_to_fts5_and_tsquery():
+    terms = parse_query('python "data engineer" -junior')
+    assert to_fts5(terms) == '("python"* AND "data engineer") NOT "junior"*'
+    assert to_fts5(terms, column='location').startswith('location : (')
+    assert to_tsquery(terms) == 'python:* & (data <-> engineer) & !junior:*'
+    assert to_fts5(parse_query('-junior')) is None
+    assert to_tsquery(parse_query('-junior')) is None
+
+def test_search_free_text_prefix_and_exclusion(app):
+    assert sorted(titles('pyth')) == ['Django Engineer', 'Senior Python Developer']
+    assert titles('python -django') == ['Senior Python Developer']
+    assert titles('"django work"') == ['Django Engineer']
+    assert titles('"work django"') == []
+    # FTS operators in user input are treated as plain words
+    assert titles('NEAR( "AND" OR*') == []
+
+def test_search_column_filters(app):
+    assert sorted(titles(location='new')) == ['Accountant', 'Senior Python Developer']
+    assert titles(location='new york', category='it') == ['Senior Python Developer']
+    assert titles(company='glob') == ['Django Engineer']
+
+def test_search_ranks_title_matches(app):
+    db.session.add(Job(title='Python Python Python', description='python', location='Remote',
+                       category='IT', company='Hooli', poster_id=1))
+    db.session.commit()
+    assert titles('python')[0] == 'Python Python Python'
+
+def test_index_follows_updates_and_deletes(app):
+    job = Job.query.filter_by(title='Accountant').first()
+    job.title = 'Auditor'
+    db.session.commit()
+    assert titles('accountant') == []
+    assert titles('auditor') == ['Auditor']
+    db.session.delete(job)
+    db.session.commit()
+    assert titles('auditor') == []
+    rebuild_index()
+    assert sorted(titles('python')) == ['Django Engineer', 'Senior Python Developer']
+
+def test_facet_counts(app):
+    facets = facet_counts(q='python')
+    assert facets['category'] == [{'value': 'IT', 'count': 2}]
+    assert {f['value'] for f in facets['company']} == {'Acme', 'Globex'}
+    assert facet_counts(location='new', facets=('category',))['category'] == [
+        {'value': 'Finance', 'count': 1}, {'value': 'IT', 'count': 1}]
+
+def test_facet_cache_invalidated_on_job_write(app):
+    assert facet_counts(facets=('category',))['category'][0] == {'value': 'IT', 'count': 2}
+    db.session.add(Job(title='Ops', description='Servers', location='Remote', category='IT',
+                       company='Acme', poster_id=1))
+    db.session.commit()
+    assert facet_counts(facets=('category',))['category'][0] == {'value': 'IT', 'count': 3}
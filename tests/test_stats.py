@@ -0,0 +1,157 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User, Job, JobCategoryStat
+from stats import top_categories, reconcile_category_stats
+
+@pytest.fixture
+def app():
+    app = create_app(config['testing'])
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(id=i, username=f'user{i}', email=f'user{i}@example.com', password='hash',
+                 role='employer' if i < 10 else 'job_seeker')
+            for i in (1, 2, 10, 11, 20, 21)
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def make_job(title, category):
+    return Job(title=title, description='desc', location='Remote', category=category, company='Co', poster_id=1)
+
+def test_category_stats_follow_job_writes(app):
+    db.session.add_all([make_job('A', 'IT'), make_job('B', 'IT'), make_job('C', 'Finance')])
+    db.session.commit()
+    assert top_categories() == [('IT', 2), ('Finance', 1)]
+
+    job = Job.query.filter_by(title='A').first()
+    job.category = 'Finance'
+    db.session.commit()
+    assert top_categories() == [('Finance', 2), ('IT', 1)]
+
+    # The instance is expired after commit; the old category must still be seen
+    job.category = 'Sales'
+    job.category = 'Finance'
+    db.session.commit()
+    assert top_categories() == [('Finance', 2), ('IT', 1)]
+
+    db.session.delete(Job.query.filter_by(title='B').first())
+    db.session.commit()
+    assert top_categories() == [('Finance', 2)]
+    assert db.session.get(JobCategoryStat, 'IT') is None
+
+def test_reconcile_category_stats(app):
+    db.session.add_all([make_job('A', 'IT'), make_job('B', 'Sales')])
+    db.session.commit()
+    # Simulate drift from writes that bypassed the ORM hooks
+    db.session.execute(Job.__table__.insert().values(
+        title='Bulk', description='desc', location='Remote', category='IT', company='Co', poster_id=1))
+    db.session.query(JobCategoryStat).filter_by(category='Sales').delete()
+    db.session.merge(JobCategoryStat(category='Ghost', job_count=3))
+    db.session.commit()
+
+    assert reconcile_category_stats() == 3
+    assert top_categories() == [('IT', 2), ('Sales', 1)]
+    assert reconcile_category_stats() == 0
+
+def test_reconcile_stats_command(app):
+    db.session.add(make_job('A', 'IT'))
+    db.session.commit()
+    db.session.query(JobCategoryStat).delete()
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=['reconcile-stats'])
+    assert 'Corrected 1 categories' in result.output
+
+def test_application_counters_follow_application_writes(app):
+    from models import Application
+    job = make_job('Counted', 'IT')
+    db.session.add(job)
+    db.session.commit()
+    first = Application(job_id=job.id, applicant_id=10, status='applied')
+    second = Application(job_id=job.id, applicant_id=11, status='applied')
+    db.session.add_all([first, second])
+    db.session.commit()
+    assert job.application_count == 2
+    assert job.applied_count == 2
+
+    first.status = 'hired'
+    db.session.commit()
+    assert job.status_counts['applied'] == 1
+    assert job.status_counts['hired'] == 1
+
+    db.session.delete(second)
+    db.session.commit()
+    assert job.application_count == 1
+    assert job.applied_count == 0
+
+def test_repair_application_counts(app):
+    from models import Application
+    job = make_job('Drifted', 'IT')
+    db.session.add(job)
+    db.session.commit()
+    db.session.execute(Application.__table__.insert(), [
+        {'job_id': job.id, 'applicant_id': 20, 'status': 'reviewed'},
+        {'job_id': job.id, 'applicant_id': 21, 'status': 'applied'},
+    ])
+    db.session.commit()
+    assert job.application_count == 0
+
+    result = app.test_cli_runner().invoke(args=['repair-application-counts'])
+    assert 'Repaired application counters for 1 jobs' in result.output
+    db.session.refresh(job)
+    assert job.application_count == 2
+    assert job.reviewed_count == 1
+    assert job.applied_count == 1
+
+def test_user_delete_cascades_in_database_and_keeps_summaries(app):
+    from models import Application
+    kept = Job(title='Kept', description='desc', location='Remote', category='IT', company='Co', poster_id=2)
+    db.session.add_all([kept, make_job('Gone A', 'IT'), make_job('Gone B', 'Sales')])
+    db.session.commit()
+    gone = Job.query.filter_by(title='Gone A').first()
+    db.session.add_all([
+        Application(job_id=kept.id, applicant_id=10, status='applied'),
+        Application(job_id=kept.id, applicant_id=11, status='hired'),
+        Application(job_id=gone.id, applicant_id=11, status='applied'),
+    ])
+    db.session.commit()
+    kept_id = kept.id
+    db.session.expunge_all()
+
+    # Neither user's jobs nor applications are loaded: the database cascades them
+    db.session.delete(db.session.get(User, 1))
+    db.session.delete(db.session.get(User, 11))
+    db.session.commit()
+
+    assert Job.query.count() == 1
+    assert Application.query.count() == 1
+    assert top_categories() == [('IT', 1)]
+    kept = db.session.get(Job, kept_id)
+    assert (kept.application_count, kept.applied_count, kept.hired_count) == (1, 1, 0)
+    assert reconcile_category_stats() == 0
+
+def test_user_delete_with_loaded_children_counts_once(app):
+    from models import Application
+    job = make_job('Loaded', 'IT')
+    other = Job(title='Other', description='desc', location='Remote', category='IT', company='Co', poster_id=2)
+    db.session.add_all([job, other])
+    db.session.commit()
+    db.session.add(Application(job_id=other.id, applicant_id=10, status='applied'))
+    db.session.commit()
+
+    user = db.session.get(User, 1)
+    applicant = db.session.get(User, 10)
+    assert len(user.jobs_posted) == 1 and len(applicant.applications) == 1
+    db.session.delete(user)
+    db.session.delete(applicant)
+    db.session.commit()
+
+    assert top_categories() == [('IT', 1)]
+    assert other.application_count == 0 and other.applied_count == 0
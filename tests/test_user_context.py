@@ -0,0 +1,100 @@
+import sys
+import os
+import pytest
+from sqlalchemy import event
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from config import config
+from extensions import db
+from models import User
+
+@pytest.fixture
+def app():
+    app = create_app(config['testing'])
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(username='seeker', email='seeker@example.com', password='hash', role='job_seeker'),
+            User(username='admin', email='admin@example.com', password='hash', role='admin'),
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def login(client, user_id, role):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['role'] = role
+
+def user_queries(app, client, path):
+    """Render `path` and return the statements that read the user table."""
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM user' in statement:
+            statements.append(statement)
+    db.session.expunge_all()
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return response, statements
+
+def test_cached_summary_skips_user_query(app):
+    client = app.test_client()
+    login(client, 1, 'job_seeker')
+    response, statements = user_queries(app, client, '/about')
+    assert len(statements) == 1 and 'password' not in statements[0]
+    assert b'seeker' in response.data
+    response, statements = user_queries(app, client, '/about')
+    assert statements == []
+    assert b'seeker' in response.data
+
+def test_anonymous_pages_do_not_load_a_user(app):
+    _, statements = user_queries(app, app.test_client(), '/about')
+    assert statements == []
+
+def test_profile_loads_the_user_once(app):
+    client = app.test_client()
+    login(client, 1, 'job_seeker')
+    _, statements = user_queries(app, client, '/profile')
+    assert len(statements) == 1
+
+def test_profile_update_invalidates_cache(app):
+    client = app.test_client()
+    login(client, 1, 'job_seeker')
+    user_queries(app, client, '/about')
+    client.post('/profile', data={'username': 'renamed', 'email': 'seeker@example.com'})
+    response, statements = user_queries(app, client, '/about')
+    assert len(statements) == 1
+    assert b'renamed' in response.data
+
+def test_admin_edit_invalidates_cache(app):
+    seeker, admin = app.test_client(), app.test_client()
+    login(seeker, 1, 'job_seeker')
+    login(admin, 2, 'admin')
+    user_queries(app, seeker, '/about')
+    admin.post('/admin/users/1/edit', data={'username': 'edited', 'email': 'seeker@example.com',
+                                             'role': 'job_seeker'})
+    response, _ = user_queries(app, seeker, '/about')
+    assert b'edited' in response.data
+
+def test_cache_can_be_disabled(app):
+    app.config['USER_CACHE_TTL'] = 0
+    client = app.test_client()
+    login(client, 1, 'job_seeker')
+    user_queries(app, client, '/about')
+    _, statements = user_queries(app, client, '/about')
+    assert len(statements) == 1
+    assert 'user_cache' not in app.extensions
+
+def test_deleted_user_renders_as_anonymous(app):
+    client = app.test_client()
+    login(client, 1, 'job_seeker')
+    user_queries(app, client, '/about')
+    db.session.delete(db.session.get(User, 1))
+    db.session.commit()
+    response, statements = user_queries(app, client, '/about')
+    assert len(statements) == 1
@@ -9,7 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app import create_app
 from config import config
-from utils import allowed_file, save_company_logo, save_profile_picture, get_resume_file, UPLOAD_FOLDER, COMPANY_LOGOS_FOLDER, PROFILE_UPLOAD_FOLDER
+from utils import allowed_file, save_company_logo, save_profile_picture, UPLOAD_FOLDER, COMPANY_LOGOS_FOLDER, PROFILE_UPLOAD_FOLDER
 from extensions import db
 from models import User, Job, Application
 
@@ -81,11 +81,20 @@ def test_save_company_logo_success(tmp_path, monkeypatch):
     temp_company_logos_folder.mkdir()
     monkeypatch.setattr('utils.COMPANY_LOGOS_FOLDER', str(temp_company_logos_folder))
 
-    dummy = DummyFile('logo.png')
-    result = save_company_logo(dummy)
-    assert result is not None and result.endswith('.png')
+    from PIL import Image
+    from werkzeug.datastructures import FileStorage
+    img_bytes = io.BytesIO()
+    Image.new('RGB', (500, 250), color='green').save(img_bytes, format='PNG')
+    upload = lambda: FileStorage(io.BytesIO(img_bytes.getvalue()), filename='logo.png')
+    result = save_company_logo(upload())
+    assert result is not None and result.endswith('_200.webp')
     # The 'result' is just the filename, COMPANY_LOGOS_FOLDER is monkeypatched
     assert os.path.exists(os.path.join(str(temp_company_logos_folder), result))
+    with Image.open(os.path.join(str(temp_company_logos_folder), result.replace('_200', '_80'))) as thumb:
+        assert thumb.size == (80, 40)
+    # The same bytes uploaded again share the stored files
+    assert save_company_logo(upload()) == result
+    assert len(os.listdir(str(temp_company_logos_folder))) == 2
 
 def test_save_company_logo_invalid_type(tmp_path, monkeypatch):
     temp_company_logos_folder = tmp_path / "company_logos_invalid"
@@ -122,62 +131,25 @@ def test_save_profile_picture_failure(monkeypatch):
     result = save_profile_picture(BadFile())
     assert result == 'img/profiles/default.jpg'
 
-def test_get_resume_file_local(tmp_path):
-    # Create a dummy file
-    resume_path = tmp_path / 'resume.pdf'
-    resume_path.write_bytes(b'data')
-    file_path, success = get_resume_file(str(resume_path))
-    assert file_path == str(resume_path)
-    assert success
-
-def test_get_resume_file_gcs(app_with_utils, tmp_path, monkeypatch):
-    # Simulate file not found locally, but found in GCS
-    # get_resume_file uses current_app.config['UPLOAD_FOLDER']
-    temp_upload_dir_for_gcs_check = tmp_path / "gcs_local_check"
-    temp_upload_dir_for_gcs_check.mkdir()
-    monkeypatch.setattr('utils.UPLOAD_FOLDER', str(temp_upload_dir_for_gcs_check))
-
-    class DummyBlob:
-        def exists(self): return True
-        def download_to_filename(self, filename):
-            # Ensure the directory for the downloaded file exists
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
-            with open(filename, 'wb') as f: f.write(b'gcs_data')
-    class DummyBucket:
-        def blob(self, name): return DummyBlob()
-    class DummyClient:
-        def bucket(self, name): return DummyBucket()
-    monkeypatch.setattr('google.cloud.storage.Client', DummyClient)
-
-    file_path_suffix = os.path.join(temp_upload_dir_for_gcs_check, 'gcsuser', 'resume.pdf') # This is the path relative to UPLOAD_FOLDER
-    
-    returned_path, success = get_resume_file(file_path_suffix, enable_gcs=True, gcs_bucket_name='bucket')
-    
-    # Check if the function returns the suffix as observed from the error
-    assert returned_path == file_path_suffix
-    assert success
-    
-    # Verify that the file was actually downloaded to the correct temporary location
-    actual_download_location = os.path.join(str(temp_upload_dir_for_gcs_check), file_path_suffix)
-    assert os.path.exists(actual_download_location)
-    with open(actual_download_location, 'rb') as f:
-        assert f.read() == b'gcs_data'
-
-def test_get_resume_file_not_found():
-    file_path, success = get_resume_file('nonexistent.pdf')
-    assert file_path is None
-    assert not success
+def add_placeholder_users(*user_ids):
+    # Rows below reference users by id and foreign keys are enforced
+    db.session.add_all([User(id=i, username=f'placeholder{i}', email=f'placeholder{i}@example.com',
+                             password='hash', role='employer') for i in user_ids])
+    db.session.commit()
 
 def test_serve_resume_admin_access(client_with_utils, app_with_utils, tmp_path):
     # Setup admin, job, application, and dummy resume file
     admin = User(username='admin', email='admin@example.com', password='hash', role='admin')
+    db.session.add(admin)
+    db.session.commit()
+    add_placeholder_users(2)
     job = Job(title='Job', description='desc', location='New Delhi', category='Software Development', company='Coca Cola', poster_id=2)
-    db.session.add_all([admin, job])
+    db.session.add(job)
     db.session.commit()
 
     temp_resume_dir = tmp_path / "resumes_admin"
     temp_resume_dir.mkdir(exist_ok=True)
-    app_with_utils.config['UPLOAD_FOLDER'] = str(temp_resume_dir)
+    app_with_utils.config['RESUME_STORAGE_DIR'] = str(temp_resume_dir)
 
     resume_rel = '1/resume.pdf'
     resume_abs = os.path.join(str(temp_resume_dir), resume_rel)
@@ -196,13 +168,14 @@ def test_serve_resume_employer_access(client_with_utils, app_with_utils, tmp_pat
     employer = User(username='emp', email='emp@example.com', password='hash', role='employer')
     db.session.add(employer)
     db.session.commit()
+    add_placeholder_users(2)
     job = Job(title='Job', description='desc', location='New Delhi', category='Software Development', company='Coca Cola', poster_id=employer.id)
     db.session.add(job)
     db.session.commit()
 
     temp_resume_dir = tmp_path / "resumes_employer"
     temp_resume_dir.mkdir(exist_ok=True)
-    app_with_utils.config['UPLOAD_FOLDER'] = str(temp_resume_dir)
+    app_with_utils.config['RESUME_STORAGE_DIR'] = str(temp_resume_dir)
 
     resume_rel = '2/resume.pdf'
     resume_abs = os.path.join(str(temp_resume_dir), resume_rel)
@@ -220,13 +193,14 @@ def test_serve_resume_applicant_access(client_with_utils, app_with_utils, tmp_pa
     user = User(username='user', email='user@example.com', password='hash', role='job_seeker')
     db.session.add(user)
     db.session.commit()
+    add_placeholder_users(3)
     job = Job(title='Job', description='desc', location='New Delhi', category='Software Development', company='Coca Cola', poster_id=3)
     db.session.add(job)
     db.session.commit()
 
     temp_resume_dir = tmp_path / "resumes_applicant"
     temp_resume_dir.mkdir(exist_ok=True)
-    app_with_utils.config['UPLOAD_FOLDER'] = str(temp_resume_dir)
+    app_with_utils.config['RESUME_STORAGE_DIR'] = str(temp_resume_dir)
 
     resume_rel = '3/resume.pdf'
     resume_abs = os.path.join(str(temp_resume_dir), resume_rel)
@@ -244,13 +218,14 @@ def test_serve_resume_unauthorized_employer(client_with_utils, app_with_utils, t
     employer = User(username='emp2', email='emp2@example.com', password='hash', role='employer')
     db.session.add(employer)
     db.session.commit()
+    add_placeholder_users(4, 999)
     job = Job(title='Job', description='desc', location='New Delhi', category='Software Development', company='Coca Cola', poster_id=999)  # Different employer
     db.session.add(job)
     db.session.commit()
 
     temp_resume_dir = tmp_path / "resumes_unauth_emp"
     temp_resume_dir.mkdir(exist_ok=True)
-    app_with_utils.config['UPLOAD_FOLDER'] = str(temp_resume_dir)
+    app_with_utils.config['RESUME_STORAGE_DIR'] = str(temp_resume_dir)
 
     resume_rel = '4/resume.pdf'
     resume_abs = os.path.join(str(temp_resume_dir), resume_rel)
@@ -268,13 +243,14 @@ def test_serve_resume_unauthorized_applicant(client_with_utils, app_with_utils,
     user = User(username='user2', email='user2@example.com', password='hash', role='job_seeker')
     db.session.add(user)
     db.session.commit()
+    add_placeholder_users(5, 999)
     job = Job(title='Job', description='desc', location='New Delhi', category='Software Development', company='Coca Cola', poster_id=5)
     db.session.add(job)
     db.session.commit()
 
     temp_resume_dir = tmp_path / "resumes_unauth_applicant"
     temp_resume_dir.mkdir(exist_ok=True)
-    app_with_utils.config['UPLOAD_FOLDER'] = str(temp_resume_dir)
+    app_with_utils.config['RESUME_STORAGE_DIR'] = str(temp_resume_dir)
 
     resume_rel = '5/resume.pdf'
     resume_abs = os.path.join(str(temp_resume_dir), resume_rel)
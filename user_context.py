@@ -0,0 +1,154 @@
+"""
+The logged-in user, loaded at most once per request.
+
+Every template rendered for a logged-in user shows their username, profile
+picture and role (``base.html``, ``profile.html``). Rather than loading the
+``User`` row on each render:
+
+- ``get_current_user`` loads the full ``User`` once per request and keeps it
+  on ``flask.g``; routes that need the model (e.g. ``auth.profile``) use it so
+  templates reuse the same object
+- ``current_user_summary`` returns just the fields templates need, taken from
+  the request's user if one was loaded, otherwise from a small cross-request
+  TTL cache, and only on a miss from a three-column query
+
+The cache lives in ``app.extensions['user_cache']`` and is keyed by user id.
+Entries are dropped whenever a ``User`` is updated or deleted through the ORM,
+both at flush and again at commit (a concurrent request may have re-cached
+the old row in between), so a changed username, picture or role shows on the
+next page view.
+
+Configuration:
+    USER_CACHE_TTL (int): Seconds a summary is reused; 0 disables the cache
+    USER_CACHE_SIZE (int): Maximum number of cached users
+"""
+
+import threading
+from collections import namedtuple
+
+import sqlalchemy as sa
+from cachetools import TTLCache
+from flask import current_app, g, has_app_context, has_request_context, session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.util import identity_key
+
+from extensions import db
+from models import User
+
+UserSummary = namedtuple('UserSummary', ['id', 'username', 'profile_picture', 'role'])
+
+_user_cache_lock = threading.Lock()
+
+
+def _user_cache():
+    """Return the application's user cache (None when disabled), creating it on first use."""
+    if current_app.config['USER_CACHE_TTL'] <= 0:
+        return None
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        with _user_cache_lock:
+            cache = current_app.extensions.setdefault('user_cache', TTLCache(
+                maxsize=current_app.config['USER_CACHE_SIZE'],
+                ttl=current_app.config['USER_CACHE_TTL']))
+    return cache
+
+
+def _summarize(user):
+    return UserSummary(user.id, user.username, user.profile_picture, user.role)
+
+
+def get_current_user():
+    """
+    Load the logged-in user once per request.
+
+    Returns:
+        User: The user in ``session['user_id']``, or None if nobody is logged
+              in or the user no longer exists
+
+    Example:
+        user = get_current_user() or abort(404)
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+    if g.get('current_user_id') != user_id:
+        g.current_user = db.session.get(User, user_id)
+        g.current_user_id = user_id
+    return g.current_user
+
+
+def current_user_summary():
+    """
+    Return the fields templates show for the logged-in user.
+
+    Prefers, in order: the ``User`` already in the database session (so a
+    route's unsaved edits are what the page shows), the cross-request cache,
+    and finally a query for ``username``, ``profile_picture`` and ``role``.
+
+    Returns:
+        UserSummary: id, username, profile_picture and role, or None if
+                     nobody is logged in or the user no longer exists
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+
+    user = db.session.identity_map.get(identity_key(User, user_id))
+    if user is not None:
+        return _summarize(user)
+
+    cache = _user_cache()
+    if cache is not None:
+        with _user_cache_lock:
+            summary = cache.get(user_id)
+        if summary is not None:
+            return summary
+
+    row = db.session.execute(
+        sa.select(User.id, User.username, User.profile_picture, User.role)
+        .where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    summary = UserSummary(*row)
+    if cache is not None:
+        with _user_cache_lock:
+            cache[user_id] = summary
+    return summary
+
+
+def invalidate_user(user_id):
+    """
+    Drop a user's cached summary.
+
+    Args:
+        user_id (int): ID of the changed user
+    """
+    if not has_app_context():
+        return
+    cache = current_app.extensions.get('user_cache')
+    if cache is not None:
+        with _user_cache_lock:
+            cache.pop(user_id, None)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user_cache(mapper, connection, target):
+    invalidate_user(target.id)
+    object_session(target).info.setdefault('stale_user_ids', set()).add(target.id)
+    if has_request_context() and g.get('current_user_id') == target.id:
+        g.pop('current_user_id', None)
+        g.pop('current_user', None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_users(session):
+    for user_id in session.info.pop('stale_user_ids', ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_stale_users(session):
+    session.info.pop('stale_user_ids', None)